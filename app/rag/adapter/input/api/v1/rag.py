@@ -1,17 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from huggingface_hub import InferenceClient
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator
+
+import numpy as np
+from bson import ObjectId
+from celery.result import AsyncResult, GroupResult
+from celery.utils import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from core.db.mongo_db import mongo_instance 
-from app.rag.adapter.input.api.v1.request import IngestRequest 
-from core.llm.generation import gemini_generator
+from app.rag.adapter.input.api.v1.request import IngestRequest, SearchParams
+from app.rag.adapter.input.api.v1.response import RetrieveResponse
+from app.rag.adapter.output.cache import answer_cache
+from app.rag.adapter.output.index import lexical_index, metadata_index, vector_index
+from app.rag.adapter.output.persistence.mongo import rag_document_repo
+from app.rag.application.exception import EmbeddingTimeoutException
+from app.rag.application.service.embedding import embedding_service
+from app.rag.application.service.ingestion import ingestion_service
+from app.rag.application.service.retrieval import retrieval_service
+from celery_task import celery_app
+from celery_task.tasks.rag import ingest_documents
+from core.llm.generation import ERROR_PREFIX, gemini_generator
 from core.config import config
 
 rag_router = APIRouter()
 
-HF_TOKEN=config.HF_TOKEN
-MODEL_ID=config.MODEL_ID
-SIMILARITY_THRESHOLD=0.5
-
-client=InferenceClient(token=HF_TOKEN)
+NO_RESULTS_ANSWER="No related info found in the database."
 
 @rag_router.post("/ingest")
 async def ingest_document(request: IngestRequest):
@@ -19,85 +35,335 @@ async def ingest_document(request: IngestRequest):
         raise HTTPException(status_code=500, detail="Database down")
 
     try:
-        #get embedding
-        resp=client.feature_extraction(request.text, model=MODEL_ID)
-        vector=resp.tolist() if hasattr(resp, "tolist") else resp
+        #embed, store and index
+        [result]=await ingestion_service.ingest_many(
+            texts=[request.text],
+            sources=[request.source_name],
+        )
+    except EmbeddingTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    doc_data={
-        "text": request.text,
-        "source": request.source_name,
-        "vector": vector 
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return {"status": "success"}
+
+
+@rag_router.post("/ingest/bulk")
+async def bulk_ingest_documents(request: Request):
+    # Body is a JSON array of IngestRequest objects, or one object per line with
+    # Content-Type application/x-ndjson (parsed as it streams in). Items are
+    # embedded and inserted INGEST_BATCH_SIZE at a time; one result per item
+    if not mongo_instance.client:
+        raise HTTPException(status_code=500, detail="Database down")
+
+    results = []
+    batch = []
+    async for index, document in parse_ingest_items(request):
+        if isinstance(document, list):
+            results.append({"index": index, "status": "error", "detail": document})
+            continue
+        batch.append((index, document))
+        if len(batch) == config.INGEST_BATCH_SIZE:
+            results += await ingest_batch(batch)
+            batch = []
+    results += await ingest_batch(batch)
+    results.sort(key=lambda result: result["index"])
+
+    stored = sum(result["status"] == "success" for result in results)
+    duplicates = sum(result.get("duplicate", False) for result in results)
+    return {
+        "stored": stored,
+        "duplicates": duplicates,
+        "failed": len(results) - stored,
+        "results": results,
     }
-    
+
+
+async def ingest_batch(batch: list[tuple[int, IngestRequest]]) -> list[dict]:
+    if not batch:
+        return []
     try:
-        await mongo_instance.db.rag_documents.insert_one(doc_data)
-        return {"status": "success"}
+        outcomes = await ingestion_service.ingest_many(
+            texts=[item.text for _, item in batch],
+            sources=[item.source_name for _, item in batch],
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        outcomes = [{"error": str(e) or type(e).__name__}] * len(batch)
 
+    # a document whose every chunk was already stored is a successful no-op
+    return [
+        {"index": index, "status": "error", "detail": outcome["error"]}
+        if "error" in outcome
+        else {"index": index, "status": "success", "id": outcome["id"], "duplicate": not outcome["chunks"]}
+        for (index, _), outcome in zip(batch, outcomes)
+    ]
 
-@rag_router.get("/search")
-async def search_documents(query: str):
+
+@rag_router.post("/ingest/jobs", status_code=202)
+async def create_ingest_job(request: Request):
+    # Same body as /ingest/bulk, processed by Celery workers. Valid items are
+    # sent as tasks of INGEST_JOB_CHUNK_SIZE documents; a job that fits in one
+    # task goes to the interactive queue, larger ones to the bulk queue so
+    # backfills never delay small ingests. Poll GET /ingest/jobs/{job_id}
+    rejected = []
+    queued = 0
+    chunk = []
+    results = []
+    queue = config.CELERY_INTERACTIVE_QUEUE
+    async for index, document in parse_ingest_items(request):
+        if isinstance(document, list):
+            rejected.append({"index": index, "status": "error", "detail": document})
+            continue
+        if len(chunk) == config.INGEST_JOB_CHUNK_SIZE:
+            queue = config.CELERY_BULK_QUEUE
+            results.append(await enqueue_ingest_chunk(chunk, queue=queue))
+            chunk = []
+        chunk.append({"text": document.text, "source_name": document.source_name})
+        queued += 1
+    if chunk:
+        results.append(await enqueue_ingest_chunk(chunk, queue=queue))
+
+    job = GroupResult(id=uuid(), results=results, app=celery_app)
+    await asyncio.to_thread(job.save)
+    return {"job_id": job.id, "queue": queue, "queued": queued, "rejected": rejected}
+
+
+@rag_router.get("/ingest/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    job = await asyncio.to_thread(GroupResult.restore, job_id, app=celery_app)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await asyncio.to_thread(summarize_ingest_job, job)
+
+
+async def enqueue_ingest_chunk(chunk: list[dict], *, queue: str) -> AsyncResult:
+    return await asyncio.to_thread(
+        ingest_documents.apply_async, kwargs={"documents": chunk}, queue=queue
+    )
+
+
+def summarize_ingest_job(job: GroupResult) -> dict:
+    summary = {"job_id": job.id, "tasks": len(job.results), "completed": 0, "stored": 0, "duplicates": 0, "failed": 0, "errors": []}
+    for result in job.results:
+        if result.successful():
+            summary["completed"] += 1
+            summary["stored"] += result.result["stored"]
+            summary["duplicates"] += result.result.get("duplicates", 0)
+            summary["failed"] += result.result["failed"]
+        elif result.failed():
+            summary["completed"] += 1
+            summary["errors"].append(str(result.result))
+    if summary["completed"] < summary["tasks"]:
+        summary["state"] = "running"
+    else:
+        summary["state"] = "failed" if summary["errors"] else "done"
+    return summary
+
+
+async def parse_ingest_items(request: Request) -> AsyncIterator[tuple[int, IngestRequest | list]]:
+    """Numbered IngestRequests from a JSON array or NDJSON body; validation
+    errors are yielded in place of the request"""
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        items = iter_ndjson(request)
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array")
+        items = iter_list(body)
+
+    index = 0
+    async for item in items:
+        try:
+            yield index, (
+                IngestRequest.model_validate_json(item)
+                if isinstance(item, bytes)
+                else IngestRequest.model_validate(item)
+            )
+        except ValidationError as e:
+            yield index, e.errors(include_url=False, include_context=False)
+        index += 1
+
+
+async def iter_ndjson(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in request.stream():
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def iter_list(items: list) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+@rag_router.delete("/documents/{doc_id}")
+async def delete_document(doc_id: str):
+    # doc_id is a stored chunk or the parent id returned by ingestion
+    if not mongo_instance.client:
+        raise HTTPException(status_code=500, detail="Database down")
+
+    deleted = await rag_document_repo.delete(id_=doc_id) if ObjectId.is_valid(doc_id) else []
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    vector_index.remove(ids=deleted)
+    if lexical_index is not None:
+        lexical_index.remove(ids=deleted)
+    metadata_index.remove(ids=deleted)
+    for id_ in deleted:
+        answer_cache.invalidate_source(id_=id_)
+    return {"status": "success"}
+
+
+async def embed_search_query(query: str) -> np.ndarray:
     if not mongo_instance.client:
         raise HTTPException(status_code=500, detail="Database down")
 
     try:
-        resp = client.feature_extraction(query, model=MODEL_ID)
-        query_vector = resp.tolist() if hasattr(resp, "tolist") else resp
+        return await embedding_service.embed_query(text=query)
+    except EmbeddingTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Vector fail: {str(e)}")
 
-    # cosine similarity pipeline
-    pipeline = [
-        {
-            "$addFields": {
-                "score": {
-                    "$let": {
-                        "vars": {
-                            "query": query_vector,
-                            "doc": "$vector"
-                        },
-                        "in": {
-                            "$divide": [
-                                # dot product
-                                { "$reduce": {
-                                    "input": { "$zip": { "inputs": ["$$query", "$$doc"] } },
-                                    "initialValue": 0,
-                                    "in": { "$add": ["$$value", { "$multiply": [{ "$arrayElemAt": ["$$this", 0] }, { "$arrayElemAt": ["$$this", 1] }] }] }
-                                }},
-                                # magnitude
-                                { "$multiply": [
-                                    { "$sqrt": { "$reduce": { "input": "$$query", "initialValue": 0, "in": { "$add": ["$$value", { "$pow": ["$$this", 2] }] } } } },
-                                    { "$sqrt": { "$reduce": { "input": "$$doc", "initialValue": 0, "in": { "$add": ["$$value", { "$pow": ["$$this", 2] }] } } } }
-                                ]}
-                            ]
-                        }
-                    }
-                }
+
+async def retrieve_documents(
+    params: SearchParams, query_vector: np.ndarray, *, k: int, threshold: float
+) -> list[dict]:
+    # cosine similarity against the in-memory index, fused with BM25 in hybrid mode
+    return await retrieval_service.retrieve(
+        query_vector=query_vector,
+        k=k,
+        threshold=threshold,
+        query=params.query,
+        mode=params.mode or config.RETRIEVAL_MODE,
+        rerank=params.rerank,
+        mmr_lambda=params.mmr_lambda,
+        mmr_pool=params.mmr_pool,
+        filters={"source": params.source} if params.source else None,
+        ef_search=params.ef_search,
+        nprobe=params.nprobe,
+    )
+
+
+async def retrieve_context(params: SearchParams) -> tuple[np.ndarray, list[dict]]:
+    query_vector = await embed_search_query(params.query)
+    valid = await retrieve_documents(
+        params, query_vector, k=config.SEARCH_TOP_K, threshold=config.SIMILARITY_THRESHOLD
+    )
+    return query_vector, valid
+
+
+@rag_router.get("/retrieve", response_model=RetrieveResponse)
+async def retrieve_hits(
+    params: SearchParams = Depends(),
+    k: int = Query(config.SEARCH_TOP_K, ge=1, le=100, description="Hits to return"),
+    threshold: float = Query(config.SIMILARITY_THRESHOLD, ge=-1, le=1, description="Minimum cosine similarity"),
+    include_text: bool = Query(True, description="Return chunk texts"),
+):
+    # Retrieval only, no generation: scored hits for benchmarks and batch consumers
+    started = time.perf_counter()
+    query_vector = await embed_search_query(params.query)
+    embedded = time.perf_counter()
+    hits = await retrieve_documents(params, query_vector, k=k, threshold=threshold)
+    finished = time.perf_counter()
+
+    return {
+        "query": params.query,
+        "hits": [
+            {
+                "id": d['id'],
+                "ids": d.get('ids', [d['id']]),
+                "parent_id": d.get('parent_id'),
+                "source": d['source'],
+                "text": d['text'] if include_text else None,
+                "score": d['score'],
             }
-        },
-        { "$sort": { "score": -1 } },
-        { "$limit": 3 },
-        { "$project": { "_id": 0, "text": 1, "source": 1, "score": 1 } }
-    ]
+            for d in hits
+        ],
+        "embedding_ms": (embedded - started) * 1000,
+        "retrieval_ms": (finished - embedded) * 1000,
+    }
 
-    cursor = mongo_instance.db.rag_documents.aggregate(pipeline)
-    matches = await cursor.to_list(length=3)
 
-    valid = [d for d in matches if d['score'] >= SIMILARITY_THRESHOLD]
+@rag_router.get("/search")
+async def search_documents(params: SearchParams = Depends()):
+    query = params.query
+    query_vector, valid = await retrieve_context(params)
     
     if not valid:
-        return {"query": query, "answer": "No related info found in the database.", "sources": []}
+        return {"query": query, "answer": NO_RESULTS_ANSWER, "sources": [], "context_tokens": 0}
 
-    context = [d['text'] for d in valid]
-    
-    # generate answer
-    ans = gemini_generator.generate_answer(context, query)
+    source_ids = [id_ for d in valid for id_ in d.get('ids', [d['id']])]
+    ans = answer_cache.get(query_vector=query_vector, source_ids=source_ids)
+    context_tokens = 0
+    if ans is None:
+        # generate answer from the docs that fit the prompt budget, best first
+        context = gemini_generator.pack_context(valid)
+        context_tokens = context.tokens
+        ans = await gemini_generator.generate_answer_async(context.texts, query)
+        if not ans.startswith(ERROR_PREFIX):
+            answer_cache.put(query_vector=query_vector, source_ids=source_ids, answer=ans)
 
     return {
         "query": query,
         "answer": ans,
-        "sources": [d['source'] for d in valid]
-    }
\ No newline at end of file
+        "sources": [d['source'] for d in valid],
+        "context_tokens": context_tokens,
+    }
+
+
+@rag_router.get("/search/stream")
+async def stream_search_documents(params: SearchParams = Depends()):
+    # NDJSON events: one "sources", then "token"s as Gemini streams, then "done"
+    # with the estimated context tokens sent to Gemini.
+    # Retrieval runs before the response starts so its errors keep their status
+    query = params.query
+    query_vector, valid = await retrieve_context(params)
+    source_ids = [id_ for d in valid for id_ in d.get('ids', [d['id']])]
+    cached = answer_cache.get(query_vector=query_vector, source_ids=source_ids) if valid else None
+
+    async def events():
+        yield to_ndjson({"type": "sources", "sources": [d['source'] for d in valid]})
+        context_tokens = 0
+        if not valid:
+            yield to_ndjson({"type": "token", "text": NO_RESULTS_ANSWER})
+        elif cached is not None:
+            yield to_ndjson({"type": "token", "text": cached})
+        else:
+            context = gemini_generator.pack_context(valid)
+            context_tokens = context.tokens
+            chunks = []
+            async for text in gemini_generator.stream_answer(context.texts, query):
+                chunks.append(text)
+                yield to_ndjson({"type": "token", "text": text})
+            if not any(text.startswith(ERROR_PREFIX) for text in chunks):
+                answer_cache.put(query_vector=query_vector, source_ids=source_ids, answer="".join(chunks))
+        yield to_ndjson({"type": "done", "context_tokens": context_tokens})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def to_ndjson(event: dict) -> bytes:
+    return json.dumps(event).encode() + b"\n"
+
+
+@rag_router.get("/metrics")
+async def get_metrics():
+    return {
+        "embedding": embedding_service.limiter.stats(),
+        "embedding_batches": embedding_service.batcher.stats(),
+        "query_embedding_cache": embedding_service.query_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "rerank": retrieval_service.rerank_stats(),
+        "generation": gemini_generator.limiter.stats(),
+    }
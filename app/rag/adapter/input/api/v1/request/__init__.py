@@ -1,3 +1,6 @@
+from typing import Literal
+
+from fastapi import Query
 from pydantic import BaseModel, Field
 
 class IngestRequest(BaseModel):
@@ -6,4 +9,29 @@ class IngestRequest(BaseModel):
     source_name: str=Field(...,description="Source of the info")
 
 class SearchRequests(BaseModel):
-    query: str=Field(...,description="The search query to find relevant documents")
\ No newline at end of file
+    query: str=Field(...,description="The search query to find relevant documents")
+
+
+class SearchParams:
+    """Query parameters shared by the search and retrieve endpoints, used as
+    ``params: SearchParams = Depends()``"""
+
+    def __init__(
+        self,
+        query: str = Query(..., description="The search query to find relevant documents"),
+        ef_search: int | None = Query(None, ge=1, description="HNSW beam width"),
+        nprobe: int | None = Query(None, ge=1, description="IVF lists to scan"),
+        mode: Literal["vector", "hybrid"] | None = Query(None, description="Retrieval mode"),
+        rerank: bool | None = Query(None, description="Cross-encoder re-ranking, on by default when configured"),
+        mmr_lambda: float | None = Query(None, ge=0, le=1, description="MMR relevance weight, 1 disables"),
+        mmr_pool: int | None = Query(None, ge=1, le=200, description="Candidates MMR picks from"),
+        source: list[str] | None = Query(None, description="Only search documents from these sources"),
+    ):
+        self.query = query
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+        self.mode = mode
+        self.rerank = rerank
+        self.mmr_lambda = mmr_lambda
+        self.mmr_pool = mmr_pool
+        self.source = source
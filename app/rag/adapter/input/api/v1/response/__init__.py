@@ -4,3 +4,19 @@ from pydantic import BaseModel, Field
 class LoginResponse(BaseModel):
     token: str = Field(..., description="Token")
     refresh_token: str = Field(..., description="Refresh token")
+
+
+class RetrievedDocument(BaseModel):
+    id: str = Field(..., description="Best scoring chunk id")
+    ids: list[str] = Field(..., description="Every chunk merged into this hit")
+    parent_id: str | None = Field(None, description="Ingested document the chunks belong to")
+    source: str = Field(..., description="Source of the info")
+    text: str | None = Field(None, description="Chunk text, omitted when include_text is false")
+    score: float = Field(..., description="Cosine, fused or re-ranker score, depending on the mode")
+
+
+class RetrieveResponse(BaseModel):
+    query: str = Field(..., description="The search query")
+    hits: list[RetrievedDocument] = Field(..., description="Best first")
+    embedding_ms: float = Field(..., description="Time spent embedding the query")
+    retrieval_ms: float = Field(..., description="Time spent searching and scoring")
@@ -0,0 +1,23 @@
+from .answer import SemanticAnswerCache
+from .query_embedding import QueryEmbeddingCache
+from core.config import config
+from core.helpers.redis import redis_bytes_client
+
+query_embedding_cache = QueryEmbeddingCache(
+    redis=redis_bytes_client,
+    namespace=f"{config.EMBEDDING_PROVIDER}:{config.MODEL_ID}",
+    max_size=config.QUERY_CACHE_SIZE,
+    ttl=config.QUERY_CACHE_TTL,
+)
+answer_cache = SemanticAnswerCache(
+    max_distance=config.ANSWER_CACHE_MAX_DISTANCE,
+    max_size=config.ANSWER_CACHE_SIZE,
+    ttl=config.ANSWER_CACHE_TTL,
+)
+
+__all__ = [
+    "QueryEmbeddingCache",
+    "SemanticAnswerCache",
+    "answer_cache",
+    "query_embedding_cache",
+]
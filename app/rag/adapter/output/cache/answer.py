@@ -0,0 +1,111 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.ops import l2_normalize, top_k
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    source_ids: frozenset[str]
+    expires_at: float
+
+
+class SemanticAnswerCache:
+    """Generated answers reused for near-duplicate questions.
+
+    A cached answer is served when the new query is within ``max_distance``
+    cosine distance of the cached one and retrieval returned the same
+    documents, so new or deleted documents naturally miss. Query vectors live
+    in a fixed ``(max_size, dim)`` matrix scanned exactly; slots are recycled
+    in LRU order.
+    """
+
+    def __init__(self, *, max_distance: float = 0.05, max_size: int = 1024, ttl: int = 3600):
+        self.max_distance = max_distance
+        self.max_size = max_size
+        self.ttl = ttl
+        self._vectors: np.ndarray | None = None
+        self._alive = np.zeros(max_size, dtype=bool)
+        # slot -> entry, least recently used first
+        self._entries: OrderedDict[int, CachedAnswer] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, *, query_vector: np.ndarray, source_ids: Sequence[str]) -> str | None:
+        if self._entries:
+            scores = self._scores(query_vector)
+            now = time.monotonic()
+            wanted = frozenset(source_ids)
+            for slot in top_k(scores, 4):
+                if scores[slot] < 1 - self.max_distance:
+                    break
+                entry = self._entries[slot]
+                if entry.expires_at <= now:
+                    self._evict(slot)
+                elif entry.source_ids == wanted:
+                    self._entries.move_to_end(slot)
+                    self.hits += 1
+                    return entry.answer
+        self.misses += 1
+        return None
+
+    def put(self, *, query_vector: np.ndarray, source_ids: Sequence[str], answer: str) -> None:
+        if self.max_size <= 0:
+            return
+
+        vector = l2_normalize(np.asarray(query_vector).reshape(-1))
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_size, vector.size), dtype=np.float32)
+        if len(self._entries) >= self.max_size:
+            self._evict(next(iter(self._entries)))
+
+        slot = int(np.argmin(self._alive))
+        self._vectors[slot] = vector
+        self._alive[slot] = True
+        self._entries[slot] = CachedAnswer(
+            answer=answer,
+            source_ids=frozenset(source_ids),
+            expires_at=time.monotonic() + self.ttl,
+        )
+
+    def invalidate_near(self, *, vector: np.ndarray, min_score: float) -> int:
+        """Drop answers whose query scores at least ``min_score`` against a new document"""
+        if not self._entries:
+            return 0
+        slots = np.flatnonzero(self._scores(vector) >= min_score)
+        for slot in slots:
+            self._evict(int(slot))
+        return len(slots)
+
+    def invalidate_source(self, *, id_: str) -> int:
+        """Drop answers built from a removed document"""
+        slots = [slot for slot, entry in self._entries.items() if id_ in entry.source_ids]
+        for slot in slots:
+            self._evict(slot)
+        return len(slots)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _scores(self, vector: np.ndarray) -> np.ndarray:
+        scores = self._vectors @ l2_normalize(np.asarray(vector).reshape(-1))
+        scores[~self._alive] = -np.inf
+        return scores
+
+    def _evict(self, slot: int) -> None:
+        del self._entries[slot]
+        self._alive[slot] = False
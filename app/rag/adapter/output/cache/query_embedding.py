@@ -0,0 +1,95 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.rag.adapter.output.persistence.mongo.vector_codec import decode_vector, encode_vector
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache of query embeddings: in-process LRU over Redis.
+
+    Keys include ``namespace`` (provider and model id), so switching models
+    starts from an empty cache instead of serving stale vectors. Redis
+    failures are treated as misses.
+    """
+
+    def __init__(
+        self,
+        *,
+        redis: Redis,
+        namespace: str,
+        max_size: int = 10_000,
+        ttl: int = 86_400,
+        prefix: str = "rag:query-embedding",
+    ):
+        self.redis = redis
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl = ttl
+        self.prefix = prefix
+        self._entries: OrderedDict[str, tuple[np.ndarray, float]] = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def get(self, *, text: str) -> np.ndarray | None:
+        key = self.key(text=text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            vector, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.local_hits += 1
+                return vector
+            del self._entries[key]
+
+        try:
+            value = await self.redis.get(key)
+        except RedisError:
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.redis_hits += 1
+        vector = decode_vector(value).astype(np.float32)
+        self._remember(key, vector)
+        return vector
+
+    async def set(self, *, text: str, vector: np.ndarray) -> None:
+        key = self.key(text=text)
+        self._remember(key, vector)
+        try:
+            await self.redis.set(key, bytes(encode_vector(vector)), ex=self.ttl)
+        except RedisError:
+            pass
+
+    def key(self, *, text: str) -> str:
+        digest = hashlib.sha256(normalize_query(text).encode()).hexdigest()
+        return f"{self.prefix}:{self.namespace}:{digest}"
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (vector, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -0,0 +1,16 @@
+from .executor import ExecutorEmbeddingProvider
+from .factory import create_embedding_provider
+from .hashing import HashingEmbeddingProvider
+from .huggingface import HuggingFaceEmbeddingProvider
+from .local import LocalEmbeddingProvider
+
+embedding_provider = create_embedding_provider()
+
+__all__ = [
+    "ExecutorEmbeddingProvider",
+    "HashingEmbeddingProvider",
+    "HuggingFaceEmbeddingProvider",
+    "LocalEmbeddingProvider",
+    "create_embedding_provider",
+    "embedding_provider",
+]
@@ -0,0 +1,27 @@
+import asyncio
+from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.domain.repository.embedding_provider import EmbeddingProvider
+
+
+class ExecutorEmbeddingProvider(EmbeddingProvider):
+    """Runs a blocking embedding call on a dedicated thread pool"""
+
+    def __init__(self, *, max_workers: int = 8):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=type(self).__name__,
+        )
+
+    async def embed(self, *, texts: Sequence[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(self._executor, self._embed, list(texts))
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+    @abstractmethod
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        """Blocking embedding call, run on the pool"""
@@ -0,0 +1,34 @@
+from app.rag.adapter.output.embedding.hashing import HashingEmbeddingProvider
+from app.rag.adapter.output.embedding.huggingface import HuggingFaceEmbeddingProvider
+from app.rag.adapter.output.embedding.local import LocalEmbeddingProvider
+from app.rag.domain.repository.embedding_provider import EmbeddingProvider
+from core.config import config
+
+PROVIDER_TYPES: dict[str, type[EmbeddingProvider]] = {
+    "huggingface": HuggingFaceEmbeddingProvider,
+    "local": LocalEmbeddingProvider,
+    "hashing": HashingEmbeddingProvider,
+}
+
+
+def create_embedding_provider(*, kind: str | None = None) -> EmbeddingProvider:
+    """Build the configured embedding backend"""
+    kind = kind or config.EMBEDDING_PROVIDER
+    if kind not in PROVIDER_TYPES:
+        raise ValueError(f"unknown embedding provider: {kind}")
+
+    if kind == "huggingface":
+        return HuggingFaceEmbeddingProvider(
+            model=config.MODEL_ID,
+            token=config.HF_TOKEN,
+            timeout=config.EMBEDDING_TIMEOUT,
+            max_workers=config.EMBEDDING_MAX_CONCURRENCY,
+        )
+    if kind == "local":
+        return LocalEmbeddingProvider(
+            model=config.MODEL_ID,
+            backend=config.EMBEDDING_LOCAL_BACKEND,
+            onnx_file=config.EMBEDDING_ONNX_FILE,
+            threads=config.EMBEDDING_THREADS,
+        )
+    return HashingEmbeddingProvider()
@@ -0,0 +1,29 @@
+import hashlib
+import re
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.domain.repository.embedding_provider import EmbeddingProvider
+
+TOKEN = re.compile(r"\w+")
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic signed bag-of-words hashing, for tests and offline runs.
+
+    Texts sharing words get a positive cosine similarity; there is no notion
+    of meaning beyond that.
+    """
+
+    def __init__(self, *, dim: int = 384):
+        self.dim = dim
+
+    async def embed(self, *, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                vectors[row, value % self.dim] += 1.0 if value >> 63 else -1.0
+        return vectors
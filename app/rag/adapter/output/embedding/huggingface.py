@@ -0,0 +1,23 @@
+import numpy as np
+from huggingface_hub import InferenceClient
+
+from app.rag.adapter.output.embedding.executor import ExecutorEmbeddingProvider
+
+
+class HuggingFaceEmbeddingProvider(ExecutorEmbeddingProvider):
+    def __init__(
+        self,
+        *,
+        model: str,
+        token: str,
+        timeout: float | None = None,
+        max_workers: int = 8,
+    ):
+        super().__init__(max_workers=max_workers)
+        self.model = model
+        self.client = InferenceClient(token=token, timeout=timeout)
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        # The endpoint accepts a list of inputs and returns one row per input
+        inputs = texts[0] if len(texts) == 1 else texts
+        return self.client.feature_extraction(inputs, model=self.model)
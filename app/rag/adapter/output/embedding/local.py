@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+
+from app.rag.adapter.output.embedding.executor import ExecutorEmbeddingProvider
+
+
+class LocalEmbeddingProvider(ExecutorEmbeddingProvider):
+    """Runs the sentence-transformers model in process on CPU.
+
+    The model is loaded once per process on first use. With ``backend="onnx"``
+    ``onnx_file`` selects an export shipped in the model repo, e.g. the
+    quantized ``onnx/model_qint8_avx512_vnni.onnx``. Needs the optional
+    ``sentence-transformers`` package (``sentence-transformers[onnx]`` for ONNX).
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        backend: str = "torch",
+        onnx_file: str = "",
+        threads: int = 0,
+        max_workers: int = 1,
+    ):
+        # One worker by default: the model already spreads a batch over
+        # ``threads`` cores, and the batcher upstream keeps batches full
+        super().__init__(max_workers=max_workers)
+        self.model_id = model
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.threads = threads
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        return self.load().encode(texts, batch_size=len(texts), convert_to_numpy=True)
+
+    def load(self):
+        """Load the model if needed; call at startup to keep it off the first request"""
+        with self._load_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise RuntimeError(
+                        "local embeddings need the sentence-transformers package"
+                    ) from e
+
+                model_kwargs = {}
+                if self.backend == "onnx":
+                    if self.onnx_file:
+                        model_kwargs["file_name"] = self.onnx_file
+                    if self.threads:
+                        import onnxruntime
+
+                        options = onnxruntime.SessionOptions()
+                        options.intra_op_num_threads = self.threads
+                        model_kwargs["session_options"] = options
+                elif self.threads:
+                    import torch
+
+                    torch.set_num_threads(self.threads)
+
+                self._model = SentenceTransformer(
+                    self.model_id,
+                    device="cpu",
+                    backend=self.backend,
+                    model_kwargs=model_kwargs or None,
+                )
+            return self._model
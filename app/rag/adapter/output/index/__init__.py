@@ -0,0 +1,48 @@
+from functools import cache
+
+from core.config import config
+
+from .binary import BinaryQuantizedVectorIndex
+from .factory import create_vector_index
+from .flat import FlatVectorIndex
+from .hnsw import HNSWVectorIndex
+from .ivf import IVFVectorIndex
+from .lexical import BM25Index
+from .metadata import MetadataIndex
+from .pq import PQVectorIndex, ProductQuantizer
+from .scalar import ScalarQuantizedVectorIndex
+from .segment import SegmentedVectorIndex
+
+lexical_index = BM25Index(k1=config.BM25_K1, b=config.BM25_B) if config.LEXICAL_INDEX_ENABLED else None
+metadata_index = MetadataIndex(fields=config.METADATA_FILTER_FIELDS)
+
+
+@cache
+def _vector_index():
+    return create_vector_index()
+
+
+def __getattr__(name: str):
+    # ``vector_index`` is built on first use: Celery workers import these
+    # modules but never search, so they skip loading the snapshot or mapping
+    # the segment files
+    if name == "vector_index":
+        return _vector_index()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = [
+    "BM25Index",
+    "BinaryQuantizedVectorIndex",
+    "FlatVectorIndex",
+    "HNSWVectorIndex",
+    "IVFVectorIndex",
+    "MetadataIndex",
+    "PQVectorIndex",
+    "ProductQuantizer",
+    "ScalarQuantizedVectorIndex",
+    "SegmentedVectorIndex",
+    "create_vector_index",
+    "lexical_index",
+    "metadata_index",
+    "vector_index",
+]
@@ -0,0 +1,54 @@
+import threading
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.domain.repository.vector_index import VectorIndex
+
+
+class BaseVectorIndex(VectorIndex):
+    """Id bookkeeping shared by the in-process indexes.
+
+    Rows are append-only: re-adding an id or removing it tombstones the old
+    row instead of moving data around.
+    """
+
+    def __init__(self):
+        self._ids: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._deleted: set[int] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._positions
+
+    def remove(self, *, ids: Sequence[str]) -> None:
+        with self._lock:
+            for id_ in ids:
+                position = self._positions.pop(str(id_), None)
+                if position is not None:
+                    self._deleted.add(position)
+
+    def _assign(self, *, ids: Sequence[str], start: int) -> None:
+        """Map ``ids`` to consecutive rows from ``start``, caller holds the lock"""
+        for offset, id_ in enumerate(ids):
+            id_ = str(id_)
+            if id_ in self._positions:
+                self._deleted.add(self._positions[id_])
+            self._positions[id_] = start + offset
+            self._ids.append(id_)
+
+    def _alive_positions(self) -> np.ndarray:
+        alive = np.fromiter(self._positions.values(), dtype=np.int64)
+        alive.sort()
+        return alive
+
+    @staticmethod
+    def _check_batch(ids: Sequence[str], vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("ids and vectors length mismatch")
+        return vectors
@@ -0,0 +1,111 @@
+from typing import Any, Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.base import BaseVectorIndex
+from app.rag.adapter.output.index.buffer import VectorBuffer
+from app.rag.adapter.output.index.ops import atomic_savez, top_k
+from app.rag.domain.vo.search_hit import SearchHit
+
+BLOCK_ROWS = 65_536
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def pack_signs(vectors: np.ndarray) -> np.ndarray:
+    """One bit per component (1 when positive), 384 dims -> 48 bytes"""
+    return np.packbits(np.atleast_2d(vectors) > 0, axis=1)
+
+
+def hamming_distances(codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Popcount of ``codes XOR query`` per row"""
+    if codes.shape[1] % 8 == 0:
+        # XOR whole 64 bit words instead of single bytes
+        codes, query = codes.view(np.uint64), query.view(np.uint64)
+
+    xor = np.bitwise_xor(codes, query)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_TABLE[xor.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+class BinaryQuantizedVectorIndex(BaseVectorIndex):
+    """Sign-bit codes searched by Hamming distance, 32x smaller than float32.
+
+    Meant as a cheap first stage: the returned score is only the cosine
+    estimate ``cos(pi * hamming / bits)``, so callers re-rank a generous
+    shortlist against full precision vectors.
+    """
+
+    exact = False
+    # sign bits lose more than int8 or pq codes: 4x recalls about 0.90 of
+    # the top 10, 10x about 0.99
+    rerank_oversample = 10
+
+    def __init__(self, *, dim: int | None = None, initial_capacity: int = 1024):
+        super().__init__()
+        self.dim = dim
+        self._codes = VectorBuffer(
+            dim=None if dim is None else (dim + 7) // 8,
+            initial_capacity=initial_capacity,
+            dtype=np.uint8,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.data.nbytes
+
+    def add(self, *, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = self._check_batch(ids, vectors)
+        if not len(ids):
+            return
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"expected dim {self.dim}, got {vectors.shape[1]}")
+            start = self._codes.append(pack_signs(vectors))
+            self._assign(ids=ids, start=start)
+
+    def search(self, *, vector: np.ndarray, k: int, **params: Any) -> list[SearchHit]:
+        with self._lock:
+            ids, deleted = self._ids, list(self._deleted)
+            codes = self._codes.data[: len(ids)]
+        if not len(codes):
+            return []
+
+        query = pack_signs(np.asarray(vector, dtype=np.float32).reshape(-1))
+        distances = np.empty(len(codes), dtype=np.int32)
+        for start in range(0, len(codes), BLOCK_ROWS):
+            block = codes[start : start + BLOCK_ROWS]
+            distances[start : start + len(block)] = hamming_distances(block, query)
+
+        scores = -distances.astype(np.float32)
+        if deleted:
+            scores[deleted] = -np.inf
+
+        return [
+            SearchHit(id=ids[i], score=float(np.cos(np.pi * distances[i] / self.dim)))
+            for i in top_k(scores, k)
+            if np.isfinite(scores[i])
+        ]
+
+    def save(self, *, path: str) -> None:
+        with self._lock:
+            alive = self._alive_positions()
+            atomic_savez(
+                path,
+                codes=self._codes.data[alive],
+                ids=np.array([self._ids[i] for i in alive], dtype=str),
+                dim=np.array(self.dim),
+            )
+
+    @classmethod
+    def load(cls, *, path: str) -> "BinaryQuantizedVectorIndex":
+        with np.load(path, allow_pickle=False) as data:
+            codes, ids, dim = data["codes"], data["ids"].tolist(), int(data["dim"])
+
+        index = cls(dim=dim, initial_capacity=max(len(ids), 1024))
+        index._codes.append(codes)
+        index._assign(ids=ids, start=0)
+        return index
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class VectorBuffer:
+    """Append-only matrix with amortized doubling growth"""
+
+    def __init__(
+        self,
+        *,
+        dim: int | None = None,
+        initial_capacity: int = 1024,
+        dtype: np.dtype = np.float32,
+    ):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self._capacity = max(initial_capacity, 1)
+        self._data = np.empty((self._capacity, dim or 0), dtype=self.dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def data(self) -> np.ndarray:
+        """View over the filled rows"""
+        return self._data[: self._size]
+
+    def append(self, vectors: np.ndarray) -> int:
+        """Append rows and return the position of the first one"""
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._data = np.empty((self._capacity, self.dim), dtype=self.dtype)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"expected dim {self.dim}, got {vectors.shape[1]}")
+
+        start = self._size
+        self._reserve(start + len(vectors))
+        self._data[start : start + len(vectors)] = vectors
+        self._size = start + len(vectors)
+        return start
+
+    def _reserve(self, size: int) -> None:
+        if size <= self._capacity:
+            return
+
+        capacity = self._capacity
+        while capacity < size:
+            capacity *= 2
+
+        data = np.empty((capacity, self.dim), dtype=self.dtype)
+        data[: self._size] = self._data[: self._size]
+        self._data = data
+        self._capacity = capacity
@@ -0,0 +1,46 @@
+from typing import Any
+
+import numpy as np
+
+from app.rag.adapter.output.index.rerank import rerank_exact
+from app.rag.domain.repository.vector_index import VectorIndex
+
+
+def recall_at_k(
+    *,
+    index: VectorIndex,
+    exact: VectorIndex,
+    queries: np.ndarray,
+    k: int,
+    **params: Any,
+) -> float:
+    """Fraction of the exact top k that ``index`` also returns"""
+    found = 0
+    for query in queries:
+        truth = {hit.id for hit in exact.search(vector=query, k=k)}
+        approx = {hit.id for hit in index.search(vector=query, k=k, **params)}
+        found += len(truth & approx)
+    return found / (k * len(queries))
+
+
+def reranked_recall_at_k(
+    *,
+    index: VectorIndex,
+    exact: VectorIndex,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    oversample: int,
+) -> float:
+    """Recall of ``index`` shortlists of ``k * oversample`` re-ranked exactly.
+
+    ``corpus`` rows must be indexed under their position as id.
+    """
+    found = 0
+    for query in queries:
+        truth = {hit.id for hit in exact.search(vector=query, k=k)}
+        shortlist = [hit.id for hit in index.search(vector=query, k=k * oversample)]
+        positions = [int(id_) for id_ in shortlist]
+        hits = rerank_exact(query=query, ids=shortlist, vectors=corpus[positions], k=k)
+        found += len(truth & {hit.id for hit in hits})
+    return found / (k * len(queries))
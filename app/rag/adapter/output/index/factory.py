@@ -0,0 +1,57 @@
+import os
+
+from app.rag.adapter.output.index.binary import BinaryQuantizedVectorIndex
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+from app.rag.adapter.output.index.hnsw import HNSWVectorIndex
+from app.rag.adapter.output.index.ivf import IVFVectorIndex
+from app.rag.adapter.output.index.pq import PQVectorIndex
+from app.rag.adapter.output.index.scalar import ScalarQuantizedVectorIndex
+from app.rag.adapter.output.index.segment import SegmentedVectorIndex
+from app.rag.domain.repository.vector_index import VectorIndex
+from core.config import config
+
+INDEX_TYPES: dict[str, type[VectorIndex]] = {
+    "flat": FlatVectorIndex,
+    "hnsw": HNSWVectorIndex,
+    "int8": ScalarQuantizedVectorIndex,
+    "binary": BinaryQuantizedVectorIndex,
+    "ivf": IVFVectorIndex,
+    "pq": PQVectorIndex,
+    "segment": SegmentedVectorIndex,
+}
+
+
+def create_vector_index(*, kind: str | None = None, path: str | None = None) -> VectorIndex:
+    """Build the configured index, restoring the on-disk snapshot if present"""
+    kind = kind or config.VECTOR_INDEX_TYPE
+    path = config.VECTOR_INDEX_PATH if path is None else path
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"unknown vector index type: {kind}")
+
+    if kind == "segment":
+        if not path:
+            raise ValueError("segment index needs VECTOR_INDEX_PATH to point at a directory")
+        return SegmentedVectorIndex(
+            directory=path,
+            seal_rows=config.SEGMENT_SEAL_ROWS,
+            seal_age=config.SEGMENT_SEAL_AGE,
+            merge_factor=config.SEGMENT_MERGE_FACTOR,
+        )
+    if path and os.path.exists(path):
+        index = INDEX_TYPES[kind].load(path=path)
+        if isinstance(index, PQVectorIndex):
+            index.train_in_background = True
+        return index
+
+    if kind == "hnsw":
+        return HNSWVectorIndex(
+            m=config.HNSW_M,
+            ef_construction=config.HNSW_EF_CONSTRUCTION,
+            ef_search=config.HNSW_EF_SEARCH,
+        )
+    if kind == "ivf":
+        return IVFVectorIndex(nprobe=config.IVF_NPROBE)
+    if kind == "pq":
+        # codebook training takes seconds; keep it off the adding thread
+        return PQVectorIndex(m=config.PQ_M, train_size=config.PQ_TRAIN_SIZE, train_in_background=True)
+    return INDEX_TYPES[kind]()
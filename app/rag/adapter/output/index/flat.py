@@ -0,0 +1,76 @@
+from typing import Any, Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.base import BaseVectorIndex
+from app.rag.adapter.output.index.buffer import VectorBuffer
+from app.rag.adapter.output.index.ops import atomic_savez, l2_normalize, top_k
+from app.rag.domain.vo.search_hit import SearchHit
+
+
+class FlatVectorIndex(BaseVectorIndex):
+    """Exact cosine search over a contiguous float32 matrix.
+
+    Vectors are L2-normalized on insert so a query is a single
+    matrix-vector product followed by ``argpartition``.
+    """
+
+    def __init__(self, *, dim: int | None = None, initial_capacity: int = 1024):
+        super().__init__()
+        self._vectors = VectorBuffer(dim=dim, initial_capacity=initial_capacity)
+
+    @property
+    def dim(self) -> int | None:
+        return self._vectors.dim
+
+    def add(self, *, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = self._check_batch(ids, vectors)
+        if not len(ids):
+            return
+
+        with self._lock:
+            start = self._vectors.append(l2_normalize(vectors))
+            self._assign(ids=ids, start=start)
+
+    def search(self, *, vector: np.ndarray, k: int, **params: Any) -> list[SearchHit]:
+        # Snapshot under the lock, rows cut to the ids assigned so far, so an
+        # add() on another thread neither reallocates nor outruns us
+        with self._lock:
+            ids, deleted = self._ids, list(self._deleted)
+            matrix = self._vectors.data[: len(ids)]
+        if not len(matrix):
+            return []
+
+        query = l2_normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+        scores = matrix @ query
+        if deleted:
+            scores[deleted] = -np.inf
+
+        return [
+            SearchHit(id=ids[i], score=float(scores[i]))
+            for i in top_k(scores, k)
+            if np.isfinite(scores[i])
+        ]
+
+    def get_vectors(self, *, ids: Sequence[str]) -> tuple[list[str], np.ndarray]:
+        with self._lock:
+            found = [str(id_) for id_ in ids if str(id_) in self._positions]
+            return found, self._vectors.data[[self._positions[id_] for id_ in found]]
+
+    def save(self, *, path: str) -> None:
+        with self._lock:
+            alive = self._alive_positions()
+            atomic_savez(
+                path,
+                vectors=self._vectors.data[alive],
+                ids=np.array([self._ids[i] for i in alive], dtype=str),
+            )
+
+    @classmethod
+    def load(cls, *, path: str) -> "FlatVectorIndex":
+        with np.load(path, allow_pickle=False) as data:
+            vectors, ids = data["vectors"], data["ids"].tolist()
+
+        index = cls(dim=vectors.shape[1], initial_capacity=max(len(ids), 1024))
+        index.add(ids=ids, vectors=vectors)
+        return index
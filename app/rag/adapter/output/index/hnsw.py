@@ -0,0 +1,262 @@
+import heapq
+import threading
+from typing import Any, Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.base import BaseVectorIndex
+from app.rag.adapter.output.index.buffer import VectorBuffer
+from app.rag.adapter.output.index.ops import atomic_savez, l2_normalize
+from app.rag.domain.vo.search_hit import SearchHit
+
+
+class HNSWVectorIndex(BaseVectorIndex):
+    """Hierarchical Navigable Small World graph (Malkov & Yashunin).
+
+    ``m`` bounds the links per node (``2 * m`` on the bottom layer),
+    ``ef_construction`` is the beam width while inserting and ``ef_search``
+    the default beam width while querying; pass ``ef_search`` to ``search``
+    to trade latency for recall per request. Removed ids are tombstoned:
+    they keep routing queries through the graph but are never returned.
+    """
+
+    def __init__(
+        self,
+        *,
+        dim: int | None = None,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        seed: int | None = None,
+        initial_capacity: int = 1024,
+    ):
+        super().__init__()
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._level_mult = 1 / np.log(max(m, 2))
+        self._rng = np.random.default_rng(seed)
+        self._vectors = VectorBuffer(dim=dim, initial_capacity=initial_capacity)
+        self._levels: list[int] = []
+        self._graph: list[list[list[int]]] = []
+        self._entry_point: tuple[int, int] | None = None
+        # serializes adds, which link nodes outside ``_lock`` between steps
+        self._write_lock = threading.Lock()
+
+    @property
+    def dim(self) -> int | None:
+        return self._vectors.dim
+
+    def add(self, *, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = self._check_batch(ids, vectors)
+        if not len(ids):
+            return
+
+        with self._write_lock:
+            with self._lock:
+                start = self._vectors.append(l2_normalize(vectors))
+                self._assign(ids=ids, start=start)
+            # one node at a time, so searches are not held up for a whole batch
+            for node in range(start, start + len(ids)):
+                with self._lock:
+                    self._insert(node)
+
+    def search(
+        self,
+        *,
+        vector: np.ndarray,
+        k: int,
+        ef_search: int | None = None,
+        **params: Any,
+    ) -> list[SearchHit]:
+        query = l2_normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+        with self._lock:
+            if self._entry_point is None or k <= 0:
+                return []
+
+            vectors = self._vectors.data
+            entry, max_level = self._entry_point
+            for level in range(max_level, 0, -1):
+                entry = self._search_layer(query, [entry], 1, level, vectors)[0][1]
+
+            # Widen the beam until enough live nodes survive the tombstones
+            ef = max(ef_search or self.ef_search, k)
+            while True:
+                results = self._search_layer(query, [entry], ef, 0, vectors)
+                hits = [(s, n) for s, n in results if n not in self._deleted]
+                if len(hits) >= k or ef >= len(vectors):
+                    break
+                ef *= 2
+
+            return [SearchHit(id=self._ids[n], score=s) for s, n in hits[:k]]
+
+    def get_vectors(self, *, ids: Sequence[str]) -> tuple[list[str], np.ndarray]:
+        with self._lock:
+            found = [str(id_) for id_ in ids if str(id_) in self._positions]
+            return found, self._vectors.data[[self._positions[id_] for id_ in found]]
+
+    def save(self, *, path: str) -> None:
+        with self._write_lock, self._lock:
+            lists = [links for node_links in self._graph for links in node_links]
+            offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(links) for links in lists])
+            entry, max_level = self._entry_point or (-1, -1)
+            atomic_savez(
+                path,
+                vectors=self._vectors.data,
+                ids=np.array(self._ids, dtype=str),
+                deleted=np.array(sorted(self._deleted), dtype=np.int64),
+                levels=np.array(self._levels, dtype=np.int32),
+                offsets=offsets,
+                neighbours=np.fromiter(
+                    (n for links in lists for n in links), dtype=np.int32
+                ),
+                params=np.array(
+                    [self.m, self.ef_construction, self.ef_search, entry, max_level]
+                ),
+            )
+
+    @classmethod
+    def load(cls, *, path: str) -> "HNSWVectorIndex":
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+
+        m, ef_construction, ef_search, entry, max_level = arrays["params"].tolist()
+        vectors = arrays["vectors"]
+        index = cls(
+            dim=vectors.shape[1],
+            m=m,
+            ef_construction=ef_construction,
+            ef_search=ef_search,
+            initial_capacity=max(len(vectors), 1024),
+        )
+        index._vectors.append(vectors)
+        index._ids = arrays["ids"].tolist()
+        index._deleted = set(arrays["deleted"].tolist())
+        index._positions = {
+            id_: node
+            for node, id_ in enumerate(index._ids)
+            if node not in index._deleted
+        }
+        index._levels = arrays["levels"].tolist()
+
+        offsets, neighbours = arrays["offsets"], arrays["neighbours"].tolist()
+        cursor = 0
+        for level in index._levels:
+            index._graph.append(
+                [
+                    neighbours[offsets[cursor + i] : offsets[cursor + i + 1]]
+                    for i in range(level + 1)
+                ]
+            )
+            cursor += level + 1
+
+        if entry >= 0:
+            index._entry_point = (entry, max_level)
+        return index
+
+    def _insert(self, node: int) -> None:
+        vectors = self._vectors.data
+        query = vectors[node]
+        level = int(-np.log(1.0 - self._rng.random()) * self._level_mult)
+        self._levels.append(level)
+        self._graph.append([[] for _ in range(level + 1)])
+
+        if self._entry_point is None:
+            self._entry_point = (node, level)
+            return
+
+        entry, max_level = self._entry_point
+        for lc in range(max_level, level, -1):
+            entry = self._search_layer(query, [entry], 1, lc, vectors)[0][1]
+
+        entry_points = [entry]
+        for lc in range(min(level, max_level), -1, -1):
+            candidates = self._search_layer(
+                query, entry_points, self.ef_construction, lc, vectors
+            )
+            neighbours = self._select_neighbours(candidates, self.m, vectors)
+            self._graph[node][lc] = neighbours
+
+            max_links = 2 * self.m if lc == 0 else self.m
+            for neighbour in neighbours:
+                links = self._graph[neighbour][lc] + [node]
+                if len(links) > max_links:
+                    scores = vectors[links] @ vectors[neighbour]
+                    ranked = sorted(zip(scores.tolist(), links), reverse=True)
+                    links = self._select_neighbours(ranked, max_links, vectors)
+                self._graph[neighbour][lc] = links
+
+            entry_points = [n for _, n in candidates]
+
+        if level > max_level:
+            self._entry_point = (node, level)
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: list[int],
+        ef: int,
+        level: int,
+        vectors: np.ndarray,
+    ) -> list[tuple[float, int]]:
+        """Beam search on one layer, returns (similarity, node) best first"""
+        visited = set(entry_points)
+        scores = (vectors[entry_points] @ query).tolist()
+        candidates = [(-s, n) for s, n in zip(scores, entry_points)]
+        results = [(s, n) for s, n in zip(scores, entry_points)]
+        heapq.heapify(candidates)
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            negative_score, current = heapq.heappop(candidates)
+            if -negative_score < results[0][0] and len(results) >= ef:
+                break
+
+            neighbours = [n for n in self._graph[current][level] if n not in visited]
+            if not neighbours:
+                continue
+
+            visited.update(neighbours)
+            for score, neighbour in zip((vectors[neighbours] @ query).tolist(), neighbours):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbour))
+                    heapq.heappush(results, (score, neighbour))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    @staticmethod
+    def _select_neighbours(
+        candidates: list[tuple[float, int]],
+        m: int,
+        vectors: np.ndarray,
+    ) -> list[int]:
+        """Neighbour selection heuristic, keeping pruned links to fill ``m``"""
+        if len(candidates) <= m:
+            return [c for _, c in candidates]
+
+        nodes = [c for _, c in candidates]
+        scores = np.array([s for s, _ in candidates], dtype=np.float32)
+        pairwise = vectors[nodes] @ vectors[nodes].T
+        # A candidate is kept when it is closer to the query than to any
+        # neighbour already kept; track that bound for all candidates at once
+        closest_kept = np.full(len(nodes), -np.inf, dtype=np.float32)
+        selected: list[int] = []
+        start = 0
+        while len(selected) < m:
+            eligible = np.flatnonzero(scores[start:] > closest_kept[start:])
+            if not eligible.size:
+                break
+            i = start + int(eligible[0])
+            selected.append(i)
+            np.maximum(closest_kept, pairwise[i], out=closest_kept)
+            start = i + 1
+
+        if len(selected) < m:
+            chosen = set(selected)
+            selected += [i for i in range(len(nodes)) if i not in chosen][: m - len(selected)]
+        return [nodes[i] for i in selected]
@@ -0,0 +1,235 @@
+from typing import Any, Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.base import BaseVectorIndex
+from app.rag.adapter.output.index.buffer import VectorBuffer
+from app.rag.adapter.output.index.ops import atomic_savez, l2_normalize, top_k
+from app.rag.domain.vo.search_hit import SearchHit
+
+ASSIGN_BATCH_ROWS = 16_384
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (max cosine) per normalized row"""
+    lists = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BATCH_ROWS):
+        batch = vectors[start : start + ASSIGN_BATCH_ROWS]
+        lists[start : start + len(batch)] = np.argmax(batch @ centroids.T, axis=1)
+    return lists
+
+
+def train_kmeans(
+    vectors: np.ndarray,
+    *,
+    nlist: int,
+    iterations: int = 20,
+    seed: int = 0,
+) -> np.ndarray:
+    """Spherical k-means, returns ``nlist`` unit-norm centroids"""
+    vectors = l2_normalize(vectors)
+    nlist = min(nlist, len(vectors))
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)]
+    for _ in range(iterations):
+        lists = assign_lists(vectors, centroids)
+        order = np.argsort(lists, kind="stable")
+        members, starts = np.unique(lists[order], return_index=True)
+        sums = np.add.reduceat(vectors[order], starts, axis=0)
+
+        updated = centroids.copy()
+        updated[members] = l2_normalize(sums)
+        # Re-seed empty lists so every centroid stays useful
+        empty = np.setdiff1d(np.arange(nlist), members)
+        if empty.size:
+            updated[empty] = vectors[rng.choice(len(vectors), empty.size, replace=False)]
+        centroids = updated
+    return centroids.astype(np.float32)
+
+
+class IVFVectorIndex(BaseVectorIndex):
+    """Inverted file index: vectors partitioned by a k-means coarse quantizer.
+
+    A query is scored against the centroids first and only the ``nprobe``
+    closest lists are scanned. Until centroids are set every vector lives in
+    a single list, which makes the index behave like a flat scan.
+    """
+
+    def __init__(
+        self,
+        *,
+        dim: int | None = None,
+        nprobe: int = 16,
+        centroids: np.ndarray | None = None,
+        centroids_version: int | None = None,
+    ):
+        super().__init__()
+        self.dim = dim
+        self.nprobe = nprobe
+        self.centroids_version = centroids_version
+        if centroids is None:
+            self._partition: tuple[np.ndarray | None, list[InvertedList]] = (None, [InvertedList()])
+        else:
+            centroids = l2_normalize(centroids)
+            self._partition = (centroids, [InvertedList() for _ in centroids])
+
+    @property
+    def centroids(self) -> np.ndarray | None:
+        return self._partition[0]
+
+    @property
+    def nlist(self) -> int:
+        return len(self._partition[1])
+
+    def add(self, *, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = self._check_batch(ids, vectors)
+        if not len(ids):
+            return
+
+        vectors = l2_normalize(vectors)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            start = len(self._ids)
+            self._assign(ids=ids, start=start)
+            route(self._partition, vectors, np.arange(start, start + len(ids)))
+
+    def search(
+        self,
+        *,
+        vector: np.ndarray,
+        k: int,
+        nprobe: int | None = None,
+        **params: Any,
+    ) -> list[SearchHit]:
+        query = l2_normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+        # ids are assigned before rows are routed, so every listed row has one
+        with self._lock:
+            (centroids, lists), ids, deleted = self._partition, self._ids, list(self._deleted)
+        if centroids is None:
+            probes = [0]
+        else:
+            probes = top_k(centroids @ query, nprobe or self.nprobe)
+
+        scores, rows = [], []
+        for probe in probes:
+            vectors, positions = lists[probe].snapshot()
+            if len(positions):
+                scores.append(vectors @ query)
+                rows.append(positions)
+        if not scores:
+            return []
+
+        scores, rows = np.concatenate(scores), np.concatenate(rows)
+        if deleted:
+            scores[np.isin(rows, deleted)] = -np.inf
+
+        return [
+            SearchHit(id=ids[rows[i]], score=float(scores[i]))
+            for i in top_k(scores, k)
+            if np.isfinite(scores[i])
+        ]
+
+    def set_centroids(self, *, centroids: np.ndarray, version: int | None = None) -> None:
+        """Re-partition every stored vector under a newly trained quantizer.
+
+        The regrouping runs without holding the lock; rows ingested meanwhile
+        are moved over just before the new partition is swapped in.
+        """
+        centroids = l2_normalize(centroids)
+        with self._lock:
+            vectors, rows = gather(self._partition[1])
+            seen = len(self._ids)
+
+        partition = (centroids, [InvertedList() for _ in centroids])
+        route(partition, vectors, rows)
+
+        with self._lock:
+            vectors, rows = gather(self._partition[1], from_row=seen)
+            route(partition, vectors, rows)
+            self._partition = partition
+            self.centroids_version = version
+
+    def save(self, *, path: str) -> None:
+        with self._lock:
+            vectors, rows = gather(self._partition[1])
+            alive = np.isin(rows, list(self._deleted), invert=True)
+            arrays = {
+                "vectors": vectors[alive],
+                "ids": np.array([self._ids[row] for row in rows[alive]], dtype=str),
+                "params": np.array([self.nprobe, self.centroids_version or -1]),
+            }
+            if self.centroids is not None:
+                arrays["centroids"] = self.centroids
+            atomic_savez(path, **arrays)
+
+    @classmethod
+    def load(cls, *, path: str) -> "IVFVectorIndex":
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+
+        nprobe, version = arrays["params"].tolist()
+        index = cls(
+            dim=arrays["vectors"].shape[1],
+            nprobe=nprobe,
+            centroids=arrays.get("centroids"),
+            centroids_version=None if version < 0 else version,
+        )
+        index.add(ids=arrays["ids"].tolist(), vectors=arrays["vectors"])
+        return index
+
+
+class InvertedList:
+    """Contiguous vectors of one partition plus their global row numbers"""
+
+    def __init__(self):
+        self.vectors = VectorBuffer(initial_capacity=16)
+        self.rows = VectorBuffer(dim=1, initial_capacity=16, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def append(self, vectors: np.ndarray, rows: np.ndarray) -> None:
+        self.vectors.append(vectors)
+        self.rows.append(rows[:, None])
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray]:
+        size = min(len(self.vectors), len(self.rows))
+        return self.vectors.data[:size], self.rows.data[:size, 0]
+
+
+def route(
+    partition: tuple[np.ndarray | None, list[InvertedList]],
+    vectors: np.ndarray,
+    rows: np.ndarray,
+) -> None:
+    """Append normalized vectors to their nearest lists"""
+    centroids, lists = partition
+    if not len(rows):
+        return
+    if centroids is None:
+        lists[0].append(vectors, rows)
+        return
+
+    assigned = assign_lists(vectors, centroids)
+    order = np.argsort(assigned, kind="stable")
+    members, starts = np.unique(assigned[order], return_index=True)
+    for list_no, group in zip(members, np.split(order, starts[1:])):
+        lists[list_no].append(vectors[group], rows[group])
+
+
+def gather(lists: list[InvertedList], *, from_row: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate the vectors and rows of every list, optionally only new rows"""
+    vectors, rows = [], []
+    for inverted_list in lists:
+        list_vectors, list_rows = inverted_list.snapshot()
+        if from_row:
+            recent = list_rows >= from_row
+            list_vectors, list_rows = list_vectors[recent], list_rows[recent]
+        if len(list_rows):
+            vectors.append(list_vectors)
+            rows.append(list_rows)
+
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.int64)
+    return np.concatenate(vectors), np.concatenate(rows)
@@ -0,0 +1,143 @@
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.ops import top_k
+from app.rag.domain.vo.search_hit import SearchHit
+
+WORD = re.compile(r"\w+")
+# Matching on these alone would rank every document
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its "
+    "of on or she that the their them they this to was were what when where "
+    "which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Casefolded NFKC words, without stopwords"""
+    return [
+        word
+        for word in WORD.findall(unicodedata.normalize("NFKC", text).casefold())
+        if word not in STOPWORDS
+    ]
+
+
+class _Postings:
+    """Row numbers and term frequencies of one term, 4 bytes per entry"""
+
+    __slots__ = ("rows", "freqs")
+
+    def __init__(self):
+        self.rows = array("i")
+        self.freqs = array("f")
+
+
+class BM25Index:
+    """In-memory inverted index scored with Okapi BM25.
+
+    Postings are typed arrays per term, turned into numpy arrays at query
+    time so each term's scores are summed with a single ``bincount``
+    instead of looping over documents. Like the
+    vector indexes, rows are append-only and removal tombstones them;
+    document frequencies still count tombstoned rows until the index is
+    rebuilt, which only matters after heavy deletion. Not persisted: it is
+    rebuilt from Mongo on startup.
+    """
+
+    def __init__(self, *, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, _Postings] = {}
+        self._ids: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._lengths = np.empty(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._positions
+
+    def add(self, *, ids: Sequence[str], texts: Sequence[str]) -> None:
+        if len(ids) != len(texts):
+            raise ValueError("ids and texts length mismatch")
+
+        tokenized = [tokenize(text) for text in texts]
+        with self._lock:
+            for id_, tokens in zip(ids, tokenized):
+                id_ = str(id_)
+                self._remove(id_)
+                row = len(self._ids)
+                self._reserve(row + 1)
+                self._ids.append(id_)
+                self._positions[id_] = row
+                self._lengths[row] = len(tokens)
+                self._alive[row] = True
+                self._total_length += len(tokens)
+                for term, freq in Counter(tokens).items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = _Postings()
+                    postings.rows.append(row)
+                    postings.freqs.append(freq)
+
+    def remove(self, *, ids: Sequence[str]) -> None:
+        with self._lock:
+            for id_ in ids:
+                self._remove(str(id_))
+
+    def search(self, *, query: str, k: int) -> list[SearchHit]:
+        """Top k documents by BM25 score; documents sharing no term are left out"""
+        with self._lock:
+            count = len(self._positions)
+            rows = len(self._ids)
+            lengths, alive, ids = self._lengths, self._alive, self._ids
+            # copied out: an array cannot grow while numpy views it
+            postings = [
+                (np.array(p.rows, dtype=np.int32), np.array(p.freqs, dtype=np.float32))
+                for p in map(self._postings.get, set(tokenize(query)))
+                if p is not None
+            ]
+            average_length = self._total_length / count if count else 0.0
+        if not postings or not count:
+            return []
+
+        norms = self.k1 * (1 - self.b + self.b * lengths[:rows] / max(average_length, 1e-9))
+        scores = np.zeros(rows, dtype=np.float32)
+        for term_rows, freqs in postings:
+            idf = math.log(1 + (count - len(term_rows) + 0.5) / (len(term_rows) + 0.5))
+            weights = idf * freqs * (self.k1 + 1) / (freqs + norms[term_rows])
+            scores += np.bincount(term_rows, weights=weights, minlength=rows).astype(np.float32)
+        scores[~alive[:rows]] = 0.0
+
+        return [
+            SearchHit(id=ids[i], score=float(scores[i]))
+            for i in top_k(scores, k)
+            if scores[i] > 0
+        ]
+
+    def _remove(self, id_: str) -> None:
+        """Tombstone ``id_``'s row if indexed, caller holds the lock"""
+        row = self._positions.pop(id_, None)
+        if row is not None:
+            self._alive[row] = False
+            self._total_length -= float(self._lengths[row])
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._lengths):
+            return
+        capacity = len(self._lengths)
+        while capacity < size:
+            capacity *= 2
+        self._lengths = np.concatenate([self._lengths, np.empty(capacity - len(self._lengths), dtype=np.float32)])
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from app.rag.adapter.output.index.lexical import BM25Index
+from app.rag.adapter.output.index.metadata import MetadataIndex
+from app.rag.adapter.output.persistence.mongo import RagDocumentMongoRepo
+from app.rag.domain.repository.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+async def load_vector_index(
+    *,
+    index: VectorIndex,
+    repo: RagDocumentMongoRepo,
+    batch_size: int = 10_000,
+    since: datetime | None = None,
+) -> int:
+    """Fill ``index`` with every embedding stored in Mongo.
+
+    Called on startup, then periodically with ``since`` to pick up documents
+    stored by other processes (Celery ingestion). Ids already in the index,
+    from this process or an on-disk snapshot, are skipped.
+    """
+    loaded = 0
+    async for ids, vectors in repo.iter_vectors(batch_size=batch_size, since=since):
+        missing = [i for i, id_ in enumerate(ids) if id_ not in index]
+        if not missing:
+            continue
+        # off the event loop: graph inserts are slow enough to stall requests
+        await asyncio.to_thread(index.add, ids=[ids[i] for i in missing], vectors=vectors[missing])
+        loaded += len(missing)
+    return loaded
+
+
+async def load_lexical_index(
+    *,
+    index: BM25Index,
+    repo: RagDocumentMongoRepo,
+    batch_size: int = 10_000,
+    since: datetime | None = None,
+) -> int:
+    """Fill the keyword index with every text stored in Mongo, the same
+    way ``load_vector_index`` fills a vector index"""
+    loaded = 0
+    async for ids, texts in repo.iter_texts(batch_size=batch_size, since=since):
+        missing = [i for i, id_ in enumerate(ids) if id_ not in index]
+        if not missing:
+            continue
+        index.add(ids=[ids[i] for i in missing], texts=[texts[i] for i in missing])
+        loaded += len(missing)
+    return loaded
+
+
+async def load_metadata_index(
+    *,
+    index: MetadataIndex,
+    repo: RagDocumentMongoRepo,
+    batch_size: int = 10_000,
+    since: datetime | None = None,
+) -> int:
+    """Fill the filter index with the indexed fields of every stored document"""
+    loaded = 0
+    async for ids, metadata in repo.iter_metadata(fields=index.fields, batch_size=batch_size, since=since):
+        missing = [i for i, id_ in enumerate(ids) if id_ not in index]
+        if not missing:
+            continue
+        index.add(ids=[ids[i] for i in missing], metadata=[metadata[i] for i in missing])
+        loaded += len(missing)
+    return loaded
+
+
+async def run_index_sync_loop(
+    *,
+    load: Callable[..., Awaitable[int]],
+    interval: int,
+    since: datetime,
+) -> None:
+    """Call ``load(since=...)`` every ``interval`` seconds, e.g. a partial of
+    ``load_vector_index`` bound to an index and repository"""
+    # ObjectIds from different processes are only ordered to the second and
+    # clocks drift, so each pass re-reads a minute before the previous one
+    while True:
+        await asyncio.sleep(interval)
+        now = datetime.now(timezone.utc)
+        try:
+            await load(since=since - timedelta(minutes=1))
+        except Exception:
+            logger.exception("index sync failed")
+            continue
+        since = now
@@ -0,0 +1,94 @@
+import threading
+from array import array
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+
+
+class MetadataIndex:
+    """Sorted document-number arrays per metadata value, for filtered search.
+
+    Every indexed id gets a dense number in insertion order, so each
+    ``(field, value)`` posting is an int32 array that stays sorted by
+    appending. Filters union the values of a field and intersect across
+    fields; candidates from a vector index are checked against the result
+    with a binary search. Rows are append-only like the vector indexes:
+    re-adding or removing an id tombstones its number.
+    """
+
+    def __init__(self, *, fields: Sequence[str] = ("source",)):
+        self.fields = tuple(fields)
+        self._postings: dict[tuple[str, Any], array] = {}
+        self._ids: list[str] = []
+        self._numbers: dict[str, int] = {}
+        self._alive = np.zeros(1024, dtype=bool)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._numbers
+
+    def add(self, *, ids: Sequence[str], metadata: Sequence[Mapping[str, Any]]) -> None:
+        if len(ids) != len(metadata):
+            raise ValueError("ids and metadata length mismatch")
+
+        with self._lock:
+            for id_, fields in zip(ids, metadata):
+                id_ = str(id_)
+                self._remove(id_)
+                number = len(self._ids)
+                if number == len(self._alive):
+                    self._alive = np.concatenate([self._alive, np.zeros(len(self._alive), dtype=bool)])
+                self._ids.append(id_)
+                self._numbers[id_] = number
+                self._alive[number] = True
+                for field in self.fields:
+                    if fields.get(field) is not None:
+                        self._postings.setdefault((field, fields[field]), array("i")).append(number)
+
+    def remove(self, *, ids: Sequence[str]) -> None:
+        with self._lock:
+            for id_ in ids:
+                self._remove(str(id_))
+
+    def match(self, filters: Mapping[str, Sequence[Any]]) -> np.ndarray:
+        """Sorted numbers of live documents having, for every field, one of its values"""
+        with self._lock:
+            matched = None
+            for field, values in filters.items():
+                if field not in self.fields:
+                    raise ValueError(f"field is not indexed: {field}")
+                postings = [
+                    np.array(self._postings[(field, value)], dtype=np.int32)
+                    for value in set(values)
+                    if (field, value) in self._postings
+                ]
+                if not postings:
+                    return np.empty(0, dtype=np.int32)
+                union = postings[0] if len(postings) == 1 else np.unique(np.concatenate(postings))
+                matched = union if matched is None else np.intersect1d(matched, union, assume_unique=True)
+            if matched is None:
+                matched = np.arange(len(self._ids), dtype=np.int32)
+            return matched[self._alive[matched]]
+
+    def contains(self, *, ids: Sequence[str], matched: np.ndarray) -> np.ndarray:
+        """Boolean mask of ``ids`` that are in ``matched``"""
+        if not len(matched):
+            return np.zeros(len(ids), dtype=bool)
+        numbers = np.fromiter(
+            (self._numbers.get(str(id_), -1) for id_ in ids), dtype=np.int64, count=len(ids)
+        )
+        positions = np.searchsorted(matched, numbers).clip(max=len(matched) - 1)
+        return (numbers >= 0) & (matched[positions] == numbers)
+
+    def ids_of(self, numbers: np.ndarray) -> list[str]:
+        ids = self._ids
+        return [ids[number] for number in numbers.tolist()]
+
+    def _remove(self, id_: str) -> None:
+        """Tombstone ``id_``'s number if indexed, caller holds the lock"""
+        number = self._numbers.pop(id_, None)
+        if number is not None:
+            self._alive[number] = False
@@ -0,0 +1,290 @@
+import logging
+import threading
+from typing import Any, Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.base import BaseVectorIndex
+from app.rag.adapter.output.index.buffer import VectorBuffer
+from app.rag.adapter.output.index.ops import atomic_savez, l2_normalize, top_k
+from app.rag.domain.vo.search_hit import SearchHit
+
+logger = logging.getLogger(__name__)
+
+CODEBOOK_SIZE = 256
+BLOCK_ROWS = 65_536
+
+
+def train_codebook(
+    vectors: np.ndarray,
+    *,
+    size: int,
+    iterations: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Euclidean k-means for one sub-space"""
+    size = min(size, len(vectors))
+    codebook = vectors[rng.choice(len(vectors), size, replace=False)].copy()
+    for _ in range(iterations):
+        codes = nearest_codes(vectors, codebook)
+        order = np.argsort(codes, kind="stable")
+        members, starts, counts = np.unique(codes[order], return_index=True, return_counts=True)
+        codebook[members] = np.add.reduceat(vectors[order], starts, axis=0) / counts[:, None]
+    return codebook
+
+
+def nearest_codes(vectors: np.ndarray, codebook: np.ndarray) -> np.ndarray:
+    distances = (
+        (codebook**2).sum(axis=1)[None, :] - 2 * vectors @ codebook.T
+    )
+    return np.argmin(distances, axis=1)
+
+
+class ProductQuantizer:
+    """Splits vectors into ``m`` sub-spaces with a 256 entry codebook each.
+
+    A vector is stored as ``m`` bytes; queries are scored with asymmetric
+    distance computation, i.e. a per-query lookup table of sub-space inner
+    products that is summed over each code.
+    """
+
+    def __init__(self, *, m: int, codebooks: np.ndarray | None = None):
+        self.m = m
+        self.codebooks = codebooks
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    def train(self, vectors: np.ndarray, *, iterations: int = 20, seed: int = 0) -> None:
+        if vectors.shape[1] % self.m:
+            raise ValueError(f"dim {vectors.shape[1]} is not divisible by m={self.m}")
+
+        rng = np.random.default_rng(seed)
+        sub_vectors = self._split(vectors)
+        codebooks = [
+            train_codebook(sub_vectors[:, j], size=CODEBOOK_SIZE, iterations=iterations, rng=rng)
+            for j in range(self.m)
+        ]
+        # Pad small codebooks (tiny training sets) so every sub-space has 256 rows
+        size = max(len(c) for c in codebooks)
+        self.codebooks = np.stack(
+            [np.pad(c, ((0, size - len(c)), (0, 0)), mode="edge") for c in codebooks]
+        ).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        sub_vectors = self._split(vectors)
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = nearest_codes(sub_vectors[:, j], self.codebooks[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = self.codebooks[np.arange(self.m), codes]
+        return parts.reshape(len(codes), -1)
+
+    def lookup_table(self, query: np.ndarray) -> np.ndarray:
+        """(m, 256) inner products of each query sub-vector with its codebook"""
+        return np.einsum("mkd,md->mk", self.codebooks, query.reshape(self.m, -1))
+
+    def scores(self, codes: np.ndarray, table: np.ndarray) -> np.ndarray:
+        """ADC scores of column-major ``(m, n)`` codes"""
+        scores = np.zeros(codes.shape[1], dtype=np.float32)
+        for j in range(self.m):
+            scores += table[j].take(codes[j])
+        return scores
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.m, -1)
+
+
+class CodeBlocks:
+    """Append-only codes kept column-major in fixed size blocks.
+
+    Lookup table scans read one sub-space at a time, which is several times
+    faster over contiguous columns than over ``(n, m)`` rows.
+    """
+
+    def __init__(self, *, m: int, block_rows: int = BLOCK_ROWS):
+        self.m = m
+        self.block_rows = block_rows
+        self._blocks: list[np.ndarray] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self._size * self.m
+
+    def append(self, codes: np.ndarray) -> None:
+        written = 0
+        while written < len(codes):
+            offset = self._size % self.block_rows
+            if offset == 0:
+                self._blocks.append(np.empty((self.m, self.block_rows), dtype=np.uint8))
+            count = min(self.block_rows - offset, len(codes) - written)
+            self._blocks[-1][:, offset : offset + count] = codes[written : written + count].T
+            written += count
+            self._size += count
+
+    def blocks(self) -> list[np.ndarray]:
+        """Filled ``(m, rows)`` views, in row order"""
+        size, blocks = self._size, list(self._blocks)
+        views = []
+        for i, block in enumerate(blocks):
+            rows = min(self.block_rows, size - i * self.block_rows)
+            if rows > 0:
+                views.append(block[:, :rows])
+        return views
+
+    def rows(self, positions: np.ndarray) -> np.ndarray:
+        """Row-major ``(len(positions), m)`` copy of the selected codes"""
+        if not self._size:
+            return np.empty((0, self.m), dtype=np.uint8)
+        return np.concatenate(self.blocks(), axis=1)[:, positions].T
+
+
+class PQVectorIndex(BaseVectorIndex):
+    """Product-quantized vectors scanned with lookup tables, m bytes each.
+
+    The quantizer trains itself on the first ``train_size`` vectors; until
+    then they are kept and scanned as float32. With ``train_in_background``
+    the training runs on its own thread, so the ``add`` crossing
+    ``train_size`` returns at once and searches keep scanning float32 until
+    the codes are swapped in. Scores are approximate, so callers re-rank a
+    shortlist against full precision vectors.
+    """
+
+    exact = False
+
+    def __init__(
+        self,
+        *,
+        m: int = 48,
+        train_size: int = 10_000,
+        codebooks: np.ndarray | None = None,
+        train_in_background: bool = False,
+    ):
+        super().__init__()
+        self.train_size = train_size
+        self.train_in_background = train_in_background
+        self.quantizer = ProductQuantizer(m=m, codebooks=codebooks)
+        self._codes = CodeBlocks(m=m)
+        self._pending = VectorBuffer()
+        self._training: threading.Thread | None = None
+
+    @property
+    def nbytes(self) -> int:
+        codebooks = self.quantizer.codebooks.nbytes if self.quantizer.is_trained else 0
+        return self._codes.nbytes + self._pending.data.nbytes + codebooks
+
+    def add(self, *, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = self._check_batch(ids, vectors)
+        if not len(ids):
+            return
+
+        vectors = l2_normalize(vectors)
+        with self._lock:
+            if self.quantizer.is_trained:
+                self._codes.append(self.quantizer.encode(vectors))
+            else:
+                self._pending.append(vectors)
+                if len(self._pending) >= self.train_size:
+                    if not self.train_in_background:
+                        self.train(self._pending.data)
+                    elif self._training is None:
+                        self._training = threading.Thread(target=self._train_pending, name="pq-train", daemon=True)
+                        self._training.start()
+            self._assign(ids=ids, start=len(self._ids))
+
+    def wait_for_training(self, timeout: float | None = None) -> bool:
+        """Block until a background training run finishes; True once trained"""
+        training = self._training
+        if training is not None:
+            training.join(timeout)
+        return self.quantizer.is_trained
+
+    def train(self, vectors: np.ndarray) -> None:
+        """(Re)train the codebooks and encode everything still kept as float32"""
+        self.quantizer.train(l2_normalize(vectors))
+        if len(self._pending):
+            self._codes.append(self.quantizer.encode(self._pending.data))
+            self._pending = VectorBuffer()
+
+    def _train_pending(self) -> None:
+        """Train on a snapshot of the float32 rows outside the lock, then
+        encode the rows added meanwhile and swap the codes in"""
+        try:
+            with self._lock:
+                sample = self._pending.data.copy()
+            quantizer = ProductQuantizer(m=self.quantizer.m)
+            quantizer.train(sample)
+            codes = quantizer.encode(sample)
+            with self._lock:
+                added = self._pending.data[len(sample) :]
+                self._codes.append(codes)
+                if len(added):
+                    self._codes.append(quantizer.encode(added))
+                # codes first: a search that sees the trained quantizer finds them
+                self.quantizer = quantizer
+                self._pending = VectorBuffer()
+        except Exception:
+            logger.exception("pq codebook training failed")
+        finally:
+            # unset, a failed run is retried by the next add
+            self._training = None
+
+    def search(self, *, vector: np.ndarray, k: int, **params: Any) -> list[SearchHit]:
+        query = l2_normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+        # one consistent view: the training thread swaps quantizer, codes and
+        # pending rows together under the lock, and adds may run meanwhile
+        with self._lock:
+            quantizer, ids, deleted = self.quantizer, self._ids, list(self._deleted)
+            blocks = self._codes.blocks() if quantizer.is_trained else None
+            pending = None if quantizer.is_trained else self._pending.data
+        if blocks:
+            table = quantizer.lookup_table(query)
+            scores = np.concatenate([quantizer.scores(block, table) for block in blocks])
+        elif pending is not None and len(pending):
+            scores = pending @ query
+        else:
+            return []
+
+        if deleted:
+            scores[deleted] = -np.inf
+
+        return [
+            SearchHit(id=ids[i], score=float(scores[i]))
+            for i in top_k(scores, k)
+            if np.isfinite(scores[i])
+        ]
+
+    def save(self, *, path: str) -> None:
+        with self._lock:
+            alive = self._alive_positions()
+            arrays = {
+                "ids": np.array([self._ids[i] for i in alive], dtype=str),
+                "params": np.array([self.quantizer.m, self.train_size]),
+            }
+            if self.quantizer.is_trained:
+                arrays["codebooks"] = self.quantizer.codebooks
+                arrays["codes"] = self._codes.rows(alive)
+            else:
+                arrays["pending"] = self._pending.data[alive]
+            atomic_savez(path, **arrays)
+
+    @classmethod
+    def load(cls, *, path: str) -> "PQVectorIndex":
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+
+        m, train_size = arrays["params"].tolist()
+        index = cls(m=m, train_size=train_size, codebooks=arrays.get("codebooks"))
+        if "codes" in arrays:
+            index._codes.append(arrays["codes"])
+        else:
+            index._pending.append(arrays["pending"])
+        index._assign(ids=arrays["ids"].tolist(), start=0)
+        return index
@@ -0,0 +1,62 @@
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.ops import l2_normalize, top_k
+from app.rag.domain.vo.search_hit import SearchHit
+
+
+def rerank_exact(
+    *,
+    query: np.ndarray,
+    ids: Sequence[str],
+    vectors: np.ndarray,
+    k: int,
+) -> list[SearchHit]:
+    """Exact cosine re-scoring of a shortlist of full precision vectors"""
+    if not len(ids):
+        return []
+
+    scores = l2_normalize(vectors) @ l2_normalize(np.asarray(query).reshape(-1))
+    return [SearchHit(id=ids[i], score=float(scores[i])) for i in top_k(scores, k)]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], *, k: int = 60) -> list[SearchHit]:
+    """Fuse best-first id lists: each id scores the sum of 1 / (k + rank)
+    over the lists it appears in, so no score scales need to agree"""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, id_ in enumerate(ranking, start=1):
+            scores[id_] = scores.get(id_, 0.0) + 1.0 / (k + rank)
+    return [
+        SearchHit(id=id_, score=score)
+        for id_, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+
+def mmr_select(*, query: np.ndarray, vectors: np.ndarray, k: int, lambda_: float) -> np.ndarray:
+    """Maximal marginal relevance: positions of k rows, picked one at a time
+    maximizing ``lambda_ * cos(query, row) - (1 - lambda_) * max cos(row, picked)``.
+
+    Candidate similarities are one matrix product up front; each pick then
+    only updates a running max, so selection is O(k * n) numpy work.
+    """
+    n = len(vectors)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    candidates = l2_normalize(vectors)
+    relevance = candidates @ l2_normalize(np.asarray(query).reshape(-1))
+    similarity = candidates @ candidates.T
+    # max similarity to anything picked so far; nothing is picked at first
+    redundancy = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    picked = np.empty(k, dtype=np.int64)
+    for i in range(k):
+        scores = lambda_ * relevance - (1 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        picked[i] = int(np.argmax(scores))
+        available[picked[i]] = False
+        redundancy = similarity[picked[i]] if i == 0 else np.maximum(redundancy, similarity[picked[i]])
+    return picked
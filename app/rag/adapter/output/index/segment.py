@@ -0,0 +1,418 @@
+"""Vector store made of immutable, memory-mapped segment files.
+
+Every sealed segment is one file::
+
+    header (64 bytes): magic | version: u32 | dim: u32 | count: u64 | id_width: u32
+    count * dim little-endian float32, L2-normalized
+    count * id_width ASCII ids, NUL padded
+
+Segments are opened with ``np.memmap`` so every worker process on a node
+shares one page-cache copy. Each process buffers its own ingests in memory
+and seals them into a new segment once the buffer is full or old enough;
+other processes pick the file up on their next ``refresh``. Removals are
+appended to a shared tombstone log. One process merges small segments, so
+the number of open maps and per-segment scans stays bounded, and then
+rewrites the tombstone log without the ids no segment holds anymore.
+
+Segment names sort in write order and a row supersedes rows of the same id
+in segments sorting before it. A merged segment is named after its newest
+input plus ``~m``, which keeps it in that position.
+"""
+import fcntl
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index.base import BaseVectorIndex
+from app.rag.adapter.output.index.buffer import VectorBuffer
+from app.rag.adapter.output.index.ops import l2_normalize, top_k
+from app.rag.domain.repository.vector_index import VectorIndex
+from app.rag.domain.vo.search_hit import SearchHit
+
+MAGIC = b"RAGSEG\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQI")
+HEADER_SIZE = 64
+SEGMENT_SUFFIX = ".seg"
+MERGED_MARK = "~m"
+TOMBSTONES = "tombstones.log"
+WRITER_LOCK = ".writer.lock"
+
+
+def write_segment(path: Path, *, ids: Sequence[str], vectors: np.ndarray) -> None:
+    encoded = np.array([id_.encode("ascii") for id_ in ids])
+    id_width = max(encoded.dtype.itemsize, 1)
+    header = HEADER.pack(MAGIC, VERSION, vectors.shape[1], len(ids), id_width)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\x00"))
+        f.write(np.ascontiguousarray(vectors, dtype="<f4").tobytes())
+        f.write(encoded.astype(f"S{id_width}").tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Segment:
+    """Read-only view of one sealed segment file"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            magic, version, dim, count, id_width = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a vector segment")
+
+        self.name = path.name
+        self.path = path
+        # one map (and file descriptor) per segment, viewed as vectors and ids
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        ids_offset = HEADER_SIZE + count * dim * 4
+        self.vectors = data[HEADER_SIZE:ids_offset].view("<f4").reshape(count, dim)
+        self.ids = data[ids_offset : ids_offset + count * id_width].view(f"S{id_width}")
+        # Rows superseded by a newer segment or tombstoned, local to this process
+        self.dead = np.zeros(count, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.dead)
+
+
+class SegmentedVectorIndex(VectorIndex):
+    def __init__(
+        self,
+        *,
+        directory: str,
+        seal_rows: int = 100_000,
+        seal_age: float = 60.0,
+        merge_factor: int = 10,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.seal_rows = seal_rows
+        self.seal_age = seal_age
+        self.merge_factor = merge_factor
+        self._segments: dict[str, Segment] = {}
+        # id -> (segment name, row); None is the in-memory tail
+        self._locations: dict[str, tuple[str | None, int]] = {}
+        self._tail = VectorBuffer()
+        self._tail_ids: list[str] = []
+        self._tail_dead: set[int] = set()
+        self._tail_started: float | None = None
+        # kept open, so rows appended before a compaction replaces the log
+        # are still read from the old file
+        open(self.directory / TOMBSTONES, "ab").close()
+        self._tombstones = open(self.directory / TOMBSTONES, "rb")
+        self._tombstones_offset = 0
+        self._writer_lock_file: Any = None
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._locations
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    def add(self, *, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = BaseVectorIndex._check_batch(ids, vectors)
+        if not len(ids):
+            return
+
+        with self._lock:
+            if self._tail_started is None:
+                self._tail_started = time.monotonic()
+            start = self._tail.append(l2_normalize(vectors))
+            for offset, id_ in enumerate(ids):
+                id_ = str(id_)
+                self._kill(id_)
+                self._locations[id_] = (None, start + offset)
+                self._tail_ids.append(id_)
+            if len(self._tail) >= self.seal_rows:
+                self.seal()
+
+    def remove(self, *, ids: Sequence[str]) -> None:
+        ids = [str(id_) for id_ in ids]
+        with self._lock:
+            with self._locked_tombstones(fcntl.LOCK_SH) as f:
+                f.write("".join(f"{id_}\n" for id_ in ids).encode("ascii"))
+            for id_ in ids:
+                self._kill(id_)
+                self._locations.pop(id_, None)
+
+    def search(self, *, vector: np.ndarray, k: int, **params: Any) -> list[SearchHit]:
+        query = l2_normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+        with self._lock:
+            segments = list(self._segments.values())
+            tail, tail_ids, tail_dead = self._tail.data, self._tail_ids, list(self._tail_dead)
+
+        hits: list[SearchHit] = []
+        for segment in segments:
+            scores = np.asarray(segment.vectors @ query)
+            scores[segment.dead] = -np.inf
+            hits += [
+                SearchHit(id=segment.ids[i].decode("ascii"), score=float(scores[i]))
+                for i in top_k(scores, k)
+                if np.isfinite(scores[i])
+            ]
+        if len(tail):
+            scores = tail @ query
+            if tail_dead:
+                scores[tail_dead] = -np.inf
+            hits += [
+                SearchHit(id=tail_ids[i], score=float(scores[i]))
+                for i in top_k(scores, k)
+                if np.isfinite(scores[i])
+            ]
+
+        return sorted(hits, key=lambda hit: hit.score, reverse=True)[:k]
+
+    def get_vectors(self, *, ids: Sequence[str]) -> tuple[list[str], np.ndarray]:
+        found, rows = [], []
+        with self._lock:
+            for id_ in map(str, ids):
+                location = self._locations.get(id_)
+                if location is None:
+                    continue
+                name, row = location
+                found.append(id_)
+                rows.append(self._tail.data[row] if name is None else self._segments[name].vectors[row])
+        return found, np.vstack(rows) if rows else np.empty((0, 0), dtype=np.float32)
+
+    def seal_due(self) -> bool:
+        """Is the tail full, or has its oldest row waited ``seal_age`` seconds"""
+        with self._lock:
+            if not self._tail_ids:
+                return False
+            return len(self._tail) >= self.seal_rows or time.monotonic() - self._tail_started >= self.seal_age
+
+    def seal(self) -> str | None:
+        """Write the in-memory tail out as a new segment and map it"""
+        # tombstones for tail rows are applied first, and the compaction of
+        # the log waits until the segment is on disk
+        with self._lock, self._locked_tombstones(fcntl.LOCK_SH):
+            self._apply_tombstones()
+            alive = [i for i in range(len(self._tail_ids)) if i not in self._tail_dead]
+            if not alive:
+                self._reset_tail()
+                return None
+
+            name = f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}"
+            write_segment(
+                self.directory / name,
+                ids=[self._tail_ids[i] for i in alive],
+                vectors=self._tail.data[alive],
+            )
+            segment = Segment(self.directory / name)
+            self._segments[name] = segment
+            for row, i in enumerate(alive):
+                self._locations[self._tail_ids[i]] = (name, row)
+            self._reset_tail()
+            return name
+
+    def merge(self) -> str | None:
+        """Merge the smallest segments into one of at most ``seal_rows`` rows.
+
+        Runs once ``merge_factor`` segments are smaller than ``seal_rows``,
+        after sealing the tail. Only live rows are copied; the inputs are deleted afterwards, and
+        other processes swap them for the merged segment on ``refresh``.
+        The tombstone log is compacted afterwards. Call it from a single
+        process per directory (see ``try_acquire_writer``).
+        """
+        with self._lock:
+            # with the tail sealed, dead rows are exactly those dead on disk
+            # and every process agrees on what to copy
+            self.seal()
+            self.refresh()
+            small = sorted(
+                (segment for segment in self._segments.values() if len(segment) < self.seal_rows),
+                key=len,
+            )
+            if len(small) < self.merge_factor:
+                return None
+            inputs, rows = [], 0
+            for segment in small:
+                if inputs and rows + len(segment) > self.seal_rows:
+                    break
+                inputs.append(segment)
+                rows += len(segment)
+            if len(inputs) < 2:
+                return None
+            inputs.sort(key=lambda segment: segment.name)
+            ids = [
+                raw_id.decode("ascii")
+                for segment in inputs
+                for raw_id in segment.ids[~segment.dead]
+            ]
+            vectors = np.concatenate([segment.vectors[~segment.dead] for segment in inputs])
+
+        # written without the lock; adds and searches go on meanwhile
+        name = f"{Path(inputs[-1].name).stem}{MERGED_MARK}{SEGMENT_SUFFIX}"
+        if ids:
+            write_segment(self.directory / name, ids=ids, vectors=vectors)
+
+        with self._lock:
+            input_names = {segment.name for segment in inputs}
+            if ids:
+                merged = Segment(self.directory / name)
+                self._segments[name] = merged
+                for row, id_ in enumerate(ids):
+                    location = self._locations.get(id_)
+                    if location is not None and location[0] in input_names:
+                        self._locations[id_] = (name, row)
+                    else:
+                        # removed or re-added while the merge was written
+                        merged.dead[row] = True
+            for segment in inputs:
+                del self._segments[segment.name]
+                segment.path.unlink(missing_ok=True)
+        if self.try_acquire_writer():
+            self._compact_tombstones()
+        return name if ids else None
+
+    def refresh(self) -> list[str]:
+        """Map segments sealed by other processes, drop segments merged away
+        and apply new tombstones"""
+        with self._lock:
+            on_disk = sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+            gone = set(self._segments) - {path.name for path in on_disk}
+            opened = []
+            for path in on_disk:
+                if path.name in self._segments:
+                    continue
+                segment = Segment(path)
+                self._segments[path.name] = segment
+                for row, raw_id in enumerate(segment.ids):
+                    id_ = raw_id.decode("ascii")
+                    location = self._locations.get(id_)
+                    if (
+                        location is not None
+                        and location[0] is not None
+                        and location[0] not in gone
+                        and location[0] > path.name
+                    ):
+                        # a segment written later already holds this id
+                        segment.dead[row] = True
+                        continue
+                    self._kill(id_)
+                    self._locations[id_] = (path.name, row)
+                opened.append(path.name)
+
+            for name in gone:
+                del self._segments[name]
+            if gone:
+                # rows the merging process knew to be dead
+                for id_ in [id_ for id_, (name, _) in self._locations.items() if name in gone]:
+                    del self._locations[id_]
+
+            self._apply_tombstones()
+            return opened
+
+    def try_acquire_writer(self) -> bool:
+        """Elect one process per node for work such as the startup backfill"""
+        if self._writer_lock_file is None:
+            lock_file = open(self.directory / WRITER_LOCK, "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return False
+            self._writer_lock_file = lock_file
+        return True
+
+    def save(self, *, path: str) -> None:
+        self.seal()
+
+    @classmethod
+    def load(cls, *, path: str) -> "SegmentedVectorIndex":
+        return cls(directory=path)
+
+    def _compact_tombstones(self) -> None:
+        """Rewrite the tombstone log without ids that no segment on disk holds.
+
+        Removes and seals wait on the log's lock meanwhile. A dropped id can
+        still be in the unsealed tail of some process, which reads the old
+        log to its end before its next seal. Writer process only.
+        """
+        path = self.directory / TOMBSTONES
+        with self._lock, self._locked_tombstones(fcntl.LOCK_EX) as log:
+            self.refresh()
+            log.seek(0)
+            lines = log.read().decode("ascii").split()
+            ids = list(dict.fromkeys(lines))
+            if not ids:
+                return
+            candidates = np.array([id_.encode("ascii") for id_ in ids])
+            held = np.zeros(len(ids), dtype=bool)
+            for segment in self._segments.values():
+                held |= np.isin(candidates, segment.ids)
+            kept = [id_ for id_, keep in zip(ids, held) if keep]
+            if len(kept) == len(lines):
+                return
+
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write("".join(f"{id_}\n" for id_ in kept).encode("ascii"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+    def _apply_tombstones(self) -> None:
+        """Remove the ids appended to the log since the last call, following
+        the log to its new file after a compaction"""
+        path = self.directory / TOMBSTONES
+        while True:
+            # checked before reading: once replaced, the old file is final
+            replaced = os.stat(path).st_ino != os.fstat(self._tombstones.fileno()).st_ino
+            self._tombstones.seek(self._tombstones_offset)
+            lines = self._tombstones.read()
+            complete = lines[: lines.rfind(b"\n") + 1]
+            self._tombstones_offset += len(complete)
+            for id_ in complete.decode("ascii").split():
+                self._kill(id_)
+                self._locations.pop(id_, None)
+            if not replaced:
+                return
+            self._tombstones.close()
+            self._tombstones = open(path, "rb")
+            self._tombstones_offset = 0
+
+    @contextmanager
+    def _locked_tombstones(self, operation: int) -> Iterator[Any]:
+        """The tombstone log opened for appending under ``flock``; retried
+        if a compaction replaced the file while waiting for the lock"""
+        path = self.directory / TOMBSTONES
+        while True:
+            f = open(path, "a+b")
+            fcntl.flock(f, operation)
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                break
+            f.close()
+        try:
+            yield f
+        finally:
+            f.close()
+
+    def _kill(self, id_: str) -> None:
+        location = self._locations.get(id_)
+        if location is None:
+            return
+        name, row = location
+        if name is None:
+            self._tail_dead.add(row)
+        elif name in self._segments:
+            self._segments[name].dead[row] = True
+
+    def _reset_tail(self) -> None:
+        self._tail = VectorBuffer()
+        self._tail_ids = []
+        self._tail_dead = set()
+        self._tail_started = None
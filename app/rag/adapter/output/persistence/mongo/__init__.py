@@ -0,0 +1,12 @@
+from .document import RagDocumentMongoRepo
+from .index_meta import RagIndexMetaMongoRepo
+
+rag_document_repo = RagDocumentMongoRepo()
+rag_index_meta_repo = RagIndexMetaMongoRepo()
+
+__all__ = [
+    "RagDocumentMongoRepo",
+    "RagIndexMetaMongoRepo",
+    "rag_document_repo",
+    "rag_index_meta_repo",
+]
@@ -0,0 +1,203 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence
+
+import numpy as np
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.rag.adapter.output.persistence.mongo.vector_codec import decode_vector, encode_vector
+from core.config import config
+from core.db.mongo_db import mongo_instance
+
+
+class RagDocumentMongoRepo:
+    @property
+    def collection(self):
+        return mongo_instance.db.rag_documents
+
+    async def ensure_indexes(self) -> None:
+        # documents stored before content hashing have no hash; the partial
+        # filter keeps them out of the unique constraint
+        await self.collection.create_index(
+            "content_hash",
+            unique=True,
+            partialFilterExpression={"content_hash": {"$exists": True}},
+        )
+        await self.collection.create_index("parent_id", sparse=True)
+        await self.collection.create_index("text_hash", sparse=True)
+
+    async def save_many(
+        self,
+        *,
+        texts: Sequence[str],
+        sources: Sequence[str],
+        vectors: np.ndarray,
+        metadata: Sequence[dict[str, Any]] | None = None,
+    ) -> tuple[list[str], dict[int, str]]:
+        """Unordered insert_many; ids in input order and write errors by position.
+
+        ``metadata`` adds fields per document, e.g. chunk ``parent_id``, offsets
+        and ``content_hash``; a hash stored meanwhile fails as a duplicate key.
+        """
+        documents = [
+            {
+                "_id": ObjectId(),
+                "text": text,
+                "source": source,
+                "vector": encode_vector(vector, dtype=config.VECTOR_STORAGE_DTYPE),
+                **(metadata[i] if metadata else {}),
+            }
+            for i, (text, source, vector) in enumerate(zip(texts, sources, vectors))
+        ]
+        errors: dict[int, str] = {}
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+        return [str(doc["_id"]) for doc in documents], errors
+
+    async def find_by_hashes(self, *, hashes: Sequence[str]) -> dict[str, str]:
+        """Map each stored content hash to its parent id (own id if unchunked)"""
+        cursor = self.collection.find(
+            {"content_hash": {"$in": list(hashes)}},
+            {"content_hash": 1, "parent_id": 1},
+        )
+        return {
+            doc["content_hash"]: doc.get("parent_id") or str(doc["_id"])
+            async for doc in cursor
+        }
+
+    async def find_vectors_by_text_hashes(self, *, hashes: Sequence[str]) -> dict[str, np.ndarray]:
+        """One stored embedding per text hash found, to reuse for the same
+        text under another source"""
+        cursor = self.collection.find(
+            {"text_hash": {"$in": list(hashes)}},
+            {"text_hash": 1, "vector": 1},
+        )
+        vectors: dict[str, np.ndarray] = {}
+        async for doc in cursor:
+            vectors.setdefault(doc["text_hash"], decode_vector(doc["vector"]).astype(np.float32, copy=False))
+        return vectors
+
+    async def get_documents_by_ids(
+        self,
+        *,
+        ids: Sequence[str],
+        with_vectors: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Get documents by id, in the order of ``ids``"""
+        projection = {"text": 1, "source": 1, "parent_id": 1, "chunk_index": 1, "start": 1, "end": 1}
+        if with_vectors:
+            projection["vector"] = 1
+        cursor = self.collection.find(
+            {"_id": {"$in": [ObjectId(id_) for id_ in ids]}},
+            projection,
+        )
+        documents = {}
+        async for doc in cursor:
+            doc["id"] = str(doc.pop("_id"))
+            if with_vectors:
+                doc["vector"] = decode_vector(doc["vector"])
+            documents[doc["id"]] = doc
+        return [documents[id_] for id_ in ids if id_ in documents]
+
+    async def delete(self, *, id_: str) -> list[str]:
+        """Delete a document, or every chunk of a parent document; returns deleted ids"""
+        cursor = self.collection.find(
+            {"$or": [{"_id": ObjectId(id_)}, {"parent_id": id_}]},
+            {"_id": 1},
+        )
+        object_ids = [doc["_id"] async for doc in cursor]
+        if object_ids:
+            await self.collection.delete_many({"_id": {"$in": object_ids}})
+        return [str(object_id) for object_id in object_ids]
+
+    async def sample_vectors(self, *, size: int) -> np.ndarray:
+        cursor = self.collection.aggregate(
+            [{"$sample": {"size": size}}, {"$project": {"vector": 1}}]
+        )
+        vectors = [decode_vector(doc["vector"]) async for doc in cursor]
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    async def get_vectors_by_ids(self, *, ids: Sequence[str]) -> tuple[list[str], np.ndarray]:
+        """Stored ids among ``ids`` and their embeddings as a float32 matrix"""
+        cursor = self.collection.find(
+            {"_id": {"$in": [ObjectId(id_) for id_ in ids]}},
+            {"vector": 1},
+        )
+        found, vectors = [], []
+        async for doc in cursor:
+            found.append(str(doc["_id"]))
+            vectors.append(decode_vector(doc["vector"]))
+        if not vectors:
+            return [], np.empty((0, 0), dtype=np.float32)
+        return found, np.vstack(vectors).astype(np.float32, copy=False)
+
+    async def iter_metadata(
+        self,
+        *,
+        fields: Sequence[str],
+        batch_size: int = 10_000,
+        since: datetime | None = None,
+    ) -> AsyncIterator[tuple[list[str], list[dict[str, Any]]]]:
+        """Stream (ids, {field: value}) batches of every stored document, or
+        only of documents created at or after ``since``"""
+        ids: list[str] = []
+        metadata: list[dict[str, Any]] = []
+        query = {} if since is None else {"_id": {"$gte": ObjectId.from_datetime(since)}}
+        cursor = self.collection.find(query, {field: 1 for field in fields}, batch_size=batch_size)
+        async for doc in cursor:
+            ids.append(str(doc.pop("_id")))
+            metadata.append(doc)
+            if len(ids) == batch_size:
+                yield ids, metadata
+                ids, metadata = [], []
+
+        if ids:
+            yield ids, metadata
+
+    async def iter_texts(
+        self,
+        *,
+        batch_size: int = 10_000,
+        since: datetime | None = None,
+    ) -> AsyncIterator[tuple[list[str], list[str]]]:
+        """Stream (ids, texts) batches of every stored document, or only of
+        documents created at or after ``since``"""
+        ids: list[str] = []
+        texts: list[str] = []
+        query = {} if since is None else {"_id": {"$gte": ObjectId.from_datetime(since)}}
+        cursor = self.collection.find(query, {"text": 1}, batch_size=batch_size)
+        async for doc in cursor:
+            ids.append(str(doc["_id"]))
+            texts.append(doc["text"])
+            if len(ids) == batch_size:
+                yield ids, texts
+                ids, texts = [], []
+
+        if ids:
+            yield ids, texts
+
+    async def iter_vectors(
+        self,
+        *,
+        batch_size: int = 10_000,
+        since: datetime | None = None,
+    ) -> AsyncIterator[tuple[list[str], np.ndarray]]:
+        """Stream (ids, float32 matrix) batches of every stored embedding,
+        or only of documents created at or after ``since``"""
+        ids: list[str] = []
+        vectors: list[np.ndarray] = []
+        query = {} if since is None else {"_id": {"$gte": ObjectId.from_datetime(since)}}
+        cursor = self.collection.find(query, {"vector": 1}, batch_size=batch_size)
+        async for doc in cursor:
+            ids.append(str(doc["_id"]))
+            vectors.append(decode_vector(doc["vector"]))
+            if len(ids) == batch_size:
+                yield ids, np.vstack(vectors).astype(np.float32, copy=False)
+                ids, vectors = [], []
+
+        if ids:
+            yield ids, np.vstack(vectors).astype(np.float32, copy=False)
@@ -0,0 +1,40 @@
+import time
+from typing import Any
+
+import numpy as np
+from bson import Binary
+
+from core.db.mongo_db import mongo_instance
+
+IVF_META_ID = "ivf"
+
+
+class RagIndexMetaMongoRepo:
+    """Trained index parameters shared by every API worker"""
+
+    @property
+    def collection(self):
+        return mongo_instance.db.rag_index_meta
+
+    async def get_ivf_version(self) -> int | None:
+        doc = await self.collection.find_one({"_id": IVF_META_ID}, {"version": 1})
+        return doc["version"] if doc else None
+
+    async def get_ivf_centroids(self) -> tuple[np.ndarray, int] | None:
+        doc = await self.collection.find_one({"_id": IVF_META_ID})
+        if not doc:
+            return None
+
+        centroids = np.frombuffer(doc["centroids"], dtype="<f4").reshape(doc["shape"])
+        return centroids, doc["version"]
+
+    async def save_ivf_centroids(self, *, centroids: np.ndarray, trained_on: int) -> int:
+        version = time.time_ns()
+        doc: dict[str, Any] = {
+            "centroids": Binary(np.ascontiguousarray(centroids, dtype="<f4").tobytes()),
+            "shape": list(centroids.shape),
+            "trained_on": trained_on,
+            "version": version,
+        }
+        await self.collection.replace_one({"_id": IVF_META_ID}, doc, upsert=True)
+        return version
@@ -0,0 +1,45 @@
+"""Packed binary layout for embeddings stored in ``rag_documents.vector``.
+
+A vector is a BSON BinData (user defined subtype 0x80) holding a 4 byte
+header followed by the little-endian components::
+
+    version: uint8 | dtype: uint8 | dim: uint16 | dim * float32/float16
+
+Compared to a BSON array of doubles this is ~3x (float32) or ~6x (float16)
+smaller and decodes with ``np.frombuffer`` without copying.
+"""
+import struct
+from typing import Any
+
+import numpy as np
+from bson import Binary
+
+VECTOR_SUBTYPE = 0x80
+VERSION = 1
+HEADER = struct.Struct("<BBH")
+DTYPES = {0: np.dtype("<f4"), 1: np.dtype("<f2")}
+DTYPE_CODES = {"float32": 0, "float16": 1}
+
+
+def encode_vector(vector: Any, *, dtype: str = "float32") -> Binary:
+    if dtype not in DTYPE_CODES:
+        raise ValueError(f"unsupported vector dtype: {dtype}")
+
+    code = DTYPE_CODES[dtype]
+    values = np.asarray(vector, dtype=DTYPES[code]).reshape(-1)
+    return Binary(HEADER.pack(VERSION, code, values.size) + values.tobytes(), VECTOR_SUBTYPE)
+
+
+def decode_vector(value: Any) -> np.ndarray:
+    """Decode a stored vector; legacy documents hold a plain list of doubles"""
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        return np.asarray(value, dtype=np.float32)
+
+    version, code, dim = HEADER.unpack_from(value)
+    if version != VERSION or code not in DTYPES:
+        raise ValueError(f"unknown vector header: version={version} dtype={code}")
+    return np.frombuffer(value, dtype=DTYPES[code], count=dim, offset=HEADER.size)
+
+
+def is_packed(value: Any) -> bool:
+    return isinstance(value, Binary) and value.subtype == VECTOR_SUBTYPE
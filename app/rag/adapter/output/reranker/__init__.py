@@ -0,0 +1,17 @@
+from .cross_encoder import CrossEncoderReranker
+from core.config import config
+
+reranker = (
+    CrossEncoderReranker(
+        model=config.CROSS_ENCODER_MODEL,
+        batch_size=config.CROSS_ENCODER_BATCH_SIZE,
+        threads=config.CROSS_ENCODER_THREADS,
+    )
+    if config.CROSS_ENCODER_MODEL
+    else None
+)
+
+__all__ = [
+    "CrossEncoderReranker",
+    "reranker",
+]
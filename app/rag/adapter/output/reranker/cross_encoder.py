@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.domain.repository.reranker import Reranker
+
+
+class CrossEncoderReranker(Reranker):
+    """Scores (query, text) pairs with a sentence-transformers cross-encoder
+    in process on CPU.
+
+    Pairs go to the thread pool ``batch_size`` at a time, so a caller that
+    stops waiting (a spent latency budget) leaves at most one batch running.
+    Needs the optional ``sentence-transformers`` package.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        batch_size: int = 16,
+        threads: int = 0,
+        max_workers: int = 1,
+    ):
+        self.model_id = model
+        self.batch_size = batch_size
+        self.threads = threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=type(self).__name__,
+        )
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    async def score(self, *, query: str, texts: Sequence[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        scores = []
+        for start in range(0, len(texts), self.batch_size):
+            pairs = [(query, text) for text in texts[start : start + self.batch_size]]
+            scores.append(await loop.run_in_executor(self._executor, self._predict, pairs))
+        if not scores:
+            return np.empty(0, dtype=np.float32)
+        return np.concatenate(scores).astype(np.float32, copy=False).reshape(-1)
+
+    def _predict(self, pairs: list[tuple[str, str]]) -> np.ndarray:
+        return self.load().predict(pairs, batch_size=len(pairs), convert_to_numpy=True)
+
+    def load(self):
+        """Load the model if needed; call at startup to keep it off the first request"""
+        with self._load_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import CrossEncoder
+                except ImportError as e:
+                    raise RuntimeError(
+                        "cross-encoder re-ranking needs the sentence-transformers package"
+                    ) from e
+
+                if self.threads:
+                    import torch
+
+                    torch.set_num_threads(self.threads)
+                self._model = CrossEncoder(self.model_id, device="cpu")
+            return self._model
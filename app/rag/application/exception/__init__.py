@@ -0,0 +1,7 @@
+from core.exceptions import CustomException
+
+
+class EmbeddingTimeoutException(CustomException):
+    code = 504
+    error_code = "RAG__EMBEDDING_TIMEOUT"
+    message = "embedding timed out"
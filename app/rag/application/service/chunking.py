@@ -0,0 +1,130 @@
+"""Sliding-window splitting of documents into embedding-sized chunks.
+
+Token counts approximate the embedding model's WordPiece tokenizer with one
+token per word or punctuation mark; real counts are somewhat higher, so the
+default window leaves headroom under MiniLM's 256 word-piece limit.
+"""
+import hashlib
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from typing import Any
+
+from app.rag.domain.vo.chunk import Chunk
+
+TOKEN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def text_hash(text: str) -> str:
+    """sha256 of the NFKC-normalized text with whitespace runs collapsed, so
+    re-wrapped or re-indented copies of a chunk hash the same"""
+    normalized = WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def content_hash(text: str, *, source: str) -> str:
+    """``text_hash`` scoped to a source. The same text under another source
+    gets its own row, which keeps it reachable by a source filter, but
+    shares the embedding found by its ``text_hash``."""
+    return hashlib.sha256(f"{source}\x00{text_hash(text)}".encode()).hexdigest()
+
+
+def count_tokens(text: str) -> int:
+    return sum(1 for _ in TOKEN.finditer(text))
+
+
+def chunk_text(text: str, *, max_tokens: int = 200, overlap_tokens: int = 40) -> list[Chunk]:
+    """Split into windows of at most ``max_tokens``, overlapping by about
+    ``overlap_tokens`` and cut at sentence boundaries where possible"""
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens")
+
+    spans = [match.span() for match in TOKEN.finditer(text)]
+    if not spans:
+        return []
+    starts = [start for start, _ in spans]
+    # token positions that begin a sentence
+    boundaries = [bisect_left(starts, match.end()) for match in SENTENCE_BREAK.finditer(text)]
+
+    chunks = []
+    first = 0
+    while True:
+        last = min(first + max_tokens, len(spans))
+        if last < len(spans):
+            # end at the latest sentence start in the back half of the window
+            i = bisect_right(boundaries, last) - 1
+            if i >= 0 and boundaries[i] > first + max_tokens // 2:
+                last = boundaries[i]
+
+        start, end = spans[first][0], spans[last - 1][1]
+        chunks.append(Chunk(text=text[start:end], start=start, end=end))
+        if last == len(spans):
+            return chunks
+
+        # step back for the overlap, moving to the nearest sentence start
+        # inside the window
+        target = max(last - overlap_tokens, first + 1)
+        i = bisect_left(boundaries, target)
+        candidates = [b for b in boundaries[max(i - 1, 0) : i + 1] if first < b < last]
+        first = min(candidates, key=lambda b: abs(b - target), default=target)
+
+
+def merge_adjacent_chunks(documents: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Merge retrieved chunks of the same parent that touch or overlap.
+
+    ``documents`` are retrieval results, best first; merged groups keep the
+    best score and rank. Documents without chunk offsets pass through.
+    """
+    groups: dict[Any, list[dict[str, Any]]] = {}
+    order = []
+    for doc in documents:
+        key = doc.get("parent_id") or doc["id"]
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(doc)
+
+    merged = []
+    for key in order:
+        group = groups[key]
+        if len(group) == 1 or "start" not in group[0]:
+            merged.extend(group)
+            continue
+
+        group.sort(key=lambda doc: doc["start"])
+        runs = [[group[0]]]
+        for doc in group[1:]:
+            previous = runs[-1][-1]
+            if doc["chunk_index"] == previous["chunk_index"] + 1 or doc["start"] <= previous["end"]:
+                runs[-1].append(doc)
+            else:
+                runs.append([doc])
+        merged.extend(_join_run(run) for run in runs)
+
+    merged.sort(key=lambda doc: doc["score"], reverse=True)
+    return merged
+
+
+def _join_run(run: list[dict[str, Any]]) -> dict[str, Any]:
+    if len(run) == 1:
+        return run[0]
+
+    text, end = run[0]["text"], run[0]["end"]
+    for doc in run[1:]:
+        if doc["start"] < end:
+            # overlapping window: keep only the part past what we have
+            text += doc["text"][end - doc["start"] :]
+        else:
+            text += " " + doc["text"]
+        end = max(end, doc["end"])
+
+    best = max(run, key=lambda doc: doc["score"])
+    return {
+        **best,
+        "text": text,
+        "start": run[0]["start"],
+        "end": end,
+        "ids": [doc["id"] for doc in run],
+    }
@@ -0,0 +1,74 @@
+import asyncio
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.cache import QueryEmbeddingCache, query_embedding_cache
+from app.rag.adapter.output.embedding import embedding_provider
+from app.rag.application.exception import EmbeddingTimeoutException
+from app.rag.domain.repository.embedding_provider import EmbeddingProvider
+from core.config import config
+from core.helpers.batcher import MicroBatcher
+from core.helpers.limiter import ConcurrencyLimiter
+
+
+class EmbeddingService:
+    def __init__(
+        self,
+        *,
+        provider: EmbeddingProvider,
+        max_concurrency: int = 8,
+        timeout: float | None = 10.0,
+        max_batch_size: int = 32,
+        batch_window: float = 0.005,
+        query_cache: QueryEmbeddingCache | None = None,
+    ):
+        self.provider = provider
+        self.query_cache = query_cache
+        self.timeout = timeout
+        self.limiter = ConcurrencyLimiter(limit=max_concurrency)
+        # Concurrent requests share provider calls; the limiter bounds batches
+        self.batcher = MicroBatcher(
+            handler=self._embed_batch,
+            max_batch_size=max_batch_size,
+            window=batch_window,
+        )
+
+    async def embed(self, *, text: str) -> np.ndarray:
+        """Embedding of one text as a float32 vector"""
+        return (await self.embed_many(texts=[text]))[0]
+
+    async def embed_query(self, *, text: str) -> np.ndarray:
+        """Like ``embed``, served from the query cache when possible"""
+        if self.query_cache is None:
+            return await self.embed(text=text)
+
+        vector = await self.query_cache.get(text=text)
+        if vector is None:
+            vector = await self.embed(text=text)
+            await self.query_cache.set(text=text, vector=vector)
+        return vector
+
+    async def embed_many(self, *, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings of texts as a float32 (len(texts), dim) matrix"""
+        # Time spent batching and waiting for a slot counts toward the
+        # timeout, so callers give up instead of queueing behind a stalled endpoint
+        try:
+            async with asyncio.timeout(self.timeout):
+                return await self.batcher.submit(texts)
+        except TimeoutError:
+            raise EmbeddingTimeoutException
+
+    async def _embed_batch(self, texts: list[str]) -> np.ndarray:
+        async with self.limiter.slot():
+            return await self.provider.embed(texts=texts)
+
+
+embedding_service = EmbeddingService(
+    provider=embedding_provider,
+    max_concurrency=config.EMBEDDING_MAX_CONCURRENCY,
+    timeout=config.EMBEDDING_TIMEOUT,
+    max_batch_size=config.EMBEDDING_MAX_BATCH_SIZE,
+    batch_window=config.EMBEDDING_BATCH_WINDOW_MS / 1000,
+    query_cache=query_embedding_cache,
+)
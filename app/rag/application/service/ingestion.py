@@ -0,0 +1,194 @@
+import asyncio
+from functools import cache
+from typing import Any, Sequence
+
+import numpy as np
+from bson import ObjectId
+
+from app.rag.adapter.output.cache import SemanticAnswerCache, answer_cache
+from app.rag.adapter.output.index import BM25Index, MetadataIndex, lexical_index, metadata_index
+from app.rag.adapter.output.persistence.mongo import RagDocumentMongoRepo, rag_document_repo
+from app.rag.application.service.chunking import chunk_text, content_hash, text_hash
+from app.rag.application.service.embedding import EmbeddingService, embedding_service
+from app.rag.domain.repository.vector_index import VectorIndex
+from core.config import config
+
+
+class IngestionService:
+    def __init__(
+        self,
+        *,
+        embedding_service: EmbeddingService,
+        repository: RagDocumentMongoRepo,
+        index: VectorIndex | None = None,
+        lexical_index: BM25Index | None = None,
+        metadata_index: MetadataIndex | None = None,
+        answer_cache: SemanticAnswerCache | None = None,
+        similarity_threshold: float = 0.5,
+        chunk_tokens: int = 200,
+        chunk_overlap_tokens: int = 40,
+    ):
+        self.embedding_service = embedding_service
+        self.repository = repository
+        self.index = index
+        self.lexical_index = lexical_index
+        self.metadata_index = metadata_index
+        self.answer_cache = answer_cache
+        self.similarity_threshold = similarity_threshold
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+
+    async def ingest_many(
+        self,
+        *,
+        texts: Sequence[str],
+        sources: Sequence[str],
+    ) -> list[dict[str, Any]]:
+        """Chunk, embed, store and index documents.
+
+        Returns one result per input: the parent ``id`` shared by its chunks,
+        the ``chunks`` stored and the ``duplicates`` skipped, or an ``error``.
+        Chunks whose content hash is already stored, or repeated earlier in
+        the batch, are neither embedded nor inserted; a document made only of
+        such chunks gets the id of the parent that stored them first. Text
+        already stored under another source is inserted for this source too,
+        with the stored embedding instead of a new one.
+        Embedding failures raise, since they affect the whole batch. Without
+        indexes (Celery workers) chunks are only stored; API workers pick
+        them up on their next index sync.
+        """
+        parent_ids = [str(ObjectId()) for _ in texts]
+        owners, chunk_texts, chunk_sources, metadata = [], [], [], []
+        for owner, (text, source) in enumerate(zip(texts, sources)):
+            chunks = chunk_text(
+                text,
+                max_tokens=self.chunk_tokens,
+                overlap_tokens=self.chunk_overlap_tokens,
+            )
+            for chunk_index, chunk in enumerate(chunks):
+                owners.append(owner)
+                chunk_texts.append(chunk.text)
+                chunk_sources.append(source)
+                metadata.append(
+                    {
+                        "parent_id": parent_ids[owner],
+                        "chunk_index": chunk_index,
+                        "start": chunk.start,
+                        "end": chunk.end,
+                        "content_hash": content_hash(chunk.text, source=source),
+                        "text_hash": text_hash(chunk.text),
+                    }
+                )
+
+        if not chunk_texts:
+            return [{"error": "document has no text"} for _ in texts]
+
+        hashes = [meta["content_hash"] for meta in metadata]
+        # parent id of every hash already stored; the rest is inserted once,
+        # at its first position in the batch
+        known = await self.repository.find_by_hashes(hashes=set(hashes))
+        first: dict[str, int] = {}
+        for i, hash_ in enumerate(hashes):
+            if hash_ not in known:
+                first.setdefault(hash_, i)
+        new = list(first.values())
+
+        errors: dict[int, str] = {}
+        if new:
+            vectors = await self._vectors_for(
+                texts=[chunk_texts[i] for i in new],
+                text_hashes=[metadata[i]["text_hash"] for i in new],
+            )
+            ids, new_errors = await self.repository.save_many(
+                texts=[chunk_texts[i] for i in new],
+                sources=[chunk_sources[i] for i in new],
+                vectors=vectors,
+                metadata=[metadata[i] for i in new],
+            )
+            if new_errors:
+                # a concurrent ingest may have stored the same text first
+                raced = await self.repository.find_by_hashes(hashes=[hashes[new[j]] for j in new_errors])
+                for j, error in new_errors.items():
+                    if hashes[new[j]] in raced:
+                        known[hashes[new[j]]] = raced[hashes[new[j]]]
+                    else:
+                        errors[new[j]] = error
+
+            stored = [j for j in range(len(new)) if j not in new_errors]
+            if stored and self.index is not None:
+                #keep the in-memory index in sync with mongo; off the event
+                #loop, an HNSW insert takes milliseconds per vector
+                await asyncio.to_thread(self.index.add, ids=[ids[j] for j in stored], vectors=vectors[stored])
+            if stored and self.lexical_index is not None:
+                self.lexical_index.add(ids=[ids[j] for j in stored], texts=[chunk_texts[new[j]] for j in stored])
+            if stored and self.metadata_index is not None:
+                self.metadata_index.add(
+                    ids=[ids[j] for j in stored],
+                    metadata=[{"source": chunk_sources[new[j]], **metadata[new[j]]} for j in stored],
+                )
+            if stored and self.answer_cache is not None:
+                #cached answers for questions these documents could now answer are stale
+                for j in stored:
+                    self.answer_cache.invalidate_near(vector=vectors[j], min_score=self.similarity_threshold)
+
+        results: list[dict[str, Any]] = [{"chunks": 0, "duplicates": 0} for _ in texts]
+        for i, owner in enumerate(owners):
+            result = results[owner]
+            hash_ = hashes[i]
+            if hash_ in known:
+                result["duplicates"] += 1
+                result.setdefault("duplicate_of", known[hash_])
+            elif first[hash_] in errors:
+                result.setdefault("error", errors[first[hash_]])
+            elif first[hash_] == i:
+                result["chunks"] += 1
+            else:
+                result["duplicates"] += 1
+                result.setdefault("duplicate_of", parent_ids[owners[first[hash_]]])
+        return [
+            {"error": result["error"]}
+            if "error" in result
+            else {
+                "id": parent_ids[owner] if result["chunks"] else result["duplicate_of"],
+                "chunks": result["chunks"],
+                "duplicates": result["duplicates"],
+            }
+            if result["chunks"] or result["duplicates"]
+            else {"error": "document has no text"}
+            for owner, result in enumerate(results)
+        ]
+
+    async def _vectors_for(self, *, texts: Sequence[str], text_hashes: Sequence[str]) -> np.ndarray:
+        """Embeddings of ``texts``; text already stored under another source,
+        or repeated in the batch, reuses one embedding instead of a call"""
+        vectors = await self.repository.find_vectors_by_text_hashes(hashes=set(text_hashes))
+        first = {hash_: i for i, hash_ in reversed(list(enumerate(text_hashes))) if hash_ not in vectors}
+        if first:
+            embedded = await self.embedding_service.embed_many(texts=[texts[i] for i in first.values()])
+            vectors.update(zip(first, embedded))
+        return np.vstack([vectors[hash_] for hash_ in text_hashes]).astype(np.float32, copy=False)
+
+
+@cache
+def _ingestion_service() -> IngestionService:
+    from app.rag.adapter.output.index import vector_index
+
+    return IngestionService(
+        embedding_service=embedding_service,
+        repository=rag_document_repo,
+        index=vector_index,
+        lexical_index=lexical_index,
+        metadata_index=metadata_index,
+        answer_cache=answer_cache,
+        similarity_threshold=config.SIMILARITY_THRESHOLD,
+        chunk_tokens=config.CHUNK_TOKENS,
+        chunk_overlap_tokens=config.CHUNK_OVERLAP_TOKENS,
+    )
+
+
+def __getattr__(name: str):
+    # built on first use, like the vector index it wraps; Celery workers
+    # only import the class
+    if name == "ingestion_service":
+        return _ingestion_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from functools import cache
+
+from app.rag.adapter.output.index.ivf import IVFVectorIndex, train_kmeans
+from app.rag.adapter.output.persistence.mongo import (
+    RagDocumentMongoRepo,
+    RagIndexMetaMongoRepo,
+    rag_document_repo,
+    rag_index_meta_repo,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class IVFService:
+    def __init__(
+        self,
+        *,
+        repository: RagDocumentMongoRepo,
+        meta_repository: RagIndexMetaMongoRepo,
+        index: IVFVectorIndex | None = None,
+    ):
+        self.repository = repository
+        self.meta_repository = meta_repository
+        self.index = index
+
+    async def train(self, *, nlist: int, sample_size: int, iterations: int) -> dict:
+        """Train the coarse quantizer on a sample of stored vectors (offline)"""
+        sample = await self.repository.sample_vectors(size=sample_size)
+        if not len(sample):
+            return {"status": "skipped", "reason": "no documents"}
+
+        centroids = train_kmeans(sample, nlist=nlist, iterations=iterations)
+        version = await self.meta_repository.save_ivf_centroids(
+            centroids=centroids,
+            trained_on=len(sample),
+        )
+        return {"status": "trained", "nlist": len(centroids), "trained_on": len(sample), "version": version}
+
+    async def refresh(self) -> bool:
+        """Adopt newer centroids published by the training job"""
+        if self.index is None:
+            return False
+
+        version = await self.meta_repository.get_ivf_version()
+        if version is None or version == self.index.centroids_version:
+            return False
+
+        centroids, version = await self.meta_repository.get_ivf_centroids()
+        await asyncio.to_thread(self.index.set_centroids, centroids=centroids, version=version)
+        logger.info("ivf index re-partitioned into %d lists (version %d)", len(centroids), version)
+        return True
+
+    async def run_refresh_loop(self, *, interval: int) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("ivf centroid refresh failed")
+
+
+@cache
+def _ivf_service() -> IVFService:
+    from app.rag.adapter.output.index import vector_index
+
+    return IVFService(
+        repository=rag_document_repo,
+        meta_repository=rag_index_meta_repo,
+        index=vector_index if isinstance(vector_index, IVFVectorIndex) else None,
+    )
+
+
+def __getattr__(name: str):
+    # built on first use, like the vector index it wraps
+    if name == "ivf_service":
+        return _ivf_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,284 @@
+import asyncio
+import logging
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+
+from app.rag.adapter.output.index import BM25Index, MetadataIndex, lexical_index, metadata_index, vector_index
+from app.rag.adapter.output.index.ops import top_k
+from app.rag.adapter.output.index.rerank import mmr_select, reciprocal_rank_fusion, rerank_exact
+from app.rag.adapter.output.persistence.mongo import RagDocumentMongoRepo, rag_document_repo
+from app.rag.adapter.output.reranker import reranker
+from app.rag.application.service.chunking import merge_adjacent_chunks
+from app.rag.domain.repository.reranker import Reranker
+from app.rag.domain.repository.vector_index import VectorIndex
+from app.rag.domain.vo.search_hit import SearchHit
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalService:
+    def __init__(
+        self,
+        *,
+        index: VectorIndex,
+        repository: RagDocumentMongoRepo,
+        rerank_oversample: int | None = None,
+        merge_chunks: bool = True,
+        lexical_index: BM25Index | None = None,
+        rrf_k: int = 60,
+        reranker: Reranker | None = None,
+        rerank_candidates: int = 50,
+        rerank_budget: float | None = 0.25,
+        mmr_lambda: float = 1.0,
+        mmr_pool: int = 20,
+        metadata_index: MetadataIndex | None = None,
+        filter_brute_force_max: int = 2000,
+    ):
+        self.index = index
+        self.repository = repository
+        # the index knows how much its approximate scores need
+        self.rerank_oversample = rerank_oversample or index.rerank_oversample
+        self.merge_chunks = merge_chunks
+        self.lexical_index = lexical_index
+        self.rrf_k = rrf_k
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self.rerank_budget = rerank_budget
+        self._rerank_counts = {"reranked": 0, "fallbacks": 0}
+        self.mmr_lambda = mmr_lambda
+        self.mmr_pool = mmr_pool
+        self.metadata_index = metadata_index
+        self.filter_brute_force_max = filter_brute_force_max
+
+    async def retrieve(
+        self,
+        *,
+        query_vector: np.ndarray,
+        k: int,
+        threshold: float,
+        query: str | None = None,
+        mode: str = "vector",
+        rerank: bool | None = None,
+        mmr_lambda: float | None = None,
+        mmr_pool: int | None = None,
+        filters: Mapping[str, Sequence[Any]] | None = None,
+        **params: Any,
+    ) -> list[dict[str, Any]]:
+        """Top k documents with ``text``, ``source`` and ``score``.
+
+        In "vector" mode the score is cosine similarity. In "hybrid" mode,
+        which needs the ``query`` text and a lexical index, cosine and BM25
+        rankings are fused with reciprocal rank fusion; keyword matches are
+        kept even below ``threshold``. With a reranker (``rerank`` defaults
+        to on when one is configured) ``rerank_candidates`` documents are
+        retrieved and the cross-encoder's top k kept, scored by it; past
+        ``rerank_budget`` seconds the retrieval order is kept instead.
+        ``mmr_lambda`` below 1 picks the k results from a pool of
+        ``mmr_pool`` by maximal marginal relevance, trading cosine relevance
+        for distance to what is already picked. ``filters`` keeps documents
+        whose metadata field has one of the listed values, e.g.
+        ``{"source": ["FastAPI Docs"]}``; filters selecting few documents
+        are searched exhaustively. Adjacent chunks of one parent document are merged into a single
+        result carrying every chunk id in ``ids``.
+        """
+        rerank = self.reranker is not None and bool(query) and rerank is not False
+        mmr_lambda = self.mmr_lambda if mmr_lambda is None else mmr_lambda
+        diversify = mmr_lambda < 1
+        pool = max(k, mmr_pool or self.mmr_pool) if diversify else k
+        candidates = max(pool, self.rerank_candidates) if rerank else pool
+        matched = None
+        if filters and self.metadata_index is not None:
+            matched = self.metadata_index.match(filters)
+            if not len(matched):
+                return []
+        if mode == "hybrid" and self.lexical_index is not None and query:
+            documents = await self._retrieve_hybrid(
+                query_vector=query_vector,
+                query=query,
+                k=candidates,
+                threshold=threshold,
+                matched=matched,
+                **params,
+            )
+        else:
+            documents = await self._retrieve_vector(
+                query_vector=query_vector,
+                k=candidates,
+                threshold=threshold,
+                with_vectors=diversify,
+                matched=matched,
+                **params,
+            )
+        if rerank:
+            documents = await self._cross_encode(query=query, documents=documents, k=pool)
+        if diversify and documents:
+            picked = mmr_select(
+                query=query_vector,
+                vectors=np.vstack([doc["vector"] for doc in documents]),
+                k=k,
+                lambda_=mmr_lambda,
+            )
+            documents = [documents[i] for i in picked]
+        for doc in documents:
+            doc.pop("vector", None)
+        return merge_adjacent_chunks(documents) if self.merge_chunks else documents
+
+    def rerank_stats(self) -> dict[str, int]:
+        return dict(self._rerank_counts)
+
+    async def _cross_encode(
+        self,
+        *,
+        query: str,
+        documents: list[dict[str, Any]],
+        k: int,
+    ) -> list[dict[str, Any]]:
+        if len(documents) <= 1:
+            return documents
+        try:
+            # time queued behind other requests' batches counts too
+            async with asyncio.timeout(self.rerank_budget):
+                scores = await self.reranker.score(query=query, texts=[doc["text"] for doc in documents])
+        except TimeoutError:
+            self._rerank_counts["fallbacks"] += 1
+            return documents[:k]
+        except Exception:
+            logger.exception("cross-encoder re-ranking failed")
+            self._rerank_counts["fallbacks"] += 1
+            return documents[:k]
+
+        self._rerank_counts["reranked"] += 1
+        return [{**documents[i], "score": float(scores[i])} for i in top_k(scores, k)]
+
+    async def _search(
+        self,
+        *,
+        query_vector: np.ndarray,
+        k: int,
+        matched: np.ndarray | None,
+        **params: Any,
+    ) -> list[SearchHit]:
+        """Index search, restricted to ``matched`` metadata numbers if given"""
+        if matched is None:
+            return self.index.search(vector=query_vector, k=k, **params)
+        if len(matched) <= self.filter_brute_force_max:
+            # selective filter: exact scores over just the matching documents,
+            # read from Mongo only when the index keeps no float vectors
+            ids = self.metadata_index.ids_of(matched)
+            stored = self.index.get_vectors(ids=ids) if self.index.exact else None
+            if stored is None:
+                stored = await self.repository.get_vectors_by_ids(ids=ids)
+            ids, vectors = stored
+            return rerank_exact(query=query_vector, ids=ids, vectors=vectors, k=k)
+
+        # broad filter: oversample by the inverse selectivity and keep the
+        # matching candidates, widening until k are found
+        size = len(self.index)
+        fetch = k * max(1, size // len(matched)) * 2
+        while True:
+            fetch = min(fetch, size)
+            hits = self.index.search(vector=query_vector, k=fetch, **params)
+            mask = self.metadata_index.contains(ids=[hit.id for hit in hits], matched=matched)
+            kept = [hit for hit, keep in zip(hits, mask) if keep]
+            if len(kept) >= k or fetch >= size:
+                return kept[:k]
+            fetch *= 2
+
+    async def _retrieve_vector(
+        self,
+        *,
+        query_vector: np.ndarray,
+        k: int,
+        threshold: float,
+        with_vectors: bool = False,
+        matched: np.ndarray | None = None,
+        **params: Any,
+    ) -> list[dict[str, Any]]:
+        if self.index.exact:
+            hits = await self._search(query_vector=query_vector, k=k, matched=matched, **params)
+            documents = await self.repository.get_documents_by_ids(
+                ids=[h.id for h in hits],
+                with_vectors=with_vectors,
+            )
+        else:
+            # Approximate scores only pick the shortlist; rank it exactly
+            candidates = await self._search(
+                query_vector=query_vector, k=k * self.rerank_oversample, matched=matched, **params
+            )
+            documents = await self.repository.get_documents_by_ids(
+                ids=[h.id for h in candidates],
+                with_vectors=True,
+            )
+            if not documents:
+                return []
+            hits = rerank_exact(
+                query=query_vector,
+                ids=[doc["id"] for doc in documents],
+                vectors=np.vstack([doc["vector"] for doc in documents]),
+                k=k,
+            )
+            by_id = {doc["id"]: doc for doc in documents}
+            documents = [by_id[hit.id] for hit in hits]
+
+        scores = {hit.id: hit.score for hit in hits}
+        return [
+            {**doc, "score": scores[doc["id"]]}
+            for doc in documents
+            if scores[doc["id"]] >= threshold
+        ]
+
+    async def _retrieve_hybrid(
+        self,
+        *,
+        query_vector: np.ndarray,
+        query: str,
+        k: int,
+        threshold: float,
+        matched: np.ndarray | None = None,
+        **params: Any,
+    ) -> list[dict[str, Any]]:
+        shortlist = k * self.rerank_oversample
+        vector_hits = await self._search(query_vector=query_vector, k=shortlist, matched=matched, **params)
+        lexical_hits = self.lexical_index.search(query=query, k=shortlist)
+        if matched is not None:
+            mask = self.metadata_index.contains(ids=[hit.id for hit in lexical_hits], matched=matched)
+            lexical_hits = [hit for hit, keep in zip(lexical_hits, mask) if keep]
+        candidate_ids = list(dict.fromkeys(h.id for h in [*vector_hits, *lexical_hits]))
+        documents = await self.repository.get_documents_by_ids(ids=candidate_ids, with_vectors=True)
+        if not documents:
+            return []
+
+        # exact cosine for every candidate, so keyword-only hits rank too
+        cosine = rerank_exact(
+            query=query_vector,
+            ids=[doc["id"] for doc in documents],
+            vectors=np.vstack([doc["vector"] for doc in documents]),
+            k=len(documents),
+        )
+        by_id = {doc["id"]: doc for doc in documents}
+        fused = reciprocal_rank_fusion(
+            [
+                [hit.id for hit in cosine if hit.score >= threshold],
+                [hit.id for hit in lexical_hits if hit.id in by_id],
+            ],
+            k=self.rrf_k,
+        )
+        return [{**by_id[hit.id], "score": hit.score} for hit in fused[:k]]
+
+
+retrieval_service = RetrievalService(
+    index=vector_index,
+    repository=rag_document_repo,
+    rerank_oversample=config.RERANK_OVERSAMPLE or None,
+    lexical_index=lexical_index,
+    rrf_k=config.RRF_K,
+    reranker=reranker,
+    rerank_candidates=config.CROSS_ENCODER_CANDIDATES,
+    rerank_budget=config.CROSS_ENCODER_BUDGET_MS / 1000,
+    mmr_lambda=config.MMR_LAMBDA,
+    mmr_pool=config.MMR_POOL_SIZE,
+    metadata_index=metadata_index,
+    filter_brute_force_max=config.FILTER_BRUTE_FORCE_MAX,
+)
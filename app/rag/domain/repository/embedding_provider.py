@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
+
+
+class EmbeddingProvider(ABC):
+    @abstractmethod
+    async def embed(self, *, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into a float32 (len(texts), dim) matrix"""
@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
+
+
+class Reranker(ABC):
+    @abstractmethod
+    async def score(self, *, query: str, texts: Sequence[str]) -> np.ndarray:
+        """Relevance of each text to the query as float32, higher is better"""
@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from typing import Any, Sequence
+
+import numpy as np
+
+from app.rag.domain.vo.search_hit import SearchHit
+
+
+class VectorIndex(ABC):
+    # False when search scores are approximations that must be re-ranked
+    # against full precision vectors before being trusted
+    exact: bool = True
+    # Shortlist size multiplier used for that re-ranking
+    rerank_oversample: int = 4
+
+    @abstractmethod
+    def add(self, *, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Add vectors"""
+
+    @abstractmethod
+    def remove(self, *, ids: Sequence[str]) -> None:
+        """Remove vectors"""
+
+    @abstractmethod
+    def search(self, *, vector: np.ndarray, k: int, **params: Any) -> list[SearchHit]:
+        """Search top k by cosine similarity, with index specific params"""
+
+    def get_vectors(self, *, ids: Sequence[str]) -> tuple[list[str], np.ndarray] | None:
+        """Normalized full precision vectors of the indexed ``ids`` (others
+        left out), or None if the index does not keep them"""
+        return None
+
+    @abstractmethod
+    def save(self, *, path: str) -> None:
+        """Save to disk"""
+
+    @classmethod
+    @abstractmethod
+    def load(cls, *, path: str) -> "VectorIndex":
+        """Load from disk"""
+
+    @abstractmethod
+    def __contains__(self, id_: str) -> bool:
+        """Is id indexed"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of indexed vectors"""
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Chunk:
+    text: str
+    # character offsets into the parent document
+    start: int
+    end: int
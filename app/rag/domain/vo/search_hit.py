@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class SearchHit:
+    id: str
+    score: float
@@ -1,9 +1,26 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from functools import partial
+from typing import Awaitable, Callable
+
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from core.db.mongo_db import mongo_instance
 from app.rag.adapter.input.api.v1.rag import rag_router
+from app.rag.adapter.output.embedding import LocalEmbeddingProvider, embedding_provider
+from app.rag.adapter.output.index import SegmentedVectorIndex, lexical_index, metadata_index, vector_index
+from app.rag.adapter.output.index.loader import (
+    load_lexical_index,
+    load_metadata_index,
+    load_vector_index,
+    run_index_sync_loop,
+)
+from app.rag.adapter.output.persistence.mongo import rag_document_repo
+from app.rag.adapter.output.reranker import reranker
+from app.rag.application.service.ivf import ivf_service
 
 from app.auth.adapter.input.api import router as auth_router
 from app.container import Container
@@ -20,6 +37,8 @@ from core.fastapi.middlewares import (
 )
 from core.helpers.cache import Cache, CustomKeyMaker, RedisBackend
 
+logger = logging.getLogger(__name__)
+
 
 def init_routers(app_: FastAPI) -> None:
     container = Container()
@@ -30,14 +49,60 @@ def init_routers(app_: FastAPI) -> None:
     app_.include_router(book_router, prefix="/api/v1/book", tags=["book"])
     app_.include_router(rag_router, prefix="/api/v1/rag", tags=["rag"])
     
+async def run_segment_loop(*, index: SegmentedVectorIndex, interval: int) -> None:
+    """Seal the buffered rows once full or old enough, pick up other workers'
+    segments, and merge small segments in the one writer process"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if index.seal_due():
+                await asyncio.to_thread(index.seal)
+            await asyncio.to_thread(index.refresh)
+            if index.try_acquire_writer():
+                await asyncio.to_thread(index.merge)
+        except Exception:
+            logger.exception("segment maintenance failed")
+
+
+async def start_index_sync(*, load: Callable[..., Awaitable[int]]) -> None:
+    """Backfill an index from Mongo, then keep picking up documents that
+    Celery workers and other processes store"""
+    loaded_at = datetime.now(timezone.utc)
+    await load()
+    if config.INDEX_SYNC_INTERVAL:
+        asyncio.create_task(
+            run_index_sync_loop(load=load, interval=config.INDEX_SYNC_INTERVAL, since=loaded_at)
+        )
+
+
 def init_listeners(app_: FastAPI) -> None:
     #when starting the app
     @app_.on_event("startup")
     async def startup_event():
         mongo_instance.connect()
+        await rag_document_repo.ensure_indexes()
+        if isinstance(embedding_provider, LocalEmbeddingProvider):
+            await asyncio.to_thread(embedding_provider.load)
+        if reranker is not None:
+            await asyncio.to_thread(reranker.load)
+        # centroids first so the loaded vectors land in their final lists
+        await ivf_service.refresh()
+        # with shared segments one worker backfills, the rest pick its segments up
+        if not isinstance(vector_index, SegmentedVectorIndex) or vector_index.try_acquire_writer():
+            await start_index_sync(load=partial(load_vector_index, index=vector_index, repo=rag_document_repo))
+        # the keyword and filter indexes are per process
+        if lexical_index is not None:
+            await start_index_sync(load=partial(load_lexical_index, index=lexical_index, repo=rag_document_repo))
+        await start_index_sync(load=partial(load_metadata_index, index=metadata_index, repo=rag_document_repo))
+        if isinstance(vector_index, SegmentedVectorIndex):
+            asyncio.create_task(run_segment_loop(index=vector_index, interval=config.SEGMENT_REFRESH_INTERVAL))
+        if ivf_service.index is not None and config.IVF_REFRESH_INTERVAL:
+            asyncio.create_task(ivf_service.run_refresh_loop(interval=config.IVF_REFRESH_INTERVAL))
     #when stopping the app
     @app_.on_event("shutdown")
     async def shutdown_event():
+        if config.VECTOR_INDEX_PATH:
+            vector_index.save(path=config.VECTOR_INDEX_PATH)
         mongo_instance.close()
     # Exception handler- from the boiler plate
     @app_.exception_handler(CustomException)
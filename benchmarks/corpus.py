@@ -0,0 +1,68 @@
+import ast
+from pathlib import Path
+
+import numpy as np
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data.txt"
+
+
+def load_seed_documents(path: Path = DATA_PATH) -> list[dict[str, str]]:
+    """The ``raw_data`` list from ``data.txt``, blank texts dropped"""
+    source = path.read_text(encoding="utf-8")
+    documents = ast.literal_eval(source.split("=", 1)[1].strip())
+    return [doc for doc in documents if doc["text"].strip()]
+
+
+def make_clustered_corpus(
+    *,
+    size: int,
+    dim: int = 384,
+    clusters: int = 100,
+    latent_dim: int = 32,
+    seed: int = 0,
+) -> np.ndarray:
+    """Gaussian blobs varying along a shared low-rank subspace.
+
+    Sentence embeddings have a low intrinsic dimension; isotropic noise in
+    all 384 dims would make near neighbours indistinguishable and penalize
+    every compressed index unrealistically.
+    """
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim), dtype=np.float32)
+    basis = rng.standard_normal((latent_dim, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, size)
+    latent = rng.standard_normal((size, latent_dim), dtype=np.float32)
+    noise = rng.standard_normal((size, dim), dtype=np.float32)
+    deviation = latent @ basis / np.sqrt(latent_dim)
+    return centres[labels] + deviation + 0.05 * noise
+
+
+def make_seeded_corpus(*, size: int, embed: bool = False, seed: int = 0) -> np.ndarray:
+    """``data.txt`` expanded synthetically to ``size`` vectors.
+
+    With ``embed`` the seed texts are embedded through the HF Inference API
+    and each one is jittered into a cloud of near-paraphrases; without it the
+    seeds are replaced by random centres so the benchmark runs offline. The
+    jitter lives in a 32-d subspace, like the variation between paraphrases.
+    """
+    documents = load_seed_documents()
+    if embed:
+        from huggingface_hub import InferenceClient
+
+        from core.config import config
+
+        client = InferenceClient(token=config.HF_TOKEN)
+        centres = np.vstack(
+            [
+                np.asarray(client.feature_extraction(doc["text"], model=config.MODEL_ID), dtype=np.float32).reshape(-1)
+                for doc in documents
+            ]
+        )
+    else:
+        centres = make_clustered_corpus(size=len(documents), seed=seed)
+
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((32, centres.shape[1]), dtype=np.float32) / np.sqrt(32)
+    labels = rng.integers(0, len(centres), size)
+    latent = rng.standard_normal((size, 32), dtype=np.float32)
+    return centres[labels] + centres.std() * latent @ basis
@@ -0,0 +1,49 @@
+"""Recall@k and latency of the HNSW index for a sweep of ``ef_search``.
+
+    python -m benchmarks.hnsw_recall --size 20000 --ef 16,32,64,128,256
+"""
+import time
+
+import click
+
+from app.rag.adapter.output.index import FlatVectorIndex, HNSWVectorIndex
+from app.rag.adapter.output.index.evaluation import recall_at_k
+from benchmarks.corpus import make_clustered_corpus
+from benchmarks.vector_index import DIM, percentiles
+
+
+@click.command()
+@click.option("--size", default=20_000, type=int)
+@click.option("--queries", "n_queries", default=100, type=int)
+@click.option("--k", default=10, type=int)
+@click.option("--m", default=16, type=int)
+@click.option("--ef-construction", default=200, type=int)
+@click.option("--ef", default="16,32,64,128,256", help="Comma separated ef_search values")
+def main(size: int, n_queries: int, k: int, m: int, ef_construction: int, ef: str):
+    corpus = make_clustered_corpus(size=size + n_queries)
+    corpus, queries = corpus[:size], corpus[size:]
+    ids = [str(i) for i in range(size)]
+
+    exact = FlatVectorIndex(dim=DIM)
+    exact.add(ids=ids, vectors=corpus)
+
+    index = HNSWVectorIndex(dim=DIM, m=m, ef_construction=ef_construction, seed=0)
+    started = time.perf_counter()
+    for start in range(0, size, 1000):
+        index.add(ids=ids[start : start + 1000], vectors=corpus[start : start + 1000])
+    click.echo(f"built n={size:,} M={m} ef_construction={ef_construction} in {time.perf_counter() - started:.1f}s")
+
+    for ef_search in [int(e) for e in ef.split(",")]:
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(vector=query, k=k, ef_search=ef_search)
+            timings.append(time.perf_counter() - started)
+
+        recall = recall_at_k(index=index, exact=exact, queries=queries, k=k, ef_search=ef_search)
+        p50, p99 = percentiles(timings)
+        click.echo(f"ef_search={ef_search:>4} recall@{k}={recall:.3f} p50={p50:.2f}ms p99={p99:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
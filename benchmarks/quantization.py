@@ -0,0 +1,69 @@
+"""Memory and recall of the quantized indexes, with float re-ranking.
+
+    python -m benchmarks.quantization --size 100000
+    python -m benchmarks.quantization --index binary --oversample 4,10,20
+    python -m benchmarks.quantization --index pq --size 1000000
+    python -m benchmarks.quantization --embed   # needs HF_TOKEN
+"""
+import time
+
+import click
+
+from app.rag.adapter.output.index import (
+    BinaryQuantizedVectorIndex,
+    FlatVectorIndex,
+    PQVectorIndex,
+    ScalarQuantizedVectorIndex,
+)
+from app.rag.adapter.output.index.evaluation import reranked_recall_at_k
+from benchmarks.corpus import make_seeded_corpus
+from benchmarks.vector_index import percentiles
+
+INDEXES = {
+    "int8": ScalarQuantizedVectorIndex,
+    "binary": BinaryQuantizedVectorIndex,
+    "pq": PQVectorIndex,
+}
+
+
+@click.command()
+@click.option("--index", "kind", type=click.Choice(list(INDEXES)), default="int8")
+@click.option("--size", default=100_000, type=int)
+@click.option("--queries", "n_queries", default=200, type=int)
+@click.option("--k", default=10, type=int)
+@click.option("--oversample", default="1,2,4,8", help="Comma separated shortlist multipliers")
+@click.option("--embed", is_flag=True, default=False, help="Embed data.txt seeds via the HF API")
+def main(kind: str, size: int, n_queries: int, k: int, oversample: str, embed: bool):
+    corpus = make_seeded_corpus(size=size + n_queries, embed=embed)
+    corpus, queries = corpus[:size], corpus[size:]
+    ids = [str(i) for i in range(size)]
+
+    exact = FlatVectorIndex()
+    exact.add(ids=ids, vectors=corpus)
+    index = INDEXES[kind]()
+    index.add(ids=ids, vectors=corpus)
+
+    float_bytes = size * corpus.shape[1] * 4
+    click.echo(
+        f"n={size:,} float32={float_bytes / 2**20:.1f}MiB "
+        f"{kind}={index.nbytes / 2**20:.1f}MiB ({float_bytes / index.nbytes:.1f}x smaller)"
+    )
+
+    for name, candidate in (("float32", exact), (kind, index)):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            candidate.search(vector=query, k=k)
+            timings.append(time.perf_counter() - started)
+        p50, p99 = percentiles(timings)
+        click.echo(f"{name:>8} scan p50={p50:.2f}ms p99={p99:.2f}ms")
+
+    for factor in [int(f) for f in oversample.split(",")]:
+        recall = reranked_recall_at_k(
+            index=index, exact=exact, corpus=corpus, queries=queries, k=k, oversample=factor
+        )
+        click.echo(f"oversample={factor} recall@{k}={recall:.4f}")
+
+
+if __name__ == "__main__":
+    main()
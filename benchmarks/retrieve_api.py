@@ -0,0 +1,51 @@
+"""Latency of the running API's retrieval stage, without generation.
+
+Queries are the first sentences of the seed documents, so load them first
+(``python -m scripts.ingest_seed``).
+
+    python -m benchmarks.retrieve_api --k 10 --mode hybrid
+"""
+import time
+
+import click
+import httpx
+
+from benchmarks.corpus import load_seed_documents
+from benchmarks.vector_index import percentiles
+from core.config import config
+
+
+@click.command()
+@click.option("--url", default=config.BACKEND_URL, help="RAG API base url")
+@click.option("--queries", "n_queries", default=100, type=int)
+@click.option("--k", default=10, type=int)
+@click.option("--threshold", default=0.0, type=float)
+@click.option("--mode", default="vector", type=click.Choice(["vector", "hybrid"]))
+def main(url: str, n_queries: int, k: int, threshold: float, mode: str):
+    documents = load_seed_documents()
+    queries = [doc["text"].split(".")[0] for doc in documents][:n_queries]
+
+    total, embedding, retrieval = [], [], []
+    hits = 0
+    with httpx.Client(base_url=url, timeout=None) as client:
+        for query in queries:
+            started = time.perf_counter()
+            response = client.get(
+                "/retrieve",
+                params={"query": query, "k": k, "threshold": threshold, "mode": mode, "include_text": False},
+            )
+            total.append(time.perf_counter() - started)
+            response.raise_for_status()
+            result = response.json()
+            embedding.append(result["embedding_ms"] / 1000)
+            retrieval.append(result["retrieval_ms"] / 1000)
+            hits += len(result["hits"])
+
+    click.echo(f"{len(queries)} queries, k={k}, mode={mode}, {hits / len(queries):.1f} hits per query")
+    for name, timings in [("request", total), ("embedding", embedding), ("retrieval", retrieval)]:
+        p50, p99 = percentiles(timings)
+        click.echo(f"{name:>10} p50={p50:.2f}ms p99={p99:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
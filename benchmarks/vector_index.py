@@ -0,0 +1,116 @@
+"""Compare in-process vector search with the old Mongo ``$reduce`` pipeline.
+
+    python -m benchmarks.vector_index --sizes 10000,100000,1000000
+    python -m benchmarks.vector_index --mongo-uri mongodb://localhost:27017
+"""
+import time
+
+import click
+import numpy as np
+
+from app.rag.adapter.output.index import FlatVectorIndex
+
+DIM = 384
+K = 3
+
+
+def make_corpus(*, size: int, dim: int = DIM, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((size, dim), dtype=np.float32)
+
+
+def percentiles(timings: list[float]) -> tuple[float, float]:
+    ms = np.asarray(timings) * 1000
+    return float(np.percentile(ms, 50)), float(np.percentile(ms, 99))
+
+
+def cosine_pipeline(query_vector: list[float], k: int = K) -> list[dict]:
+    """The aggregation ``search_documents`` ran before the vector index"""
+    return [
+        {
+            "$addFields": {
+                "score": {
+                    "$let": {
+                        "vars": {"query": query_vector, "doc": "$vector"},
+                        "in": {
+                            "$divide": [
+                                {"$reduce": {
+                                    "input": {"$zip": {"inputs": ["$$query", "$$doc"]}},
+                                    "initialValue": 0,
+                                    "in": {"$add": ["$$value", {"$multiply": [{"$arrayElemAt": ["$$this", 0]}, {"$arrayElemAt": ["$$this", 1]}]}]},
+                                }},
+                                {"$multiply": [
+                                    {"$sqrt": {"$reduce": {"input": "$$query", "initialValue": 0, "in": {"$add": ["$$value", {"$pow": ["$$this", 2]}]}}}},
+                                    {"$sqrt": {"$reduce": {"input": "$$doc", "initialValue": 0, "in": {"$add": ["$$value", {"$pow": ["$$this", 2]}]}}}},
+                                ]},
+                            ]
+                        },
+                    }
+                }
+            }
+        },
+        {"$sort": {"score": -1}},
+        {"$limit": k},
+        {"$project": {"_id": 0, "score": 1}},
+    ]
+
+
+def bench_flat(*, corpus: np.ndarray, queries: np.ndarray) -> dict:
+    index = FlatVectorIndex(dim=corpus.shape[1])
+    started = time.perf_counter()
+    index.add(ids=[str(i) for i in range(len(corpus))], vectors=corpus)
+    build = time.perf_counter() - started
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(vector=query, k=K)
+        timings.append(time.perf_counter() - started)
+
+    p50, p99 = percentiles(timings)
+    return {"build_s": build, "p50_ms": p50, "p99_ms": p99}
+
+
+def bench_mongo(*, corpus: np.ndarray, queries: np.ndarray, uri: str) -> dict:
+    from pymongo import MongoClient
+
+    collection = MongoClient(uri)["rag_benchmark"]["rag_documents"]
+    collection.drop()
+    for start in range(0, len(corpus), 10_000):
+        collection.insert_many(
+            [{"vector": row.tolist()} for row in corpus[start : start + 10_000]]
+        )
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        list(collection.aggregate(cosine_pipeline(query.tolist())))
+        timings.append(time.perf_counter() - started)
+
+    collection.drop()
+    p50, p99 = percentiles(timings)
+    return {"p50_ms": p50, "p99_ms": p99}
+
+
+@click.command()
+@click.option("--sizes", default="10000,100000,1000000", help="Comma separated corpus sizes")
+@click.option("--queries", "n_queries", default=50, type=int)
+@click.option("--mongo-uri", default=None, help="Also run the $reduce pipeline")
+def main(sizes: str, n_queries: int, mongo_uri: str | None):
+    queries = make_corpus(size=n_queries, seed=1)
+    for size in [int(s) for s in sizes.split(",")]:
+        corpus = make_corpus(size=size)
+        flat = bench_flat(corpus=corpus, queries=queries)
+        click.echo(
+            f"n={size:>9,} flat   build={flat['build_s']:.2f}s "
+            f"p50={flat['p50_ms']:.2f}ms p99={flat['p99_ms']:.2f}ms"
+        )
+        if mongo_uri:
+            mongo = bench_mongo(corpus=corpus, queries=queries[:5], uri=mongo_uri)
+            click.echo(
+                f"n={size:>9,} mongo  p50={mongo['p50_ms']:.2f}ms p99={mongo['p99_ms']:.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
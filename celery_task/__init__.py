@@ -6,7 +6,13 @@ celery_app = Celery(
     "worker",
     backend=config.CELERY_BACKEND_URL,
     broker=config.CELERY_BROKER_URL,
+    include=["celery_task.tasks.rag"],
 )
 
-celery_app.conf.task_routes = {"worker.celery_worker.test_celery": "test-queue"}
+celery_app.conf.task_routes = {
+    "worker.celery_worker.test_celery": "test-queue",
+    # the API picks the interactive or bulk queue per job
+    "rag.ingest_documents": config.CELERY_BULK_QUEUE,
+    "rag.train_ivf_index": config.CELERY_BULK_QUEUE,
+}
 celery_app.conf.update(task_track_started=True)
@@ -0,0 +1,79 @@
+import asyncio
+
+from celery import Task
+
+from app.rag.adapter.output.embedding import embedding_provider
+from app.rag.adapter.output.persistence.mongo import rag_document_repo, rag_index_meta_repo
+from app.rag.application.service.embedding import EmbeddingService
+from app.rag.application.service.ingestion import IngestionService
+from app.rag.application.service.ivf import IVFService
+from celery_task import celery_app
+from core.config import config
+from core.db.mongo_db import mongo_instance
+
+
+async def _train_ivf_index(*, nlist: int, sample_size: int, iterations: int) -> dict:
+    mongo_instance.connect()
+    # training only reads and publishes, the workers have no index to partition
+    service = IVFService(repository=rag_document_repo, meta_repository=rag_index_meta_repo)
+    try:
+        return await service.train(nlist=nlist, sample_size=sample_size, iterations=iterations)
+    finally:
+        mongo_instance.close()
+
+
+@celery_app.task(name="rag.train_ivf_index")
+def train_ivf_index(
+    nlist: int | None = None,
+    sample_size: int | None = None,
+    iterations: int | None = None,
+) -> dict:
+    return asyncio.run(
+        _train_ivf_index(
+            nlist=nlist or config.IVF_NLIST,
+            sample_size=sample_size or config.IVF_TRAIN_SAMPLE,
+            iterations=iterations or config.IVF_TRAIN_ITERATIONS,
+        )
+    )
+
+
+async def _ingest_documents(task: Task, *, documents: list[dict]) -> dict:
+    mongo_instance.connect()
+    # A fresh service per run: each task gets its own event loop. No index or
+    # answer cache here, API workers sync new documents from Mongo
+    service = IngestionService(
+        embedding_service=EmbeddingService(
+            provider=embedding_provider,
+            max_concurrency=config.EMBEDDING_MAX_CONCURRENCY,
+            timeout=config.EMBEDDING_TIMEOUT,
+            max_batch_size=config.EMBEDDING_MAX_BATCH_SIZE,
+            batch_window=0,
+        ),
+        repository=rag_document_repo,
+    )
+    stored = duplicates = failed = 0
+    errors = []
+    try:
+        for start in range(0, len(documents), config.INGEST_BATCH_SIZE):
+            batch = documents[start : start + config.INGEST_BATCH_SIZE]
+            outcomes = await service.ingest_many(
+                texts=[doc["text"] for doc in batch],
+                sources=[doc["source_name"] for doc in batch],
+            )
+            for offset, outcome in enumerate(outcomes):
+                if "error" in outcome:
+                    failed += 1
+                    errors.append({"index": start + offset, "detail": outcome["error"]})
+                else:
+                    stored += 1
+                    duplicates += not outcome["chunks"]
+            task.update_state(state="PROGRESS", meta={"done": start + len(batch), "total": len(documents)})
+    finally:
+        mongo_instance.close()
+    return {"stored": stored, "duplicates": duplicates, "failed": failed, "errors": errors}
+
+
+@celery_app.task(name="rag.ingest_documents", bind=True)
+def ingest_documents(self: Task, documents: list[dict]) -> dict:
+    """Embed and store ``{"text", "source_name"}`` documents"""
+    return asyncio.run(_ingest_documents(self, documents=documents))
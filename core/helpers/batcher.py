@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Sequence
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Coalesces concurrent calls into one batched call.
+
+    Items submitted within ``window`` seconds of the first queued one, or
+    until ``max_batch_size`` items are queued, are sent to ``handler`` as a
+    single list; each caller gets back its own rows of the result.
+    """
+
+    def __init__(
+        self,
+        *,
+        handler: Callable[[list[Any]], Awaitable[np.ndarray]],
+        max_batch_size: int = 32,
+        window: float = 0.005,
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._queue: list[tuple[list[Any], asyncio.Future, float]] = []
+        self._queued_items = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def submit(self, items: Sequence[Any]) -> np.ndarray:
+        items = list(items)
+        if len(items) > self.max_batch_size:
+            chunks = [
+                items[i : i + self.max_batch_size]
+                for i in range(0, len(items), self.max_batch_size)
+            ]
+            return np.concatenate(await asyncio.gather(*(self.submit(c) for c in chunks)))
+
+        loop = asyncio.get_running_loop()
+        if self._queued_items + len(items) > self.max_batch_size:
+            self._flush()
+        future = loop.create_future()
+        self._queue.append((items, future, time.perf_counter()))
+        self._queued_items += len(items)
+        if self._queued_items >= self.max_batch_size or self.window <= 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "avg_batch_fill": self.items / (self.batches * self.max_batch_size) if self.batches else 0.0,
+            "avg_queue_wait_ms": 1000 * self.wait_seconds / self.requests if self.requests else 0.0,
+            "max_queue_wait_ms": 1000 * self.max_wait_seconds,
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._queue:
+            return
+
+        batch, self._queue, self._queued_items = self._queue, [], 0
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[list[Any], asyncio.Future, float]]) -> None:
+        now = time.perf_counter()
+        items = [item for request, _, _ in batch for item in request]
+        self.batches += 1
+        self.items += len(items)
+        for _, _, queued_at in batch:
+            self.requests += 1
+            self.wait_seconds += now - queued_at
+            self.max_wait_seconds = max(self.max_wait_seconds, now - queued_at)
+
+        try:
+            result = await self.handler(items)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for request, future, _ in batch:
+            # callers that timed out have already cancelled their future
+            if not future.done():
+                future.set_result(result[offset : offset + len(request)])
+            offset += len(request)
@@ -0,0 +1,48 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class ConcurrencyLimiter:
+    """Semaphore that also reports how many callers are queued and running"""
+
+    def __init__(self, *, limit: int):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.in_flight = 0
+        self.peak_waiting = 0
+        self.acquired = 0
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self, *, timeout: float | None = None) -> AsyncIterator[None]:
+        """Hold one slot; ``timeout`` bounds only the wait for it"""
+        started = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            async with asyncio.timeout(timeout):
+                await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.acquired += 1
+        self.wait_seconds += time.perf_counter() - started
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "limit": self.limit,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "peak_waiting": self.peak_waiting,
+            "acquired": self.acquired,
+            "avg_wait_ms": 1000 * self.wait_seconds / self.acquired if self.acquired else 0.0,
+        }
@@ -0,0 +1,73 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+# Gemini averages about four characters per token on English text; close
+# enough to budget a prompt without a tokenizer round trip
+CHARS_PER_TOKEN = 4
+# A document cut mid-sentence is only worth it with this much room left
+MIN_FRAGMENT_TOKENS = 32
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class PackedContext:
+    texts: list[str]
+    # estimated tokens of ``texts``
+    tokens: int
+    # documents left out: repeats of packed text, or no room left
+    dropped: int
+    # documents packed with repeated sentences removed or cut to fit
+    trimmed: int
+
+
+def pack_context(context: Sequence[str | dict[str, Any]], *, max_tokens: int) -> PackedContext:
+    """Fit documents into ``max_tokens``, best ``score`` first.
+
+    ``context`` holds texts, or retrieval results with ``text`` and
+    ``score`` (plain texts keep their order). Sentences already packed from
+    another document are skipped, which drops duplicates and trims chunk
+    overlaps; a document that does not fit whole keeps the sentences that do.
+    """
+    ranked = sorted(
+        enumerate(context),
+        key=lambda item: (0.0 if isinstance(item[1], str) else -item[1].get("score", 0.0), item[0]),
+    )
+    packed = PackedContext(texts=[], tokens=0, dropped=0, trimmed=0)
+    seen: set[str] = set()
+    for _, doc in ranked:
+        text = doc if isinstance(doc, str) else doc["text"]
+        sentences = [s for s in SENTENCE_BREAK.split(text.strip()) if s]
+        fresh = [s for s in sentences if _sentence_key(s) not in seen]
+
+        room = max_tokens - packed.tokens
+        kept, cost = [], 0
+        for sentence in fresh:
+            tokens = estimate_tokens(sentence) + (1 if kept else 0)
+            if cost + tokens > room:
+                if not kept and room >= MIN_FRAGMENT_TOKENS:
+                    # one long sentence: cut at the last word that fits
+                    fragment = sentence[: room * CHARS_PER_TOKEN].rsplit(" ", 1)[0]
+                    kept, cost = [fragment], estimate_tokens(fragment)
+                break
+            kept.append(sentence)
+            cost += tokens
+
+        if not kept:
+            packed.dropped += 1
+            continue
+        if kept != sentences:
+            packed.trimmed += 1
+        seen.update(_sentence_key(s) for s in kept)
+        packed.texts.append(" ".join(kept))
+        packed.tokens += cost
+    return packed
+
+
+def _sentence_key(sentence: str) -> str:
+    return WHITESPACE.sub(" ", sentence).strip().casefold()
@@ -1,16 +1,81 @@
+import asyncio
+from typing import AsyncIterator
+
 import google.generativeai as genai
 from core.config import config
+from core.helpers.limiter import ConcurrencyLimiter
+from core.llm.context import PackedContext, pack_context
+
+#answers starting with this are failures, not model output
+ERROR_PREFIX="Error generating answer: "
 
 class GeminiGenerator:
-    def __init__(self):
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 4,
+        timeout: float | None = 30.0,
+        context_tokens: int = 2000,
+    ):
         #hardcoded key
         self.key=config.GOOGLE_API_KEY
         genai.configure(api_key=self.key)
         self.model=genai.GenerativeModel('gemini-2.5-flash')
+        self.timeout=timeout
+        self.limiter=ConcurrencyLimiter(limit=max_concurrency)
+        self.context_tokens=context_tokens
     
     def generate_answer(self, context: list, user_question: str)->str:
-        #formatting context
-        formatted_context="\n".join([f"<doc>{doc.strip()}</doc>" for doc in context])
+        prompt=self.build_prompt(context, user_question)
+        try:
+            response=self.model.generate_content(prompt)
+            return response.text
+        except Exception as e:
+            return f"{ERROR_PREFIX}{str(e)}"
+
+    async def generate_answer_async(self, context: list, user_question: str)->str:
+        #same as generate_answer without blocking the event loop; the timeout
+        #includes time spent queued behind other in-flight calls
+        prompt=self.build_prompt(context, user_question)
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self.limiter.slot():
+                    response=await self.model.generate_content_async(prompt)
+            return response.text
+        except TimeoutError:
+            return f"{ERROR_PREFIX}timed out"
+        except Exception as e:
+            return f"{ERROR_PREFIX}{str(e)}"
+
+    async def stream_answer(self, context: list, user_question: str)->AsyncIterator[str]:
+        #yields answer text as Gemini produces it; the timeout applies to the
+        #wait for a slot and then to the wait for each chunk
+        prompt=self.build_prompt(context, user_question)
+        try:
+            async with self.limiter.slot(timeout=self.timeout):
+                response=await asyncio.wait_for(
+                    self.model.generate_content_async(prompt, stream=True), self.timeout
+                )
+                chunks=aiter(response)
+                while True:
+                    try:
+                        chunk=await asyncio.wait_for(anext(chunks), self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    yield chunk.text
+        except TimeoutError:
+            yield f"{ERROR_PREFIX}timed out"
+        except Exception as e:
+            yield f"{ERROR_PREFIX}{str(e)}"
+
+    def pack_context(self, context: list)->PackedContext:
+        #context docs (texts or retrieval results) that fit the token budget;
+        #callers pack once and pass the packed texts to the answer methods
+        return pack_context(context, max_tokens=self.context_tokens)
+
+    def build_prompt(self, context: list[str], user_question: str)->str:
+        #formatting context as given, see pack_context to bound its size
+        formatted_context="\n".join([f"<doc>{doc}</doc>" for doc in context])
 
         #prompt
         prompt=f"""
@@ -32,10 +97,10 @@ class GeminiGenerator:
         4. Maintain a professional, direct tone.
         </constraints>
         """
-        try:
-            response=self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error generating answer: {str(e)}"
+        return prompt
 
-gemini_generator=GeminiGenerator()
\ No newline at end of file
+gemini_generator=GeminiGenerator(
+    max_concurrency=config.LLM_MAX_CONCURRENCY,
+    timeout=config.LLM_TIMEOUT,
+    context_tokens=config.LLM_CONTEXT_TOKENS,
+)
\ No newline at end of file
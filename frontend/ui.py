@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 import sys
 import os
 
@@ -63,28 +64,43 @@ with tab_chat:
     
     with st.form("search_form"):
         query = st.text_input("Query", label_visibility="collapsed")
+        sources = st.text_input("Sources", placeholder="Only search these sources (comma separated, optional)")
         search_submitted = st.form_submit_button("Search", type="primary", use_container_width=True)
 
     if search_submitted:
         if query:
-            with st.spinner("Thinking... (Searching Vector DB + Gemini)"):
-                try:
-                    params = {"query": query}
-                    response = requests.get(f"{BACKEND_URL}/search", params=params)
+            try:
+                params = {"query": query}
+                if sources.strip():
+                    params["source"] = [s.strip() for s in sources.split(",") if s.strip()]
+                # answer is streamed as NDJSON events, rendered as they arrive
+                with st.spinner("Searching Vector DB..."):
+                    response = requests.get(f"{BACKEND_URL}/search/stream", params=params, stream=True)
+                
+                if response.status_code == 200:
+                    st.subheader("💡 Answer")
+                    answer_box = st.empty()
+                    answer = ""
+                    sources = []
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        event = json.loads(line)
+                        if event["type"] == "sources":
+                            sources = event["sources"]
+                        elif event["type"] == "token":
+                            answer += event["text"]
+                            answer_box.success(answer + "▌")
+                    answer_box.success(answer)
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        st.subheader("💡 Answer")
-                        st.success(data["answer"])
-                        
-                        if data.get("sources"):
-                            with st.expander("View Sources"):
-                                for s in data["sources"]:
-                                    st.markdown(f"- `{s}`")
-                    else:
-                        st.error(f"Backend Error ({response.status_code}): {response.text}")
-                except Exception as e:
-                    st.error(f"Connection Error: Is the backend running? \n\n{e}")
+                    if sources:
+                        with st.expander("View Sources"):
+                            for s in sources:
+                                st.markdown(f"- `{s}`")
+                else:
+                    st.error(f"Backend Error ({response.status_code}): {response.text}")
+            except Exception as e:
+                st.error(f"Connection Error: Is the backend running? \n\n{e}")
         else:
             st.warning("⚠️ Please enter a question.")
 
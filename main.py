@@ -18,15 +18,20 @@ from core.config import config
     is_flag=True,
     default=False,
 )
-def main(env: str, debug: bool):
+@click.option(
+    "--workers",
+    type=click.INT,
+    default=1,
+)
+def main(env: str, debug: bool, workers: int):
     os.environ["ENV"] = env
     os.environ["DEBUG"] = str(debug)
     uvicorn.run(
         app="app.server:app",
         host=config.APP_HOST,
         port=config.APP_PORT,
-        reload=True if config.ENV != "production" else False,
-        workers=1,
+        reload=True if config.ENV != "production" and workers == 1 else False,
+        workers=workers,
     )
 
 
@@ -0,0 +1,36 @@
+"""Load the ``data.txt`` seed corpus through the bulk ingest endpoint.
+
+    python -m scripts.ingest_seed
+    python -m scripts.ingest_seed --url http://localhost:8000/api/v1/rag
+"""
+import json
+
+import click
+import httpx
+
+from benchmarks.corpus import load_seed_documents
+from core.config import config
+
+
+@click.command()
+@click.option("--url", default=config.BACKEND_URL, help="RAG API base url")
+def main(url: str):
+    body = "".join(
+        json.dumps({"text": doc["text"], "source_name": doc["source"]}) + "\n"
+        for doc in load_seed_documents()
+    )
+    response = httpx.post(
+        f"{url}/ingest/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+        timeout=None,
+    )
+    response.raise_for_status()
+    result = response.json()
+    click.echo(
+        f"stored {result['stored']} ({result['duplicates']} already present), failed {result['failed']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
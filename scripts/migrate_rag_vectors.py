@@ -0,0 +1,52 @@
+"""One-off migration of ``rag_documents.vector`` from BSON arrays to packed BinData.
+
+    python -m scripts.migrate_rag_vectors --dtype float32 --batch-size 1000
+
+Idempotent: documents that already hold a packed vector are not touched.
+"""
+import asyncio
+
+import click
+from pymongo import UpdateOne
+
+from app.rag.adapter.output.persistence.mongo.vector_codec import DTYPE_CODES, encode_vector
+from core.db.mongo_db import mongo_instance
+
+
+async def migrate(*, dtype: str, batch_size: int) -> int:
+    mongo_instance.connect()
+    collection = mongo_instance.db.rag_documents
+    migrated = 0
+    operations: list[UpdateOne] = []
+    try:
+        cursor = collection.find({"vector": {"$type": "array"}}, {"vector": 1})
+        async for doc in cursor:
+            operations.append(
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"vector": encode_vector(doc["vector"], dtype=dtype)}},
+                )
+            )
+            if len(operations) == batch_size:
+                await collection.bulk_write(operations, ordered=False)
+                migrated += len(operations)
+                operations = []
+
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+    finally:
+        mongo_instance.close()
+    return migrated
+
+
+@click.command()
+@click.option("--dtype", type=click.Choice(list(DTYPE_CODES)), default="float32")
+@click.option("--batch-size", default=1000, type=int)
+def main(dtype: str, batch_size: int):
+    migrated = asyncio.run(migrate(dtype=dtype, batch_size=batch_size))
+    click.echo(f"packed {migrated} vectors as {dtype}")
+
+
+if __name__ == "__main__":
+    main()
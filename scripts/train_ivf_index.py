@@ -0,0 +1,29 @@
+"""Retrain the IVF coarse quantizer from the vectors in ``rag_documents``.
+
+    python -m scripts.train_ivf_index --enqueue      # run on a Celery worker
+    python -m scripts.train_ivf_index --nlist 2048   # run in this process
+
+API workers pick up the new centroids within IVF_REFRESH_INTERVAL seconds.
+"""
+import click
+
+from celery_task.tasks.rag import train_ivf_index
+from core.config import config
+
+
+@click.command()
+@click.option("--nlist", default=config.IVF_NLIST, type=int)
+@click.option("--sample-size", default=config.IVF_TRAIN_SAMPLE, type=int)
+@click.option("--iterations", default=config.IVF_TRAIN_ITERATIONS, type=int)
+@click.option("--enqueue", is_flag=True, default=False, help="Send to a Celery worker")
+def main(nlist: int, sample_size: int, iterations: int, enqueue: bool):
+    kwargs = {"nlist": nlist, "sample_size": sample_size, "iterations": iterations}
+    if enqueue:
+        result = train_ivf_index.delay(**kwargs)
+        click.echo(f"queued {result.id}")
+    else:
+        click.echo(train_ivf_index(**kwargs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.rag.adapter.input.api.v1 import rag
+from app.rag.adapter.output.cache.answer import SemanticAnswerCache
+from app.rag.application.service.embedding import EmbeddingService
+from tests.support.embedding_provider import SlowProvider
+
+BASE_URL = "http://test"
+
+
+def make_app() -> FastAPI:
+    app_ = FastAPI()
+    app_.include_router(rag.rag_router, prefix="/api/v1/rag")
+    return app_
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_overlap(monkeypatch):
+    # Given
+    async def retrieve(**kwargs):
+        return []
+
+    monkeypatch.setattr(rag.mongo_instance, "client", object())
+    monkeypatch.setattr(
+        rag,
+        "embedding_service",
+        EmbeddingService(provider=SlowProvider(delay=0.2), max_concurrency=10),
+    )
+    monkeypatch.setattr(rag.retrieval_service, "retrieve", retrieve)
+
+    # When
+    started = time.perf_counter()
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        responses = await asyncio.gather(
+            *(client.get("/api/v1/rag/search", params={"query": f"q{i}"}) for i in range(10))
+        )
+    elapsed = time.perf_counter() - started
+
+    # Then
+    assert [response.status_code for response in responses] == [200] * 10
+    assert elapsed < 0.2 * 10 / 2
+
+
+@pytest.mark.asyncio
+async def test_stream_search_sends_sources_before_tokens(monkeypatch):
+    # Given
+    async def retrieve(**kwargs):
+        return [{"id": "a", "text": "text a", "source": "doc-a", "score": 0.9}]
+
+    async def stream_answer(context, query):
+        yield "The "
+        yield "answer"
+
+    async def embed_query(*, text):
+        return np.ones(3, dtype=np.float32)
+
+    monkeypatch.setattr(rag.mongo_instance, "client", object())
+    monkeypatch.setattr(rag, "answer_cache", SemanticAnswerCache())
+    monkeypatch.setattr(rag.embedding_service, "embed_query", embed_query)
+    monkeypatch.setattr(rag.retrieval_service, "retrieve", retrieve)
+    monkeypatch.setattr(rag.gemini_generator, "stream_answer", stream_answer)
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        response = await client.get("/api/v1/rag/search/stream", params={"query": "q"})
+
+    # Then
+    sut = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert sut == [
+        {"type": "sources", "sources": ["doc-a"]},
+        {"type": "token", "text": "The "},
+        {"type": "token", "text": "answer"},
+        {"type": "done", "context_tokens": 2},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_repeated_search_reuses_cached_answer(monkeypatch):
+    # Given
+    calls = []
+
+    async def retrieve(**kwargs):
+        return [{"id": "a", "text": "text a", "source": "doc-a", "score": 0.9}]
+
+    async def generate_answer_async(context, query):
+        calls.append(query)
+        return "generated"
+
+    async def embed_query(*, text):
+        return np.ones(3, dtype=np.float32)
+
+    monkeypatch.setattr(rag.mongo_instance, "client", object())
+    monkeypatch.setattr(rag, "answer_cache", SemanticAnswerCache())
+    monkeypatch.setattr(rag.embedding_service, "embed_query", embed_query)
+    monkeypatch.setattr(rag.retrieval_service, "retrieve", retrieve)
+    monkeypatch.setattr(rag.gemini_generator, "generate_answer_async", generate_answer_async)
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        first = await client.get("/api/v1/rag/search", params={"query": "what is a?"})
+        second = await client.get("/api/v1/rag/search", params={"query": "What is a"})
+
+    # Then
+    assert first.json()["answer"] == second.json()["answer"] == "generated"
+    assert calls == ["what is a?"]
+
+
+@pytest.mark.asyncio
+async def test_search_passes_retrieval_mode_and_filters(monkeypatch):
+    # Given
+    calls = []
+
+    async def embed_query(*, text):
+        return np.ones(4, dtype=np.float32)
+
+    async def retrieve(**kwargs):
+        calls.append((kwargs["query"], kwargs["mode"], kwargs["filters"]))
+        return []
+
+    monkeypatch.setattr(rag.mongo_instance, "client", object())
+    monkeypatch.setattr(rag.embedding_service, "embed_query", embed_query)
+    monkeypatch.setattr(rag.retrieval_service, "retrieve", retrieve)
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        hybrid = await client.get(
+            "/api/v1/rag/search",
+            params={"query": "muzan", "mode": "hybrid", "source": ["Anime Lore", "Wiki"]},
+        )
+        default = await client.get("/api/v1/rag/search", params={"query": "muzan"})
+        invalid = await client.get("/api/v1/rag/search", params={"query": "muzan", "mode": "fuzzy"})
+
+    # Then
+    assert hybrid.status_code == default.status_code == 200
+    assert invalid.status_code == 422
+    assert calls == [
+        ("muzan", "hybrid", {"source": ["Anime Lore", "Wiki"]}),
+        ("muzan", rag.config.RETRIEVAL_MODE, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_retrieve_returns_scored_hits_without_generation(monkeypatch):
+    # Given
+    calls = []
+
+    async def embed_query(*, text):
+        return np.ones(4, dtype=np.float32)
+
+    async def retrieve(**kwargs):
+        calls.append(kwargs)
+        return [
+            {"id": "c1", "ids": ["c0", "c1"], "parent_id": "p", "text": "text", "source": "docs", "score": 0.8},
+            {"id": "x", "text": "other", "source": "lore", "score": 0.4},
+        ]
+
+    async def generate_answer_async(context, query):
+        raise AssertionError("retrieve must not generate")
+
+    monkeypatch.setattr(rag.mongo_instance, "client", object())
+    monkeypatch.setattr(rag.embedding_service, "embed_query", embed_query)
+    monkeypatch.setattr(rag.retrieval_service, "retrieve", retrieve)
+    monkeypatch.setattr(rag.gemini_generator, "generate_answer_async", generate_answer_async)
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        response = await client.get(
+            "/api/v1/rag/retrieve",
+            params={"query": "q", "k": 10, "threshold": 0.3, "source": "docs", "nprobe": 4, "include_text": "false"},
+        )
+        invalid = await client.get("/api/v1/rag/retrieve", params={"query": "q", "k": 0})
+
+    # Then
+    sut = response.json()
+    assert response.status_code == 200
+    assert invalid.status_code == 422
+    assert (calls[0]["k"], calls[0]["threshold"], calls[0]["nprobe"]) == (10, 0.3, 4)
+    assert calls[0]["filters"] == {"source": ["docs"]}
+    assert sut["hits"][0] == {
+        "id": "c1", "ids": ["c0", "c1"], "parent_id": "p", "source": "docs", "text": None, "score": 0.8
+    }
+    assert sut["hits"][1]["ids"] == ["x"]
+    assert sut["embedding_ms"] >= 0 and sut["retrieval_ms"] >= 0
+
+
+class RecordingIngestion:
+    def __init__(self):
+        self.batches = []
+
+    async def ingest_many(self, *, texts, sources):
+        self.batches.append(list(texts))
+        return [
+            {"error": "write failed"}
+            if text == "bad"
+            else {"id": f"id-{text}", "chunks": int(text != "c"), "duplicates": int(text == "c")}
+            for text in texts
+        ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_ingest_json_array(monkeypatch):
+    # Given
+    ingestion = RecordingIngestion()
+    monkeypatch.setattr(rag.mongo_instance, "client", object())
+    monkeypatch.setattr(rag, "ingestion_service", ingestion)
+    monkeypatch.setattr(rag.config, "INGEST_BATCH_SIZE", 2)
+    body = [
+        {"text": "a", "source_name": "s"},
+        {"text": "b"},
+        {"text": "bad", "source_name": "s"},
+        {"text": "c", "source_name": "s"},
+    ]
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        response = await client.post("/api/v1/rag/ingest/bulk", json=body)
+
+    # Then
+    sut = response.json()
+    assert ingestion.batches == [["a", "bad"], ["c"]]
+    assert (sut["stored"], sut["duplicates"], sut["failed"]) == (2, 1, 2)
+    assert [result["status"] for result in sut["results"]] == ["success", "error", "error", "success"]
+    assert sut["results"][0]["id"] == "id-a"
+    assert [sut["results"][i]["duplicate"] for i in (0, 3)] == [False, True]
+    assert sut["results"][1]["detail"][0]["loc"] == ["source_name"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_ingest_ndjson_stream(monkeypatch):
+    # Given
+    ingestion = RecordingIngestion()
+    monkeypatch.setattr(rag.mongo_instance, "client", object())
+    monkeypatch.setattr(rag, "ingestion_service", ingestion)
+
+    async def body():
+        yield b'{"text": "a", "source_name": "s"}\n{"text": '
+        yield b'"b", "source_name": "s"}\nnot json\n'
+        yield b'{"text": "c", "source_name": "s"}'
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        response = await client.post(
+            "/api/v1/rag/ingest/bulk",
+            content=body(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    # Then
+    sut = response.json()
+    assert ingestion.batches == [["a", "b", "c"]]
+    assert [result["status"] for result in sut["results"]] == ["success", "success", "error", "success"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_ingest_rejects_non_array(monkeypatch):
+    # Given
+    monkeypatch.setattr(rag.mongo_instance, "client", object())
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        response = await client.post("/api/v1/rag/ingest/bulk", json={"text": "a"})
+
+    # Then
+    assert response.status_code == 400
+
+
+class FakeGroupResult:
+    saved = []
+
+    def __init__(self, *, id, results, app=None):
+        self.id = id
+        self.results = results
+
+    def save(self):
+        FakeGroupResult.saved.append(self)
+
+
+@pytest.mark.asyncio
+async def test_small_ingest_job_goes_to_interactive_queue(monkeypatch):
+    # Given
+    enqueued = []
+
+    async def enqueue_ingest_chunk(chunk, *, queue):
+        enqueued.append((len(chunk), queue))
+        return f"task-{len(enqueued)}"
+
+    monkeypatch.setattr(rag, "enqueue_ingest_chunk", enqueue_ingest_chunk)
+    monkeypatch.setattr(rag, "GroupResult", FakeGroupResult)
+    monkeypatch.setattr(rag.config, "INGEST_JOB_CHUNK_SIZE", 2)
+    body = [{"text": "a", "source_name": "s"}, {"text": "b", "source_name": "s"}, {"text": "c"}]
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        response = await client.post("/api/v1/rag/ingest/jobs", json=body)
+
+    # Then
+    sut = response.json()
+    assert response.status_code == 202
+    assert enqueued == [(2, rag.config.CELERY_INTERACTIVE_QUEUE)]
+    assert (sut["queue"], sut["queued"]) == (rag.config.CELERY_INTERACTIVE_QUEUE, 2)
+    assert [item["index"] for item in sut["rejected"]] == [2]
+    assert FakeGroupResult.saved[-1].id == sut["job_id"]
+
+
+@pytest.mark.asyncio
+async def test_large_ingest_job_goes_to_bulk_queue(monkeypatch):
+    # Given
+    enqueued = []
+
+    async def enqueue_ingest_chunk(chunk, *, queue):
+        enqueued.append((len(chunk), queue))
+        return f"task-{len(enqueued)}"
+
+    monkeypatch.setattr(rag, "enqueue_ingest_chunk", enqueue_ingest_chunk)
+    monkeypatch.setattr(rag, "GroupResult", FakeGroupResult)
+    monkeypatch.setattr(rag.config, "INGEST_JOB_CHUNK_SIZE", 2)
+    body = "".join(f'{{"text": "{i}", "source_name": "s"}}\n' for i in range(5))
+
+    # When
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url=BASE_URL) as client:
+        response = await client.post(
+            "/api/v1/rag/ingest/jobs",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    # Then
+    bulk = rag.config.CELERY_BULK_QUEUE
+    assert enqueued == [(2, bulk), (2, bulk), (1, bulk)]
+    assert response.json()["queued"] == 5
+
+
+def test_summarize_ingest_job():
+    # Given
+    class Result:
+        def __init__(self, state, result=None):
+            self.state = state
+            self.result = result
+
+        def successful(self):
+            return self.state == "SUCCESS"
+
+        def failed(self):
+            return self.state == "FAILURE"
+
+    job = FakeGroupResult(
+        id="job",
+        results=[
+            Result("SUCCESS", {"stored": 9, "duplicates": 4, "failed": 1, "errors": []}),
+            Result("PROGRESS"),
+        ],
+    )
+
+    # When
+    sut = rag.summarize_ingest_job(job)
+
+    # Then
+    assert sut == {
+        "job_id": "job",
+        "tasks": 2,
+        "completed": 1,
+        "stored": 9,
+        "duplicates": 4,
+        "failed": 1,
+        "errors": [],
+        "state": "running",
+    }
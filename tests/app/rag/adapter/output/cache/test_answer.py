@@ -0,0 +1,89 @@
+import numpy as np
+
+from app.rag.adapter.output.cache.answer import SemanticAnswerCache
+
+query = np.array([1, 0, 0], dtype=np.float32)
+near_query = np.array([1, 0.05, 0], dtype=np.float32)
+far_query = np.array([1, 1, 0], dtype=np.float32)
+
+
+def test_near_duplicate_with_same_sources_hits():
+    # Given
+    cache = SemanticAnswerCache(max_distance=0.05)
+    cache.put(query_vector=query, source_ids=["a", "b"], answer="cached")
+
+    # When
+    sut = cache.get(query_vector=near_query, source_ids=["b", "a"])
+
+    # Then
+    assert sut == "cached"
+    assert cache.stats()["hits"] == 1
+
+
+def test_distant_query_misses():
+    # Given
+    cache = SemanticAnswerCache(max_distance=0.05)
+    cache.put(query_vector=query, source_ids=["a"], answer="cached")
+
+    # When
+    sut = cache.get(query_vector=far_query, source_ids=["a"])
+
+    # Then
+    assert sut is None
+
+
+def test_changed_sources_miss():
+    # Given
+    cache = SemanticAnswerCache()
+    cache.put(query_vector=query, source_ids=["a"], answer="cached")
+
+    # When
+    sut = cache.get(query_vector=query, source_ids=["a", "new"])
+
+    # Then
+    assert sut is None
+
+
+def test_expired_entry_is_evicted():
+    # Given
+    cache = SemanticAnswerCache(ttl=0)
+    cache.put(query_vector=query, source_ids=["a"], answer="cached")
+
+    # When
+    sut = cache.get(query_vector=query, source_ids=["a"])
+
+    # Then
+    assert sut is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_slot_is_recycled():
+    # Given
+    cache = SemanticAnswerCache(max_size=2)
+    cache.put(query_vector=np.array([1, 0, 0]), source_ids=["a"], answer="x")
+    cache.put(query_vector=np.array([0, 1, 0]), source_ids=["a"], answer="y")
+    cache.get(query_vector=np.array([1, 0, 0]), source_ids=["a"])
+
+    # When
+    cache.put(query_vector=np.array([0, 0, 1]), source_ids=["a"], answer="z")
+
+    # Then
+    assert len(cache) == 2
+    assert cache.get(query_vector=np.array([0, 1, 0]), source_ids=["a"]) is None
+    assert cache.get(query_vector=np.array([1, 0, 0]), source_ids=["a"]) == "x"
+    assert cache.get(query_vector=np.array([0, 0, 1]), source_ids=["a"]) == "z"
+
+
+def test_invalidation():
+    # Given
+    cache = SemanticAnswerCache()
+    cache.put(query_vector=np.array([1, 0, 0]), source_ids=["a"], answer="x")
+    cache.put(query_vector=np.array([0, 1, 0]), source_ids=["b"], answer="y")
+
+    # When
+    near = cache.invalidate_near(vector=np.array([0.9, 0.1, 0]), min_score=0.5)
+    removed = cache.invalidate_source(id_="b")
+
+    # Then
+    assert (near, removed) == (1, 1)
+    assert len(cache) == 0
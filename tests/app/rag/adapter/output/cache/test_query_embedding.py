@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.rag.adapter.output.cache.query_embedding import QueryEmbeddingCache
+from tests.support.redis import FakeRedis
+
+
+class DownRedis:
+    async def get(self, key):
+        raise ConnectionError("down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("down")
+
+
+@pytest.mark.asyncio
+async def test_normalized_query_hits_local_tier():
+    # Given
+    cache = QueryEmbeddingCache(redis=FakeRedis(), namespace="model")
+    await cache.set(text="What is  RAG?", vector=np.array([1, 2], dtype=np.float32))
+
+    # When
+    sut = await cache.get(text="  what is rag? ")
+
+    # Then
+    np.testing.assert_array_equal(sut, [1, 2])
+    assert cache.stats()["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_other_worker_hits_redis_tier():
+    # Given
+    redis = FakeRedis()
+    await QueryEmbeddingCache(redis=redis, namespace="model", ttl=60).set(
+        text="q", vector=np.array([0.5, 0.25], dtype=np.float32)
+    )
+    cache = QueryEmbeddingCache(redis=redis, namespace="model")
+
+    # When
+    sut = await cache.get(text="q")
+
+    # Then
+    np.testing.assert_array_equal(sut, [0.5, 0.25])
+    assert sut.dtype == np.float32
+    assert cache.stats()["redis_hits"] == 1
+    assert list(redis.ttls.values()) == [60]
+
+
+@pytest.mark.asyncio
+async def test_model_change_misses():
+    # Given
+    redis = FakeRedis()
+    await QueryEmbeddingCache(redis=redis, namespace="old-model").set(
+        text="q", vector=np.ones(2, dtype=np.float32)
+    )
+    cache = QueryEmbeddingCache(redis=redis, namespace="new-model")
+
+    # When
+    sut = await cache.get(text="q")
+
+    # Then
+    assert sut is None
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_local_tier_evicts_least_recently_used():
+    # Given
+    cache = QueryEmbeddingCache(redis=DownRedis(), namespace="model", max_size=2)
+    for text in ("a", "b"):
+        await cache.set(text=text, vector=np.ones(2, dtype=np.float32))
+    await cache.get(text="a")
+
+    # When
+    await cache.set(text="c", vector=np.ones(2, dtype=np.float32))
+
+    # Then
+    assert await cache.get(text="b") is None
+    assert await cache.get(text="a") is not None
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from app.rag.adapter.output.embedding.hashing import HashingEmbeddingProvider
+from app.rag.adapter.output.index.ops import l2_normalize
+
+
+@pytest.mark.asyncio
+async def test_embed_is_deterministic():
+    # Given
+    provider = HashingEmbeddingProvider(dim=64)
+
+    # When
+    first = await provider.embed(texts=["Vector search", "MongoDB"])
+    second = await HashingEmbeddingProvider(dim=64).embed(texts=["vector SEARCH", "MongoDB"])
+
+    # Then
+    assert first.shape == (2, 64)
+    assert first.dtype == np.float32
+    np.testing.assert_array_equal(first, second)
+
+
+@pytest.mark.asyncio
+async def test_shared_words_are_closer():
+    # Given
+    provider = HashingEmbeddingProvider()
+
+    # When
+    vectors = l2_normalize(
+        await provider.embed(
+            texts=["how does vector search work", "vector search explained", "banana bread recipe"]
+        )
+    )
+
+    # Then
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
@@ -0,0 +1,62 @@
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from app.rag.adapter.output.index.binary import BinaryQuantizedVectorIndex
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+from app.rag.adapter.output.index.ivf import IVFVectorIndex
+from app.rag.adapter.output.index.pq import PQVectorIndex
+from app.rag.adapter.output.index.scalar import ScalarQuantizedVectorIndex
+
+rng = np.random.default_rng(0)
+query = rng.standard_normal(16).astype(np.float32)
+# each row closer to the query than the last and removed once added, so the
+# top hits are rows another thread is still adding
+vectors = (np.arange(20_000)[:, None] * query + 200 * rng.standard_normal((20_000, 16))).astype(np.float32)
+ids = [str(i) for i in range(len(vectors))]
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.parametrize(
+    "make_index",
+    [
+        FlatVectorIndex,
+        ScalarQuantizedVectorIndex,
+        BinaryQuantizedVectorIndex,
+        IVFVectorIndex,
+        # codebooks trained and swapped in while searches run
+        lambda: PQVectorIndex(m=8, train_size=5000, train_in_background=True),
+    ],
+)
+def test_search_while_another_thread_adds(make_index, frequent_thread_switches):
+    # Given
+    index = make_index()
+    index.add(ids=ids[:10], vectors=vectors[:10])
+
+    def add_rows():
+        for row in range(10, len(vectors)):
+            index.add(ids=ids[row : row + 1], vectors=vectors[row : row + 1])
+            index.remove(ids=ids[row : row + 1])
+
+    adder = threading.Thread(target=add_rows)
+
+    # When
+    adder.start()
+    sut = []
+    while adder.is_alive():
+        sut.append(index.search(vector=query, k=5))
+    adder.join()
+
+    # Then
+    assert sut
+    assert all(len(hits) == 5 for hits in sut)
+    assert all(hit.id in ids for hits in sut for hit in hits)
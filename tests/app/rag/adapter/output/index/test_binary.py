@@ -0,0 +1,66 @@
+import numpy as np
+
+from app.rag.adapter.output.index.binary import (
+    BinaryQuantizedVectorIndex,
+    hamming_distances,
+    pack_signs,
+)
+
+
+def test_pack_signs_is_48_bytes_for_minilm():
+    # Given
+    vectors = np.random.default_rng(0).standard_normal((3, 384))
+
+    # When
+    sut = pack_signs(vectors)
+
+    # Then
+    assert sut.shape == (3, 48)
+    assert sut.dtype == np.uint8
+
+
+def test_hamming_distances():
+    # Given
+    codes = pack_signs(np.array([[1, 1, 1, 1, 1, 1, 1, 1], [-1, 1, 1, 1, 1, 1, 1, -1]]))
+    query = pack_signs(np.ones(8))
+
+    # When
+    sut = hamming_distances(codes, query)
+
+    # Then
+    assert sut.tolist() == [0, 2]
+
+
+def test_search_ranks_by_hamming_distance():
+    # Given
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((100, 384)).astype(np.float32)
+    index = BinaryQuantizedVectorIndex()
+    index.add(ids=[str(i) for i in range(100)], vectors=vectors)
+
+    # When
+    sut = index.search(vector=vectors[7] + 0.1 * rng.standard_normal(384), k=3)
+
+    # Then
+    assert sut[0].id == "7"
+    assert sut[0].score > sut[1].score
+    assert index.nbytes == 100 * 48
+
+
+def test_save_and_load(tmp_path):
+    # Given
+    vectors = np.random.default_rng(1).standard_normal((10, 20)).astype(np.float32)
+    index = BinaryQuantizedVectorIndex()
+    index.add(ids=[str(i) for i in range(10)], vectors=vectors)
+    index.remove(ids=["0"])
+    path = str(tmp_path / "binary.npz")
+
+    # When
+    index.save(path=path)
+    sut = BinaryQuantizedVectorIndex.load(path=path)
+
+    # Then
+    assert sut.dim == 20
+    assert "0" not in sut
+    expected = index.search(vector=vectors[0], k=3)
+    assert [hit.score for hit in sut.search(vector=vectors[0], k=3)] == [hit.score for hit in expected]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+
+
+def test_search_returns_best_first():
+    # Given
+    index = FlatVectorIndex()
+    index.add(
+        ids=["a", "b", "c"],
+        vectors=np.array([[1, 0], [0, 1], [1, 1]], dtype=np.float32),
+    )
+
+    # When
+    sut = index.search(vector=np.array([1, 0.1]), k=2)
+
+    # Then
+    assert [hit.id for hit in sut] == ["a", "c"]
+    assert sut[0].score == pytest.approx(1 / np.sqrt(1.01))
+
+
+def test_search_matches_brute_force():
+    # Given
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 16)).astype(np.float32)
+    query = rng.standard_normal(16).astype(np.float32)
+    index = FlatVectorIndex(initial_capacity=8)
+    for start in range(0, 500, 100):
+        index.add(
+            ids=[str(i) for i in range(start, start + 100)],
+            vectors=vectors[start : start + 100],
+        )
+
+    # When
+    sut = index.search(vector=query, k=5)
+
+    # Then
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    assert len(index) == 500
+    assert [hit.id for hit in sut] == [str(i) for i in expected]
+
+
+def test_search_empty():
+    # Given
+    index = FlatVectorIndex()
+
+    # When
+    sut = index.search(vector=np.ones(4), k=3)
+
+    # Then
+    assert sut == []
+
+
+def test_add_dim_mismatch():
+    # Given
+    index = FlatVectorIndex(dim=4)
+
+    # When, Then
+    with pytest.raises(ValueError):
+        index.add(ids=["a"], vectors=np.ones((1, 3)))
+
+
+def test_remove_and_save_and_load(tmp_path):
+    # Given
+    index = FlatVectorIndex()
+    index.add(ids=["a", "b"], vectors=np.array([[1, 0], [0, 1]], dtype=np.float32))
+    path = str(tmp_path / "flat.npz")
+
+    # When
+    index.remove(ids=["a"])
+    index.save(path=path)
+    sut = FlatVectorIndex.load(path=path)
+
+    # Then
+    assert "a" not in sut
+    assert [hit.id for hit in sut.search(vector=np.array([1, 0]), k=2)] == ["b"]
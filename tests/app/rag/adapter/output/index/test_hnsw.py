@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.rag.adapter.output.index.evaluation import recall_at_k
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+from app.rag.adapter.output.index.hnsw import HNSWVectorIndex
+
+rng = np.random.default_rng(0)
+vectors = rng.standard_normal((1000, 32)).astype(np.float32)
+queries = rng.standard_normal((20, 32)).astype(np.float32)
+ids = [str(i) for i in range(len(vectors))]
+
+
+def build_index() -> HNSWVectorIndex:
+    index = HNSWVectorIndex(m=8, ef_construction=64, seed=0)
+    for start in range(0, len(vectors), 250):
+        index.add(ids=ids[start : start + 250], vectors=vectors[start : start + 250])
+    return index
+
+
+def test_recall_against_brute_force():
+    # Given
+    index = build_index()
+    exact = FlatVectorIndex()
+    exact.add(ids=ids, vectors=vectors)
+
+    # When
+    sut = recall_at_k(index=index, exact=exact, queries=queries, k=10, ef_search=128)
+
+    # Then
+    assert len(index) == 1000
+    assert sut >= 0.9
+
+
+def test_search_finds_itself():
+    # Given
+    index = build_index()
+
+    # When
+    sut = index.search(vector=vectors[42], k=1)
+
+    # Then
+    assert sut[0].id == "42"
+
+
+def test_remove_is_never_returned():
+    # Given
+    index = build_index()
+
+    # When
+    index.remove(ids=["42"])
+    sut = index.search(vector=vectors[42], k=5)
+
+    # Then
+    assert "42" not in index
+    assert "42" not in [hit.id for hit in sut]
+    assert len(sut) == 5
+
+
+def test_save_and_load(tmp_path):
+    # Given
+    index = build_index()
+    index.remove(ids=["7"])
+    path = str(tmp_path / "hnsw.npz")
+
+    # When
+    index.save(path=path)
+    sut = HNSWVectorIndex.load(path=path)
+
+    # Then
+    assert len(sut) == len(index)
+    assert "7" not in sut
+    for query in queries[:5]:
+        assert sut.search(vector=query, k=5) == index.search(vector=query, k=5)
+    sut.add(ids=["new"], vectors=vectors[:1] + 1)
+    assert "new" in sut
+
+
+def test_searches_run_while_batches_are_added_from_threads():
+    # Given
+    index = HNSWVectorIndex(m=8, ef_construction=64, seed=0)
+    index.add(ids=ids[:100], vectors=vectors[:100])
+    batches = [(ids[start : start + 150], vectors[start : start + 150]) for start in range(100, 1000, 150)]
+
+    # When
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        adds = [pool.submit(index.add, ids=batch_ids, vectors=batch) for batch_ids, batch in batches]
+        during = [index.search(vector=query, k=5) for query in queries]
+        for add in adds:
+            add.result()
+    sut = index.search(vector=vectors[900], k=1)
+
+    # Then
+    assert len(index) == 1000
+    assert all(len(hits) == 5 for hits in during)
+    assert sut[0].id == "900"
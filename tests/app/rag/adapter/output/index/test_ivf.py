@@ -0,0 +1,73 @@
+import numpy as np
+
+from app.rag.adapter.output.index.evaluation import recall_at_k
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+from app.rag.adapter.output.index.ivf import IVFVectorIndex, assign_lists, train_kmeans
+
+rng = np.random.default_rng(0)
+centres = rng.standard_normal((20, 32)).astype(np.float32)
+vectors = (centres[rng.integers(0, 20, 3000)] + 0.2 * rng.standard_normal((3000, 32))).astype(np.float32)
+queries = vectors[:20] + 0.05
+ids = [str(i) for i in range(len(vectors))]
+
+
+def test_train_kmeans_finds_clusters():
+    # When
+    sut = train_kmeans(vectors, nlist=20, iterations=10)
+
+    # Then
+    assert sut.shape == (20, 32)
+    assert np.allclose(np.linalg.norm(sut, axis=1), 1, atol=1e-5)
+    assert len(np.unique(assign_lists(vectors, sut))) > 15
+
+
+def test_search_probes_nearest_lists():
+    # Given
+    index = IVFVectorIndex(centroids=train_kmeans(vectors, nlist=20), nprobe=3)
+    index.add(ids=ids, vectors=vectors)
+    exact = FlatVectorIndex()
+    exact.add(ids=ids, vectors=vectors)
+
+    # When
+    sut = recall_at_k(index=index, exact=exact, queries=queries, k=10)
+
+    # Then
+    assert index.nlist == 20
+    assert sut >= 0.9
+    assert recall_at_k(index=index, exact=exact, queries=queries, k=10, nprobe=20) == 1.0
+
+
+def test_set_centroids_repartitions_untrained_index():
+    # Given
+    index = IVFVectorIndex(nprobe=20)
+    index.add(ids=ids, vectors=vectors)
+    index.remove(ids=["0"])
+
+    # When
+    index.set_centroids(centroids=train_kmeans(vectors, nlist=20), version=7)
+    index.add(ids=["new"], vectors=vectors[:1])
+    sut = index.search(vector=vectors[0], k=2)
+
+    # Then
+    assert index.nlist == 20
+    assert index.centroids_version == 7
+    assert len(index) == len(ids)
+    assert sut[0].id == "new"
+    assert "0" not in [hit.id for hit in sut]
+
+
+def test_save_and_load(tmp_path):
+    # Given
+    index = IVFVectorIndex(centroids=train_kmeans(vectors, nlist=20), centroids_version=3)
+    index.add(ids=ids, vectors=vectors)
+    index.remove(ids=["1"])
+    path = str(tmp_path / "ivf.npz")
+
+    # When
+    index.save(path=path)
+    sut = IVFVectorIndex.load(path=path)
+
+    # Then
+    assert sut.centroids_version == 3
+    assert len(sut) == len(ids) - 1
+    assert sut.search(vector=queries[0], k=5) == index.search(vector=queries[0], k=5)
@@ -0,0 +1,84 @@
+import pytest
+
+from app.rag.adapter.output.index.lexical import BM25Index, tokenize
+from app.rag.adapter.output.index.rerank import reciprocal_rank_fusion
+
+texts = {
+    "a": "Muzan Kibutsuji is the progenitor of all demons.",
+    "b": "Tanjiro Kamado trains to become a demon slayer.",
+    "c": "The demon slayer corps hunts demons at night. Demons fear the sun.",
+}
+
+
+def make_index() -> BM25Index:
+    index = BM25Index()
+    index.add(ids=list(texts), texts=list(texts.values()))
+    return index
+
+
+def test_tokenize_casefolds_and_drops_stopwords():
+    # When
+    sut = tokenize("The  ＭＵＺＡＮ of Kibutsuji's clan")
+
+    # Then
+    assert sut == ["muzan", "kibutsuji", "s", "clan"]
+
+
+def test_search_ranks_rare_terms_first():
+    # Given
+    index = make_index()
+
+    # When
+    sut = index.search(query="Who is Muzan?", k=3)
+
+    # Then
+    assert [hit.id for hit in sut] == ["a"]
+    assert sut[0].score > 0
+
+
+def test_search_scores_term_frequency():
+    # Given
+    index = make_index()
+
+    # When
+    sut = index.search(query="demons", k=3)
+
+    # Then
+    assert [hit.id for hit in sut] == ["c", "a"]
+
+
+def test_remove_and_readd():
+    # Given
+    index = make_index()
+
+    # When
+    index.remove(ids=["a"])
+    removed = index.search(query="muzan", k=3)
+    index.add(ids=["b"], texts=["Muzan again"])
+
+    # Then
+    assert removed == []
+    assert [hit.id for hit in index.search(query="muzan", k=3)] == ["b"]
+    assert index.search(query="tanjiro", k=3) == []
+    assert len(index) == 2 and "a" not in index
+
+
+def test_grows_past_initial_capacity():
+    # Given
+    index = BM25Index()
+
+    # When
+    index.add(ids=[str(i) for i in range(3000)], texts=[f"common word{i}" for i in range(3000)])
+
+    # Then
+    assert [hit.id for hit in index.search(query="word2999", k=1)] == ["2999"]
+    assert len(index.search(query="common", k=5000)) == 3000
+
+
+def test_reciprocal_rank_fusion():
+    # When
+    sut = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    # Then
+    assert [hit.id for hit in sut] == ["a", "c", "b"]
+    assert sut[0].score == pytest.approx(1 / 61 + 1 / 62)
@@ -0,0 +1,71 @@
+import pytest
+
+from app.rag.adapter.output.index.metadata import MetadataIndex
+
+
+def make_index() -> MetadataIndex:
+    index = MetadataIndex(fields=("source", "lang"))
+    index.add(
+        ids=["a", "b", "c", "d"],
+        metadata=[
+            {"source": "FastAPI Docs", "lang": "en"},
+            {"source": "Anime Lore", "lang": "en"},
+            {"source": "FastAPI Docs", "lang": "ko"},
+            {"source": "Other"},
+        ],
+    )
+    return index
+
+
+def test_match_unions_values_and_intersects_fields():
+    # Given
+    index = make_index()
+
+    # When
+    docs = index.match({"source": ["FastAPI Docs", "Anime Lore"]})
+    english_docs = index.match({"source": ["FastAPI Docs"], "lang": ["en"]})
+
+    # Then
+    assert index.ids_of(docs) == ["a", "b", "c"]
+    assert index.ids_of(english_docs) == ["a"]
+    assert len(index.match({"source": ["Missing"]})) == 0
+    with pytest.raises(ValueError):
+        index.match({"author": ["x"]})
+
+
+def test_contains_checks_candidates_against_match():
+    # Given
+    index = make_index()
+    matched = index.match({"source": ["FastAPI Docs"]})
+
+    # When
+    sut = index.contains(ids=["c", "b", "a", "unknown"], matched=matched)
+
+    # Then
+    assert sut.tolist() == [True, False, True, False]
+    assert index.contains(ids=["a"], matched=matched[:0]).tolist() == [False]
+
+
+def test_removed_and_readded_ids():
+    # Given
+    index = make_index()
+
+    # When
+    index.remove(ids=["a"])
+    index.add(ids=["b"], metadata=[{"source": "FastAPI Docs"}])
+
+    # Then
+    assert index.ids_of(index.match({"source": ["FastAPI Docs"]})) == ["c", "b"]
+    assert len(index.match({"source": ["Anime Lore"]})) == 0
+    assert len(index) == 3
+
+
+def test_grows_past_initial_capacity():
+    # Given
+    index = MetadataIndex()
+
+    # When
+    index.add(ids=[str(i) for i in range(3000)], metadata=[{"source": f"s{i % 3}"} for i in range(3000)])
+
+    # Then
+    assert len(index.match({"source": ["s1"]})) == 1000
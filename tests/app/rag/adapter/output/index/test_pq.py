@@ -0,0 +1,110 @@
+import numpy as np
+
+from app.rag.adapter.output.index.evaluation import reranked_recall_at_k
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+from app.rag.adapter.output.index.ops import l2_normalize
+from app.rag.adapter.output.index.pq import CodeBlocks, PQVectorIndex, ProductQuantizer
+
+rng = np.random.default_rng(0)
+basis = rng.standard_normal((4, 32)).astype(np.float32)
+vectors = (rng.standard_normal((2000, 4)) @ basis).astype(np.float32)
+ids = [str(i) for i in range(len(vectors))]
+
+
+def test_lookup_table_scores_match_decoded_vectors():
+    # Given
+    quantizer = ProductQuantizer(m=8)
+    quantizer.train(l2_normalize(vectors), iterations=5)
+    codes = quantizer.encode(l2_normalize(vectors))
+    query = l2_normalize(vectors[0])
+
+    # When
+    sut = quantizer.scores(np.ascontiguousarray(codes.T), quantizer.lookup_table(query))
+
+    # Then
+    assert codes.shape == (2000, 8)
+    assert codes.dtype == np.uint8
+    assert np.allclose(sut, quantizer.decode(codes) @ query, atol=1e-5)
+
+
+def test_code_blocks_span_block_boundaries():
+    # Given
+    codes = np.arange(30, dtype=np.uint8).reshape(10, 3)
+    blocks = CodeBlocks(m=3, block_rows=4)
+
+    # When
+    blocks.append(codes[:3])
+    blocks.append(codes[3:])
+
+    # Then
+    assert len(blocks) == 10
+    assert [block.shape for block in blocks.blocks()] == [(3, 4), (3, 4), (3, 2)]
+    assert np.array_equal(blocks.rows(np.array([0, 5, 9])), codes[[0, 5, 9]])
+
+
+def test_trains_after_train_size_and_keeps_recall():
+    # Given
+    index = PQVectorIndex(m=8, train_size=1000)
+    exact = FlatVectorIndex()
+    exact.add(ids=ids, vectors=vectors)
+
+    # When
+    index.add(ids=ids[:500], vectors=vectors[:500])
+    trained_early = index.quantizer.is_trained
+    index.add(ids=ids[500:], vectors=vectors[500:])
+
+    # Then
+    assert not trained_early
+    assert index.quantizer.is_trained
+    assert len(index) == 2000
+    recall = reranked_recall_at_k(
+        index=index, exact=exact, corpus=vectors, queries=vectors[:20], k=5, oversample=4
+    )
+    assert recall >= 0.9
+
+
+def test_search_before_training_is_exact():
+    # Given
+    index = PQVectorIndex(m=8, train_size=10_000)
+    index.add(ids=ids[:100], vectors=vectors[:100])
+
+    # When
+    sut = index.search(vector=vectors[3], k=1)
+
+    # Then
+    assert sut[0].id == "3"
+
+
+def test_save_and_load(tmp_path):
+    # Given
+    index = PQVectorIndex(m=8, train_size=1000)
+    index.add(ids=ids, vectors=vectors)
+    index.remove(ids=["5"])
+    path = str(tmp_path / "pq.npz")
+
+    # When
+    index.save(path=path)
+    sut = PQVectorIndex.load(path=path)
+
+    # Then
+    assert sut.quantizer.is_trained
+    assert "5" not in sut
+    expected = index.search(vector=vectors[0], k=5)
+    assert [hit.score for hit in sut.search(vector=vectors[0], k=5)] == [hit.score for hit in expected]
+
+
+def test_background_training_swaps_codes_in_after_add_returns():
+    # Given
+    index = PQVectorIndex(m=8, train_size=1000, train_in_background=True)
+
+    # When
+    index.add(ids=ids[:1000], vectors=vectors[:1000])
+    index.add(ids=ids[1000:], vectors=vectors[1000:])
+    trained = index.wait_for_training(timeout=60)
+    sut = index.search(vector=vectors[1500], k=20)
+
+    # Then
+    assert trained
+    assert len(index) == 2000
+    assert index.nbytes < 2000 * 32 * 4
+    assert "1500" in [hit.id for hit in sut]
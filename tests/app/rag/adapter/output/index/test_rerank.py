@@ -0,0 +1,39 @@
+import numpy as np
+
+from app.rag.adapter.output.index.rerank import mmr_select
+
+vectors = np.array(
+    [
+        [1.0, 0.0, 0.0],
+        [0.99, 0.05, 0.0],
+        [0.7, 0.7, 0.0],
+        [0.0, 0.0, 1.0],
+    ],
+    dtype=np.float32,
+)
+query = np.array([1.0, 0.2, 0.0])
+
+
+def test_lambda_one_is_relevance_order():
+    # When
+    sut = mmr_select(query=query, vectors=vectors, k=3, lambda_=1.0)
+
+    # Then
+    assert sut.tolist() == [1, 0, 2]
+
+
+def test_low_lambda_skips_near_duplicates():
+    # When
+    sut = mmr_select(query=query, vectors=vectors, k=3, lambda_=0.5)
+
+    # Then
+    assert sut.tolist() == [1, 2, 3]
+
+
+def test_k_larger_than_pool():
+    # When
+    sut = mmr_select(query=query, vectors=vectors[:2], k=5, lambda_=0.5)
+
+    # Then
+    assert sorted(sut.tolist()) == [0, 1]
+    assert mmr_select(query=query, vectors=vectors[:0], k=3, lambda_=0.5).size == 0
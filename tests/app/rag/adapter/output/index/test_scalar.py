@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+from app.rag.adapter.output.index.rerank import rerank_exact
+from app.rag.adapter.output.index.scalar import ScalarQuantizedVectorIndex, quantize_int8
+
+rng = np.random.default_rng(0)
+vectors = rng.standard_normal((2000, 64)).astype(np.float32)
+queries = rng.standard_normal((20, 64)).astype(np.float32)
+ids = [str(i) for i in range(len(vectors))]
+
+
+def test_quantize_int8_round_trip():
+    # When
+    codes, scales = quantize_int8(vectors)
+
+    # Then
+    assert codes.dtype == np.int8
+    assert np.abs(codes * scales[:, None] - vectors).max() <= scales.max() / 2 + 1e-6
+
+
+def test_rerank_recovers_exact_top_k():
+    # Given
+    index = ScalarQuantizedVectorIndex()
+    index.add(ids=ids, vectors=vectors)
+    exact = FlatVectorIndex()
+    exact.add(ids=ids, vectors=vectors)
+
+    for query in queries:
+        # When
+        shortlist = [int(hit.id) for hit in index.search(vector=query, k=40)]
+        sut = rerank_exact(
+            query=query,
+            ids=[ids[i] for i in shortlist],
+            vectors=vectors[shortlist],
+            k=10,
+        )
+
+        # Then
+        assert [hit.id for hit in sut] == [hit.id for hit in exact.search(vector=query, k=10)]
+
+
+def test_memory_is_a_quarter_of_float32():
+    # Given
+    index = ScalarQuantizedVectorIndex()
+
+    # When
+    index.add(ids=ids, vectors=vectors)
+
+    # Then
+    assert index.nbytes < vectors.nbytes / 3.5
+
+
+def test_save_and_load(tmp_path):
+    # Given
+    index = ScalarQuantizedVectorIndex()
+    index.add(ids=ids, vectors=vectors)
+    index.remove(ids=["3"])
+    path = str(tmp_path / "int8.npz")
+
+    # When
+    index.save(path=path)
+    sut = ScalarQuantizedVectorIndex.load(path=path)
+
+    # Then
+    assert len(sut) == len(ids) - 1
+    assert sut.search(vector=queries[0], k=5) == index.search(vector=queries[0], k=5)
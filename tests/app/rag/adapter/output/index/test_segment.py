@@ -0,0 +1,228 @@
+import numpy as np
+
+from app.rag.adapter.output.index import segment
+from app.rag.adapter.output.index.segment import Segment, SegmentedVectorIndex
+
+
+def test_seal_writes_memory_mapped_segment(tmp_path):
+    # Given
+    index = SegmentedVectorIndex(directory=str(tmp_path))
+    index.add(
+        ids=["a", "b", "c"],
+        vectors=np.array([[1, 0], [0, 1], [1, 1]], dtype=np.float32),
+    )
+
+    # When
+    name = index.seal()
+
+    # Then
+    segment = Segment(tmp_path / name)
+    assert isinstance(segment.vectors, np.memmap)
+    assert [id_.decode() for id_ in segment.ids] == ["a", "b", "c"]
+    assert [hit.id for hit in index.search(vector=np.array([1, 0.1]), k=2)] == ["a", "c"]
+
+
+def test_search_matches_brute_force_across_segments_and_tail(tmp_path):
+    # Given
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 16)).astype(np.float32)
+    query = rng.standard_normal(16).astype(np.float32)
+    index = SegmentedVectorIndex(directory=str(tmp_path), seal_rows=200)
+    for start in range(0, 500, 100):
+        index.add(
+            ids=[str(i) for i in range(start, start + 100)],
+            vectors=vectors[start : start + 100],
+        )
+
+    # When
+    sut = index.search(vector=query, k=5)
+
+    # Then
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    assert index.segment_count == 2
+    assert len(index) == 500
+    assert [hit.id for hit in sut] == [str(i) for i in expected]
+
+
+def test_refresh_picks_up_segments_from_other_process(tmp_path):
+    # Given
+    writer = SegmentedVectorIndex(directory=str(tmp_path))
+    reader = SegmentedVectorIndex(directory=str(tmp_path))
+    writer.add(ids=["a", "b"], vectors=np.array([[1, 0], [0, 1]], dtype=np.float32))
+    writer.seal()
+    assert reader.search(vector=np.array([1, 0]), k=1) == []
+
+    # When
+    opened = reader.refresh()
+
+    # Then
+    assert len(opened) == 1
+    assert "a" in reader
+    assert reader.search(vector=np.array([1, 0]), k=1)[0].id == "a"
+
+
+def test_remove_is_shared_through_tombstones(tmp_path):
+    # Given
+    writer = SegmentedVectorIndex(directory=str(tmp_path))
+    writer.add(ids=["a", "b"], vectors=np.array([[1, 0], [0.9, 0.1]], dtype=np.float32))
+    writer.seal()
+    reader = SegmentedVectorIndex(directory=str(tmp_path))
+
+    # When
+    writer.remove(ids=["a"])
+    reader.refresh()
+
+    # Then
+    for index in (writer, reader):
+        assert "a" not in index
+        assert [hit.id for hit in index.search(vector=np.array([1, 0]), k=2)] == ["b"]
+
+
+def test_re_add_supersedes_sealed_row(tmp_path):
+    # Given
+    index = SegmentedVectorIndex(directory=str(tmp_path))
+    index.add(ids=["a"], vectors=np.array([[1, 0]], dtype=np.float32))
+    index.seal()
+
+    # When
+    index.add(ids=["a"], vectors=np.array([[0, 1]], dtype=np.float32))
+    index.seal()
+
+    # Then
+    reopened = SegmentedVectorIndex(directory=str(tmp_path))
+    assert len(reopened) == 1
+    assert reopened.search(vector=np.array([0, 1]), k=2)[0].score > 0.99
+
+
+def test_only_one_writer_per_directory(tmp_path):
+    # Given
+    first = SegmentedVectorIndex(directory=str(tmp_path))
+    second = SegmentedVectorIndex(directory=str(tmp_path))
+
+    # When, Then
+    assert first.try_acquire_writer() is True
+    assert second.try_acquire_writer() is False
+
+
+def test_seal_is_due_when_tail_is_full_or_old(tmp_path):
+    # Given
+    by_rows = SegmentedVectorIndex(directory=str(tmp_path / "rows"), seal_rows=3, seal_age=3600)
+    by_age = SegmentedVectorIndex(directory=str(tmp_path / "age"), seal_rows=100, seal_age=0)
+    vectors = np.eye(2, dtype=np.float32)
+
+    # When
+    empty = by_age.seal_due()
+    by_rows.add(ids=["a", "b"], vectors=vectors)
+    not_full = by_rows.seal_due()
+    by_rows.add(ids=["c"], vectors=vectors[:1])
+    by_age.add(ids=["a"], vectors=vectors[:1])
+
+    # Then
+    assert not empty
+    assert not not_full
+    assert by_rows.segment_count == 1
+    assert by_age.seal_due()
+
+
+def test_merge_combines_small_segments_and_keeps_results(tmp_path):
+    # Given
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((60, 8)).astype(np.float32)
+    query = rng.standard_normal(8).astype(np.float32)
+    index = SegmentedVectorIndex(directory=str(tmp_path), seal_rows=1000, merge_factor=4)
+    reader = SegmentedVectorIndex(directory=str(tmp_path))
+    for start in range(0, 60, 10):
+        index.add(ids=[str(i) for i in range(start, start + 10)], vectors=vectors[start : start + 10])
+        index.seal()
+    index.remove(ids=["3"])
+    index.add(ids=["7"], vectors=-query[None, :])
+    reader.refresh()
+    expected = [hit.id for hit in index.search(vector=query, k=10)]
+
+    # When
+    name = index.merge()
+    reader.refresh()
+
+    # Then
+    assert index.segment_count == 1
+    assert sorted(path.name for path in tmp_path.glob("*.seg")) == [name]
+    assert len(Segment(tmp_path / name)) == 59
+    for sut in (index, reader):
+        assert len(sut) == 59
+        assert [hit.id for hit in sut.search(vector=query, k=10)] == expected
+        assert "3" not in sut
+    assert reader.segment_count == 1
+
+
+def test_refresh_keeps_row_sealed_while_merging(tmp_path, monkeypatch):
+    # Given
+    writer = SegmentedVectorIndex(directory=str(tmp_path), merge_factor=2)
+    for id_ in ["a", "b"]:
+        writer.add(ids=[id_], vectors=np.array([[1, 0]], dtype=np.float32))
+        writer.seal()
+    other = SegmentedVectorIndex(directory=str(tmp_path))
+    other.add(ids=["a"], vectors=np.array([[0, 1]], dtype=np.float32))
+    readers = []
+    write = segment.write_segment
+
+    def write_after_other_seals(path, **kwargs):
+        monkeypatch.setattr(segment, "write_segment", write)
+        other.seal()
+        readers.append(SegmentedVectorIndex(directory=str(tmp_path)))
+        write(path, **kwargs)
+
+    monkeypatch.setattr(segment, "write_segment", write_after_other_seals)
+
+    # When
+    writer.merge()
+    writer.refresh()
+    readers[0].refresh()
+
+    # Then
+    for sut in (writer, *readers):
+        assert sut.segment_count == 2
+        assert len(sut) == 2
+        assert sut.search(vector=np.array([0, 1]), k=1)[0].id == "a"
+        assert sut.search(vector=np.array([0, 1]), k=1)[0].score > 0.99
+
+
+def test_get_vectors_reads_segments_and_tail(tmp_path):
+    # Given
+    index = SegmentedVectorIndex(directory=str(tmp_path))
+    index.add(ids=["a", "b"], vectors=np.array([[2, 0], [0, 3]], dtype=np.float32))
+    index.seal()
+    index.add(ids=["c"], vectors=np.array([[1, 1]], dtype=np.float32))
+
+    # When
+    found, sut = index.get_vectors(ids=["c", "missing", "a"])
+
+    # Then
+    assert found == ["c", "a"]
+    assert np.allclose(sut, [[2**-0.5, 2**-0.5], [1, 0]])
+
+
+def test_merge_compacts_tombstones_of_merged_away_rows(tmp_path):
+    # Given
+    writer = SegmentedVectorIndex(directory=str(tmp_path), seal_rows=2, merge_factor=2)
+    for id_ in ["a", "b", "c"]:
+        writer.add(ids=[id_], vectors=np.array([[1, 0]], dtype=np.float32))
+        writer.seal()
+    writer.add(ids=["d", "e"], vectors=np.array([[0, 1], [0, 1]], dtype=np.float32))
+    reader = SegmentedVectorIndex(directory=str(tmp_path))
+    other = SegmentedVectorIndex(directory=str(tmp_path))
+    other.add(ids=["tail"], vectors=np.array([[0, 1]], dtype=np.float32))
+    writer.remove(ids=["a", "b", "tail"])
+    reader.refresh()
+    writer.remove(ids=["d"])
+
+    # When
+    writer.merge()
+    reader.refresh()
+    other.seal()
+
+    # Then
+    assert (tmp_path / segment.TOMBSTONES).read_text().split() == ["d"]
+    for sut in (writer, reader, other, SegmentedVectorIndex(directory=str(tmp_path))):
+        assert len(sut) == 2
+        assert "c" in sut and "e" in sut
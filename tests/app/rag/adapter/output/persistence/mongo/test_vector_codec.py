@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from bson import BSON
+
+from app.rag.adapter.output.persistence.mongo.vector_codec import (
+    decode_vector,
+    encode_vector,
+    is_packed,
+)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_round_trip_through_bson(dtype):
+    # Given
+    vector = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+
+    # When
+    stored = BSON.decode(BSON.encode({"vector": encode_vector(vector, dtype=dtype)}))
+    sut = decode_vector(stored["vector"])
+
+    # Then
+    assert is_packed(stored["vector"])
+    assert sut.shape == (384,)
+    assert np.allclose(sut, vector, atol=1e-2 if dtype == "float16" else 0)
+
+
+def test_packed_is_smaller_than_double_array():
+    # Given
+    vector = np.ones(384, dtype=np.float32)
+
+    # When
+    packed = len(BSON.encode({"vector": encode_vector(vector)}))
+    legacy = len(BSON.encode({"vector": vector.tolist()}))
+
+    # Then
+    assert packed * 3 < legacy
+
+
+def test_decode_legacy_list():
+    # Given
+    value = [0.5, 1.5, -2.0]
+
+    # When
+    sut = decode_vector(value)
+
+    # Then
+    assert sut.dtype == np.float32
+    assert sut.tolist() == value
+
+
+def test_decode_unknown_header():
+    # When, Then
+    with pytest.raises(ValueError):
+        decode_vector(b"\x09\x00\x01\x00abcd")
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.rag.adapter.output.reranker.cross_encoder import CrossEncoderReranker
+
+
+class FakeCrossEncoder(CrossEncoderReranker):
+    """Scores by text length without loading a model"""
+
+    def __init__(self, *, delay: float = 0.0, batch_size: int):
+        super().__init__(model="fake", batch_size=batch_size)
+        self.delay = delay
+        self.batches = []
+
+    def _predict(self, pairs):
+        time.sleep(self.delay)
+        self.batches.append(len(pairs))
+        return np.array([len(text) for _, text in pairs], dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_scores_in_batches():
+    # Given
+    reranker = FakeCrossEncoder(batch_size=2)
+
+    # When
+    sut = await reranker.score(query="q", texts=["a", "bbb", "cc", "dddd", "e"])
+
+    # Then
+    assert sut.tolist() == [1, 3, 2, 4, 1]
+    assert reranker.batches == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_scoring_stops_after_current_batch():
+    # Given
+    reranker = FakeCrossEncoder(delay=0.05, batch_size=1)
+
+    # When
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.07):
+            await reranker.score(query="q", texts=["a"] * 10)
+    await asyncio.sleep(0.1)
+
+    # Then
+    assert len(reranker.batches) == 2
@@ -0,0 +1,64 @@
+import pytest
+
+from app.rag.application.service.chunking import chunk_text, count_tokens, merge_adjacent_chunks
+
+text = " ".join(f"Sentence number {i} talks about topic {i % 7} in some detail." for i in range(60))
+
+
+def test_chunks_respect_size_and_cover_text():
+    # When
+    sut = chunk_text(text, max_tokens=50, overlap_tokens=10)
+
+    # Then
+    assert all(count_tokens(chunk.text) <= 50 for chunk in sut)
+    assert all(text[chunk.start : chunk.end] == chunk.text for chunk in sut)
+    assert sut[0].start == 0 and sut[-1].end == len(text)
+    assert all(a.end > b.start for a, b in zip(sut, sut[1:]))
+
+
+def test_chunks_start_and_end_at_sentences():
+    # When
+    sut = chunk_text(text, max_tokens=50, overlap_tokens=10)
+
+    # Then
+    assert all(chunk.text.startswith("Sentence") for chunk in sut)
+    assert all(chunk.text.endswith(".") for chunk in sut)
+
+
+def test_sentence_longer_than_window_is_split():
+    # Given
+    words = "word " * 250
+
+    # When
+    sut = chunk_text(words, max_tokens=100, overlap_tokens=20)
+
+    # Then
+    assert [count_tokens(chunk.text) for chunk in sut] == [100, 100, 90]
+
+
+def test_short_and_empty_text():
+    # When, Then
+    assert [chunk.text for chunk in chunk_text("Short one.")] == ["Short one."]
+    assert chunk_text("   ") == []
+    with pytest.raises(ValueError):
+        chunk_text(text, max_tokens=10, overlap_tokens=10)
+
+
+def test_merge_adjacent_chunks():
+    # Given
+    parent = "alpha beta gamma delta epsilon"
+    documents = [
+        {"id": "c1", "parent_id": "p", "chunk_index": 1, "start": 6, "end": 22, "text": parent[6:22], "score": 0.9},
+        {"id": "x", "text": "other", "score": 0.8},
+        {"id": "c0", "parent_id": "p", "chunk_index": 0, "start": 0, "end": 10, "text": parent[0:10], "score": 0.7},
+        {"id": "c4", "parent_id": "p", "chunk_index": 4, "start": 23, "end": 30, "text": parent[23:30], "score": 0.6},
+    ]
+
+    # When
+    sut = merge_adjacent_chunks(documents)
+
+    # Then
+    assert [doc["id"] for doc in sut] == ["c1", "x", "c4"]
+    assert sut[0]["text"] == "alpha beta gamma delta"
+    assert sut[0]["ids"] == ["c0", "c1"]
+    assert sut[0]["score"] == 0.9
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.rag.adapter.output.cache.query_embedding import QueryEmbeddingCache
+from app.rag.application.exception import EmbeddingTimeoutException
+from app.rag.application.service.embedding import EmbeddingService
+from tests.support.redis import FakeRedis
+from tests.support.embedding_provider import SlowProvider
+
+
+@pytest.mark.asyncio
+async def test_concurrent_embeds_overlap():
+    # Given
+    service = EmbeddingService(provider=SlowProvider(delay=0.2), max_concurrency=8)
+
+    # When
+    started = time.perf_counter()
+    sut = await asyncio.gather(*(service.embed(text="x" * i) for i in range(8)))
+    elapsed = time.perf_counter() - started
+
+    # Then
+    assert elapsed < 0.2 * 8 / 2
+    assert [vector[0] for vector in sut] == list(range(8))
+    assert sut[0].dtype == np.float32
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    # Given
+    provider = SlowProvider(delay=0.05)
+    service = EmbeddingService(provider=provider, max_concurrency=2, max_batch_size=1)
+
+    # When
+    await asyncio.gather(*(service.embed(text="x") for _ in range(6)))
+
+    # Then
+    assert provider.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_embed_timeout():
+    # Given
+    service = EmbeddingService(provider=SlowProvider(delay=0.5), timeout=0.05)
+
+    # When, Then
+    with pytest.raises(EmbeddingTimeoutException):
+        await service.embed(text="x")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_embeds_are_batched():
+    # Given
+    provider = SlowProvider(delay=0.01)
+    service = EmbeddingService(provider=provider, max_batch_size=4, batch_window=0.01)
+
+    # When
+    await asyncio.gather(*(service.embed(text="x") for _ in range(8)))
+
+    # Then
+    assert service.batcher.stats()["batches"] == 2
+    assert service.batcher.stats()["avg_batch_fill"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_embed_query_uses_cache():
+    # Given
+    provider = SlowProvider(delay=0)
+    cache = QueryEmbeddingCache(redis=FakeRedis(), namespace="model")
+    service = EmbeddingService(provider=provider, query_cache=cache, batch_window=0)
+
+    # When
+    first = await service.embed_query(text="Hello")
+    second = await service.embed_query(text="hello")
+
+    # Then
+    np.testing.assert_array_equal(first, second)
+    assert service.batcher.stats()["batches"] == 1
+    assert cache.stats()["local_hits"] == 1
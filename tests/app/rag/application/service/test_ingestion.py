@@ -0,0 +1,165 @@
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from app.rag.adapter.output.cache.answer import SemanticAnswerCache
+from app.rag.adapter.output.embedding.hashing import HashingEmbeddingProvider
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+from app.rag.adapter.output.index.lexical import BM25Index
+from app.rag.adapter.output.index.metadata import MetadataIndex
+from app.rag.adapter.output.persistence.mongo.document import RagDocumentMongoRepo
+from app.rag.application.service.chunking import content_hash, text_hash
+from app.rag.application.service.embedding import EmbeddingService
+from app.rag.application.service.ingestion import IngestionService
+
+
+def make_repository(*, stored_hashes=None, stored_vectors=None) -> AsyncMock:
+    repository = AsyncMock(spec=RagDocumentMongoRepo)
+    repository.find_by_hashes.side_effect = lambda *, hashes: {
+        hash_: parent_id for hash_, parent_id in (stored_hashes or {}).items() if hash_ in hashes
+    }
+    repository.find_vectors_by_text_hashes.side_effect = lambda *, hashes: {
+        hash_: vector for hash_, vector in (stored_vectors or {}).items() if hash_ in hashes
+    }
+    repository.save_many.side_effect = lambda *, texts, **kwargs: (
+        [f"chunk-{i}" for i in range(len(texts))],
+        {},
+    )
+    return repository
+
+
+def make_service(*, repository, index, answer_cache=None) -> IngestionService:
+    return IngestionService(
+        embedding_service=EmbeddingService(provider=HashingEmbeddingProvider(dim=32), batch_window=0),
+        repository=repository,
+        index=index,
+        answer_cache=answer_cache or SemanticAnswerCache(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_ingest_many_indexes_only_stored_documents():
+    # Given
+    repository = make_repository()
+    repository.save_many.side_effect = None
+    repository.save_many.return_value = (["id-a", "id-b", "id-c"], {1: "write failed"})
+    index = FlatVectorIndex()
+    service = make_service(repository=repository, index=index)
+
+    # When
+    sut = await service.ingest_many(texts=["a", "b", "c"], sources=["s", "s", "s"])
+
+    # Then
+    assert [result.get("chunks") for result in sut] == [1, None, 1]
+    assert sut[1] == {"error": "write failed"}
+    assert "id-a" in index and "id-c" in index and "id-b" not in index
+    assert repository.save_many.await_args.kwargs["vectors"].shape == (3, 32)
+
+
+@pytest.mark.asyncio
+async def test_ingest_many_invalidates_related_answers():
+    # Given
+    repository = make_repository()
+    provider = HashingEmbeddingProvider(dim=32)
+    answer_cache = SemanticAnswerCache()
+    [query_vector] = await provider.embed(texts=["vector search"])
+    answer_cache.put(query_vector=query_vector, source_ids=["old"], answer="stale")
+    service = make_service(repository=repository, index=FlatVectorIndex(), answer_cache=answer_cache)
+
+    # When
+    await service.ingest_many(texts=["vector search"], sources=["s"])
+
+    # Then
+    assert len(answer_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_ingest_many_stores_chunks_with_parent_and_offsets():
+    # Given
+    repository = make_repository()
+    service = make_service(repository=repository, index=FlatVectorIndex())
+    service.chunk_tokens, service.chunk_overlap_tokens = 20, 5
+    long_text = " ".join(f"Sentence {i} is about one thing." for i in range(12))
+
+    # When
+    sut = await service.ingest_many(texts=[long_text, "  "], sources=["s", "s"])
+
+    # Then
+    kwargs = repository.save_many.await_args.kwargs
+    metadata = kwargs["metadata"]
+    assert sut[0] == {"id": metadata[0]["parent_id"], "chunks": len(metadata), "duplicates": 0}
+    assert sut[1] == {"error": "document has no text"}
+    assert len(metadata) > 1
+    assert [m["chunk_index"] for m in metadata] == list(range(len(metadata)))
+    assert all(long_text[m["start"] : m["end"]] == text for m, text in zip(metadata, kwargs["texts"]))
+    repository.save_many.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ingest_many_skips_stored_and_repeated_text():
+    # Given
+    repository = make_repository(stored_hashes={content_hash("Known text.", source="s"): "parent-old"})
+    index = FlatVectorIndex()
+    service = make_service(repository=repository, index=index)
+    service.lexical_index = BM25Index()
+    provider = service.embedding_service.provider
+    provider.embed = AsyncMock(wraps=provider.embed)
+
+    # When
+    sut = await service.ingest_many(
+        texts=["Known  text.", "Fresh text.", "Fresh\ntext.", "Known text."],
+        sources=["s", "s", "s", "s"],
+    )
+
+    # Then
+    assert sut[0] == {"id": "parent-old", "chunks": 0, "duplicates": 1}
+    assert sut[1]["chunks"] == 1
+    assert sut[2] == {"id": sut[1]["id"], "chunks": 0, "duplicates": 1}
+    assert sut[3] == sut[0]
+    assert provider.embed.await_args.kwargs["texts"] == ["Fresh text."]
+    assert repository.save_many.await_args.kwargs["texts"] == ["Fresh text."]
+    assert len(index) == len(service.lexical_index) == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_many_stores_same_text_once_per_source():
+    # Given
+    stored_vector = np.ones(32, dtype=np.float32)
+    repository = make_repository(
+        stored_hashes={content_hash("Shared text.", source="a"): "parent-a"},
+        stored_vectors={text_hash("Shared text."): stored_vector},
+    )
+    service = make_service(repository=repository, index=FlatVectorIndex())
+    service.metadata_index = MetadataIndex(fields=["source"])
+    service.embedding_service.provider = AsyncMock(wraps=service.embedding_service.provider)
+
+    # When
+    sut = await service.ingest_many(texts=["Shared text.", "Shared text."], sources=["a", "b"])
+
+    # Then
+    assert sut[0] == {"id": "parent-a", "chunks": 0, "duplicates": 1}
+    assert sut[1]["chunks"] == 1
+    assert repository.save_many.await_args.kwargs["sources"] == ["b"]
+    np.testing.assert_array_equal(repository.save_many.await_args.kwargs["vectors"], [stored_vector])
+    service.embedding_service.provider.embed.assert_not_awaited()
+    matched = service.metadata_index.match({"source": ["b"]})
+    assert service.metadata_index.ids_of(matched) == ["chunk-0"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_many_treats_lost_insert_race_as_duplicate():
+    # Given
+    repository = make_repository()
+    repository.save_many.side_effect = None
+    repository.save_many.return_value = (["id-a"], {0: "E11000 duplicate key error"})
+    repository.find_by_hashes.side_effect = [{}, {content_hash("a", source="s"): "parent-other"}]
+    index = FlatVectorIndex()
+    service = make_service(repository=repository, index=index)
+
+    # When
+    sut = await service.ingest_many(texts=["a"], sources=["s"])
+
+    # Then
+    assert sut == [{"id": "parent-other", "chunks": 0, "duplicates": 1}]
+    assert len(index) == 0
@@ -0,0 +1,54 @@
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from app.rag.adapter.output.index.ivf import IVFVectorIndex
+from app.rag.adapter.output.persistence.mongo.document import RagDocumentMongoRepo
+from app.rag.adapter.output.persistence.mongo.index_meta import RagIndexMetaMongoRepo
+from app.rag.application.service.ivf import IVFService
+
+vectors = np.random.default_rng(0).standard_normal((200, 8)).astype(np.float32)
+
+
+@pytest.mark.asyncio
+async def test_train_publishes_centroids():
+    # Given
+    repository = AsyncMock(spec=RagDocumentMongoRepo)
+    repository.sample_vectors.return_value = vectors
+    meta_repository = AsyncMock(spec=RagIndexMetaMongoRepo)
+    meta_repository.save_ivf_centroids.return_value = 1
+    service = IVFService(repository=repository, meta_repository=meta_repository)
+
+    # When
+    sut = await service.train(nlist=4, sample_size=200, iterations=5)
+
+    # Then
+    assert sut["nlist"] == 4
+    centroids = meta_repository.save_ivf_centroids.await_args.kwargs["centroids"]
+    assert centroids.shape == (4, 8)
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_on_new_version():
+    # Given
+    index = IVFVectorIndex()
+    index.add(ids=[str(i) for i in range(200)], vectors=vectors)
+    meta_repository = AsyncMock(spec=RagIndexMetaMongoRepo)
+    meta_repository.get_ivf_version.return_value = 5
+    meta_repository.get_ivf_centroids.return_value = (vectors[:4], 5)
+    service = IVFService(
+        repository=AsyncMock(spec=RagDocumentMongoRepo),
+        meta_repository=meta_repository,
+        index=index,
+    )
+
+    # When
+    first = await service.refresh()
+    second = await service.refresh()
+
+    # Then
+    assert first is True
+    assert second is False
+    assert index.nlist == 4
+    assert len(index) == 200
@@ -0,0 +1,217 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from app.rag.adapter.output.index.binary import BinaryQuantizedVectorIndex
+from app.rag.adapter.output.index.flat import FlatVectorIndex
+from app.rag.adapter.output.index.lexical import BM25Index
+from app.rag.adapter.output.index.metadata import MetadataIndex
+from app.rag.adapter.output.index.scalar import ScalarQuantizedVectorIndex
+from app.rag.adapter.output.persistence.mongo.document import RagDocumentMongoRepo
+from app.rag.application.service.retrieval import RetrievalService
+from app.rag.domain.repository.reranker import Reranker
+
+vectors = np.array([[1, 0, 0], [0.9, 0.1, 0], [0, 1, 0]], dtype=np.float32)
+ids = ["a", "b", "c"]
+
+
+class ReverseReranker(Reranker):
+    """Prefers the documents cosine ranks last"""
+
+    def __init__(self, *, delay: float = 0.0):
+        self.delay = delay
+
+    async def score(self, *, query, texts):
+        await asyncio.sleep(self.delay)
+        return np.arange(len(texts), dtype=np.float32)
+
+
+def make_repository() -> AsyncMock:
+    async def get_documents_by_ids(*, ids, with_vectors=False):
+        documents = []
+        for id_ in ids:
+            doc = {"id": id_, "text": f"text {id_}", "source": "test"}
+            if with_vectors:
+                doc["vector"] = vectors[["a", "b", "c"].index(id_)]
+            documents.append(doc)
+        return documents
+
+    async def get_vectors_by_ids(*, ids):
+        return list(ids), vectors[[["a", "b", "c"].index(id_) for id_ in ids]]
+
+    repository = AsyncMock(spec=RagDocumentMongoRepo)
+    repository.get_documents_by_ids.side_effect = get_documents_by_ids
+    repository.get_vectors_by_ids.side_effect = get_vectors_by_ids
+    return repository
+
+
+@pytest.mark.asyncio
+async def test_retrieve_applies_threshold():
+    # Given
+    index = FlatVectorIndex()
+    index.add(ids=ids, vectors=vectors)
+    service = RetrievalService(index=index, repository=make_repository())
+
+    # When
+    sut = await service.retrieve(query_vector=np.array([1, 0, 0]), k=3, threshold=0.5)
+
+    # Then
+    assert [doc["id"] for doc in sut] == ["a", "b"]
+    assert sut[0]["score"] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_reranks_approximate_index():
+    # Given
+    index = ScalarQuantizedVectorIndex()
+    index.add(ids=ids, vectors=vectors)
+    repository = make_repository()
+    service = RetrievalService(index=index, repository=repository, rerank_oversample=2)
+
+    # When
+    sut = await service.retrieve(query_vector=np.array([1, 0, 0]), k=1, threshold=0.0)
+
+    # Then
+    assert [doc["id"] for doc in sut] == ["a"]
+    assert "vector" not in sut[0]
+    assert sut[0]["score"] == pytest.approx(1.0)
+    repository.get_documents_by_ids.assert_awaited_once()
+    assert repository.get_documents_by_ids.await_args.kwargs["with_vectors"] is True
+
+
+def test_rerank_oversample_defaults_to_the_index_type():
+    # Given
+    repository = make_repository()
+
+    # When
+    binary = RetrievalService(index=BinaryQuantizedVectorIndex(), repository=repository)
+    int8 = RetrievalService(index=ScalarQuantizedVectorIndex(), repository=repository)
+    configured = RetrievalService(index=BinaryQuantizedVectorIndex(), repository=repository, rerank_oversample=20)
+
+    # Then
+    assert binary.rerank_oversample == 10
+    assert int8.rerank_oversample == 4
+    assert configured.rerank_oversample == 20
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retrieve_keeps_keyword_matches_below_threshold():
+    # Given
+    index = FlatVectorIndex()
+    index.add(ids=ids, vectors=vectors)
+    lexical = BM25Index()
+    lexical.add(ids=ids, texts=["vector search", "nearest neighbours", "Muzan Kibutsuji"])
+    service = RetrievalService(index=index, repository=make_repository(), lexical_index=lexical)
+
+    # When
+    vector_only = await service.retrieve(
+        query_vector=np.array([1, 0, 0]), k=3, threshold=0.5, query="muzan", mode="vector"
+    )
+    sut = await service.retrieve(
+        query_vector=np.array([1, 0, 0]), k=3, threshold=0.5, query="muzan", mode="hybrid"
+    )
+
+    # Then
+    assert [doc["id"] for doc in vector_only] == ["a", "b"]
+    assert [doc["id"] for doc in sut] == ["a", "c", "b"]
+    assert "vector" not in sut[0]
+
+
+@pytest.mark.asyncio
+async def test_retrieve_reranks_wider_candidate_set():
+    # Given
+    index = FlatVectorIndex()
+    index.add(ids=ids, vectors=vectors)
+    service = RetrievalService(
+        index=index, repository=make_repository(), reranker=ReverseReranker(), rerank_candidates=3
+    )
+
+    # When
+    sut = await service.retrieve(query_vector=np.array([1, 0, 0]), k=2, threshold=0.0, query="q")
+    skipped = await service.retrieve(
+        query_vector=np.array([1, 0, 0]), k=2, threshold=0.0, query="q", rerank=False
+    )
+
+    # Then
+    assert [doc["id"] for doc in sut] == ["c", "b"]
+    assert sut[0]["score"] == 2.0
+    assert [doc["id"] for doc in skipped] == ["a", "b"]
+    assert service.rerank_stats() == {"reranked": 1, "fallbacks": 0}
+
+
+@pytest.mark.asyncio
+async def test_retrieve_keeps_cosine_order_when_rerank_budget_runs_out():
+    # Given
+    index = FlatVectorIndex()
+    index.add(ids=ids, vectors=vectors)
+    service = RetrievalService(
+        index=index,
+        repository=make_repository(),
+        reranker=ReverseReranker(delay=1.0),
+        rerank_candidates=3,
+        rerank_budget=0.05,
+    )
+
+    # When
+    sut = await service.retrieve(query_vector=np.array([1, 0, 0]), k=2, threshold=0.0, query="q")
+
+    # Then
+    assert [doc["id"] for doc in sut] == ["a", "b"]
+    assert sut[0]["score"] == pytest.approx(1.0)
+    assert service.rerank_stats() == {"reranked": 0, "fallbacks": 1}
+
+
+@pytest.mark.asyncio
+async def test_retrieve_mmr_prefers_distinct_documents():
+    # Given
+    index = FlatVectorIndex()
+    index.add(ids=ids, vectors=vectors)
+    repository = make_repository()
+    service = RetrievalService(index=index, repository=repository)
+
+    # When
+    relevant = await service.retrieve(query_vector=np.array([1, 0, 0]), k=2, threshold=0.0)
+    sut = await service.retrieve(
+        query_vector=np.array([1, 0, 0]), k=2, threshold=0.0, mmr_lambda=0.3, mmr_pool=3
+    )
+
+    # Then
+    assert [doc["id"] for doc in relevant] == ["a", "b"]
+    assert [doc["id"] for doc in sut] == ["a", "c"]
+    assert "vector" not in sut[0]
+    assert repository.get_documents_by_ids.await_args.kwargs["with_vectors"] is True
+
+
+@pytest.mark.parametrize(
+    ("index_type", "brute_force_max", "mongo_reads"),
+    [(FlatVectorIndex, 0, 0), (FlatVectorIndex, 10, 0), (ScalarQuantizedVectorIndex, 10, 1)],
+)
+@pytest.mark.asyncio
+async def test_retrieve_filters_by_source(index_type, brute_force_max, mongo_reads):
+    # Given
+    index = index_type()
+    index.add(ids=ids, vectors=vectors)
+    metadata = MetadataIndex()
+    metadata.add(ids=ids, metadata=[{"source": "docs"}, {"source": "lore"}, {"source": "docs"}])
+    repository = make_repository()
+    service = RetrievalService(
+        index=index,
+        repository=repository,
+        metadata_index=metadata,
+        filter_brute_force_max=brute_force_max,
+    )
+
+    # When
+    sut = await service.retrieve(
+        query_vector=np.array([1, 0, 0]), k=2, threshold=0.0, filters={"source": ["docs"]}
+    )
+    missing = await service.retrieve(
+        query_vector=np.array([1, 0, 0]), k=2, threshold=0.0, filters={"source": ["none"]}
+    )
+
+    # Then
+    assert [doc["id"] for doc in sut] == ["a", "c"]
+    assert missing == []
+    assert repository.get_vectors_by_ids.await_count == mongo_reads
@@ -0,0 +1,78 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from core.helpers.batcher import MicroBatcher
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.calls: list[list[int]] = []
+
+    async def __call__(self, items: list[int]) -> np.ndarray:
+        self.calls.append(items)
+        await asyncio.sleep(0)
+        return np.array(items) * 10
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_call():
+    # Given
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler=handler, max_batch_size=32, window=0.01)
+
+    # When
+    sut = await asyncio.gather(*(batcher.submit([i]) for i in range(5)))
+
+    # Then
+    assert handler.calls == [[0, 1, 2, 3, 4]]
+    assert [list(rows) for rows in sut] == [[0], [10], [20], [30], [40]]
+    assert batcher.stats()["avg_batch_fill"] == pytest.approx(5 / 32)
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting_for_window():
+    # Given
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler=handler, max_batch_size=2, window=10)
+
+    # When
+    sut = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit([i]) for i in range(4))), timeout=1
+    )
+
+    # Then
+    assert handler.calls == [[0, 1], [2, 3]]
+    assert [list(rows) for rows in sut] == [[0], [10], [20], [30]]
+
+
+@pytest.mark.asyncio
+async def test_large_submit_is_split():
+    # Given
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler=handler, max_batch_size=2, window=0)
+
+    # When
+    sut = await batcher.submit([1, 2, 3, 4, 5])
+
+    # Then
+    assert [len(call) for call in handler.calls] == [2, 2, 1]
+    assert list(sut) == [10, 20, 30, 40, 50]
+
+
+@pytest.mark.asyncio
+async def test_handler_error_reaches_every_caller():
+    # Given
+    async def handler(items):
+        raise RuntimeError("endpoint down")
+
+    batcher = MicroBatcher(handler=handler, window=0.01)
+
+    # When
+    sut = await asyncio.gather(
+        batcher.submit(["a"]), batcher.submit(["b"]), return_exceptions=True
+    )
+
+    # Then
+    assert [str(e) for e in sut] == ["endpoint down", "endpoint down"]
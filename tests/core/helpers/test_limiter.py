@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from core.helpers.limiter import ConcurrencyLimiter
+
+
+@pytest.mark.asyncio
+async def test_slot_reports_queue_depth():
+    # Given
+    limiter = ConcurrencyLimiter(limit=2)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()) for _ in range(5)]
+    await asyncio.sleep(0)
+
+    # When
+    sut = limiter.stats()
+    release.set()
+    await asyncio.gather(*tasks)
+
+    # Then
+    assert sut["in_flight"] == 2
+    assert sut["waiting"] == 3
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.stats()["acquired"] == 5
+    assert limiter.stats()["peak_waiting"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    # Given
+    limiter = ConcurrencyLimiter(limit=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    # When
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.01):
+            async with limiter.slot():
+                pass
+    release.set()
+    await holder
+
+    # Then
+    assert limiter.stats()["waiting"] == 0
+    assert limiter.stats()["acquired"] == 1
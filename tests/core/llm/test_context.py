@@ -0,0 +1,50 @@
+from core.llm.context import estimate_tokens, pack_context
+
+
+def test_packs_best_score_first_within_budget():
+    # Given
+    context = [
+        {"text": "Low relevance. " * 4, "score": 0.1},
+        {"text": "Most relevant fact.", "score": 0.9},
+        {"text": "Second fact here.", "score": 0.5},
+    ]
+
+    # When
+    sut = pack_context(context, max_tokens=10)
+
+    # Then
+    assert sut.texts == ["Most relevant fact.", "Second fact here."]
+    assert sut.tokens == estimate_tokens("Most relevant fact.") + estimate_tokens("Second fact here.")
+    assert sut.tokens <= 10
+    assert (sut.dropped, sut.trimmed) == (1, 0)
+
+
+def test_skips_sentences_already_packed():
+    # Given
+    context = [
+        {"text": "Alpha is first. Beta is second.", "score": 0.9},
+        {"text": "Beta  is second. Gamma is third.", "score": 0.8},
+        {"text": "alpha is first.", "score": 0.7},
+    ]
+
+    # When
+    sut = pack_context(context, max_tokens=1000)
+
+    # Then
+    assert sut.texts == ["Alpha is first. Beta is second.", "Gamma is third."]
+    assert (sut.dropped, sut.trimmed) == (1, 1)
+
+
+def test_trims_document_that_does_not_fit_whole():
+    # Given
+    long_sentence = "word " * 400
+
+    # When
+    partial = pack_context(["One short sentence. " + "Another one follows. " * 20], max_tokens=20)
+    cut = pack_context([long_sentence], max_tokens=50)
+
+    # Then
+    assert partial.texts == ["One short sentence. Another one follows. Another one follows."]
+    assert partial.trimmed == 1
+    assert cut.tokens <= 50 and cut.texts[0].startswith("word word")
+    assert pack_context([long_sentence], max_tokens=10).texts == []
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.llm.generation import GeminiGenerator
+
+
+class SlowModel:
+    def __init__(self, *, delay: float):
+        self.delay = delay
+
+    async def generate_content_async(self, prompt: str):
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(text="answer")
+
+
+@pytest.mark.asyncio
+async def test_generate_answer_async_overlaps_up_to_limit():
+    # Given
+    generator = GeminiGenerator(max_concurrency=4)
+    generator.model = SlowModel(delay=0.1)
+
+    # When
+    started = time.perf_counter()
+    sut = await asyncio.gather(
+        *(generator.generate_answer_async(["doc"], "question") for _ in range(8))
+    )
+    elapsed = time.perf_counter() - started
+
+    # Then
+    assert sut == ["answer"] * 8
+    assert 0.2 <= elapsed < 0.4
+    assert generator.limiter.stats()["peak_waiting"] == 4
+
+
+@pytest.mark.asyncio
+async def test_generate_answer_async_timeout():
+    # Given
+    generator = GeminiGenerator(timeout=0.01)
+    generator.model = SlowModel(delay=1)
+
+    # When
+    sut = await generator.generate_answer_async(["doc"], "question")
+
+    # Then
+    assert sut == "Error generating answer: timed out"
+    assert generator.limiter.stats()["in_flight"] == 0
+
+
+class StreamingModel:
+    def __init__(self, *, chunks: list[str], delay: float = 0):
+        self.chunks = chunks
+        self.delay = delay
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        async def response():
+            for chunk in self.chunks:
+                await asyncio.sleep(self.delay)
+                yield SimpleNamespace(text=chunk)
+
+        return response()
+
+
+@pytest.mark.asyncio
+async def test_stream_answer_yields_chunks():
+    # Given
+    generator = GeminiGenerator()
+    generator.model = StreamingModel(chunks=["The ", "answer"])
+
+    # When
+    sut = [text async for text in generator.stream_answer(["doc"], "question")]
+
+    # Then
+    assert sut == ["The ", "answer"]
+    assert generator.limiter.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_answer_times_out_between_chunks():
+    # Given
+    generator = GeminiGenerator(timeout=0.05)
+    generator.model = StreamingModel(chunks=["a", "b"], delay=1)
+
+    # When
+    sut = [text async for text in generator.stream_answer(["doc"], "question")]
+
+    # Then
+    assert sut == ["Error generating answer: timed out"]
+
+
+def test_packed_context_is_prompted_as_is():
+    # Given
+    generator = GeminiGenerator(context_tokens=10)
+    context = [
+        {"text": "Background that did not rank well.", "score": 0.2},
+        {"text": "The key fact.", "score": 0.9},
+    ]
+
+    # When
+    packed = generator.pack_context(context)
+    sut = generator.build_prompt(packed.texts, "question")
+
+    # Then
+    assert packed.texts == ["The key fact."]
+    assert "<doc>The key fact.</doc>" in sut
+    assert "Background" not in sut
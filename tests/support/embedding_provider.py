@@ -0,0 +1,26 @@
+import threading
+import time
+
+import numpy as np
+
+from app.rag.adapter.output.embedding.executor import ExecutorEmbeddingProvider
+
+
+class SlowProvider(ExecutorEmbeddingProvider):
+    """Blocks its worker thread like a synchronous HTTP call would"""
+
+    def __init__(self, *, delay: float, max_workers: int = 8):
+        super().__init__(max_workers=max_workers)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return np.array([[len(text), 1.0] for text in texts])
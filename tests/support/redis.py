@@ -0,0 +1,13 @@
+class FakeRedis:
+    """In-memory stand-in for the few redis.asyncio calls caches make"""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex